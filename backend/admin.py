@@ -0,0 +1,20 @@
+import hmac
+from functools import wraps
+from flask import current_app, jsonify, request
+
+
+def admin_required(view):
+    """Restringe una vista a peticiones con la cabecera X-Admin-Token correcta.
+
+    Si ADMIN_TOKEN no está configurado los endpoints de administración no existen (404).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get('ADMIN_TOKEN')
+        if not expected:
+            return jsonify({"message": "Recurso no encontrado"}), 404
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+            return jsonify({"message": "Acceso denegado"}), 403
+        return view(*args, **kwargs)
+    return wrapper
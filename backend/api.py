@@ -1,17 +1,30 @@
-from flask import Flask, request, jsonify
-from flask_bcrypt import Bcrypt
+import base64
+import os
+import weakref
+from flask import Blueprint, Flask, current_app, g, request, jsonify
 from models import db, User, Especialidad, Horario, HorarioDetail, Cita
-from flasgger import Swagger
+import queries
+from queries import CITA_COLUMNAS
+from query_stats import init_query_stats, query_budget
+from catalog_cache import init_catalog_cache, catalog_etag, catalog_version
+from serialization import FastJSONProvider, rows_to_dicts, stream_rows_response, STREAM_MIMETYPES
+from admin import admin_required
+from hashing import HasherSaturated, init_hashing, password_hasher
+from auth import init_auth, issue_token, token_required
+from bulk_import import import_users, init_bulk_import
+from booking_writer import booking_writer, init_booking_writer
+from single_flight import availability_flights, init_single_flight
+from rate_limit import client_ip, init_rate_limit, json_field, rate_limited
+from openapi import init_openapi
+from config import DEFAULTS, from_env
+from validation import init_validation
+from metrics import init_metrics, reset_metrics
+from profiling import init_profiling
+from traffic import init_traffic
 from datetime import datetime, timedelta
+from sqlalchemy import tuple_
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db' 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db.init_app(app)  
-bcrypt = Bcrypt(app)
-
-template = {
+SWAGGER_TEMPLATE = {
     "swagger": "2.0",
     "info": {
         "title": "CitaTuSalud",
@@ -24,7 +37,94 @@ template = {
     }
 }
 
-swagger = Swagger(app, template=template)
+bp = Blueprint('api', __name__)
+
+
+def create_app(config=None):
+    """Crea y configura la aplicación.
+
+    Sin `config` se toma del entorno (DATABASE_URL, SECRET_KEY, SWAGGER_UI, ...).
+    Los motores de base de datos se descartan en los procesos hijos tras un
+    fork, de modo que la app puede crearse en el maestro con `gunicorn --preload`.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.update(DEFAULTS)
+    app.config.update(from_env() if config is None else config)
+
+    db.init_app(app)
+    init_hashing(app)
+    init_auth(app)
+    init_profiling(app)
+    init_query_stats(app)
+    init_metrics(app)
+    init_traffic(app)
+    init_catalog_cache(app)
+    init_single_flight(app)
+    init_bulk_import(app)
+    init_booking_writer(app)
+    init_rate_limit(app)
+    init_openapi(app, SWAGGER_TEMPLATE)
+    app.register_blueprint(bp)
+    init_validation(app)
+
+    _apps.add(app)
+    if app.config['WARM_UP']:
+        warm_up(app)
+    return app
+
+
+_apps = weakref.WeakSet()
+
+
+def _dispose_engines(app):
+    # Las conexiones abiertas en el maestro no deben compartirse entre workers;
+    # close=False las abandona sin cerrarlas para no afectar al proceso padre.
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def _after_fork():
+    for app in list(_apps):
+        _dispose_engines(app)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+WARM_UP_PATHS = (
+    '/get-especialidades',
+    '/get-doctores/-',
+    '/horarios-disponibles?doctorId=-&fecha=2000-01-01',
+    '/openapi.json',
+)
+
+
+def warm_up(app):
+    """Recorre las rutas de lectura más usadas antes de aceptar tráfico.
+
+    Deja compiladas las consultas en la caché del motor, la especificación
+    cargada y las vistas resueltas; con --preload se hace una vez en el maestro
+    y los workers lo heredan.
+    """
+    client = app.test_client()
+    for path in WARM_UP_PATHS:
+        response = client.get(path)
+        if response.status_code >= 500:
+            app.logger.warning('Precalentamiento: %s respondió %d', path, response.status_code)
+    with app.app_context():
+        reset_metrics()
+
+
+def __getattr__(name):
+    # `api.app` se crea con la configuración del entorno al usarse por primera vez.
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def generar_horarios(inicio, fin):
     horarios = []
@@ -38,9 +138,91 @@ def generar_horarios(inicio, fin):
 
     return horarios
 
+
+def horarios_libres(inicio, fin, ocupados):
+    """Huecos de la franja [inicio, fin] que no están en `ocupados` (un set)."""
+    return [hora for hora in generar_horarios(inicio, fin) if hora not in ocupados]
+
+
+def disponibilidad(id_especialidad, fecha):
+    """Huecos libres del doctor en la fecha, o None si ese día no tiene horario.
+
+    Las llamadas simultáneas para el mismo doctor y fecha comparten un único
+    cálculo (AVAILABILITY_SINGLE_FLIGHT); la lista devuelta no debe modificarse.
+    """
+    vuelos = availability_flights()
+    if vuelos is not None:
+        return vuelos.do((id_especialidad, fecha), _calcular_disponibilidad, id_especialidad, fecha)
+    return _calcular_disponibilidad(id_especialidad, fecha)
+
+
+def _calcular_disponibilidad(id_especialidad, fecha):
+    horario_dia = db.session.execute(queries.horario_del_dia(id_especialidad, fecha)).first()
+    if not horario_dia:
+        return None
+    ocupados = set(db.session.scalars(queries.horas_ocupadas(id_especialidad, fecha)))
+    return horarios_libres(horario_dia.inicio, horario_dia.fin, ocupados)
+
+
+def reservar_cita(paciente_id, id_especialidad, especialidad, fecha, hora, motivo):
+    """Crea la cita y devuelve su id, o None si el hueco ya está ocupado.
+
+    Con el escritor agrupado activo (BOOKING_GROUP_COMMIT_MS) la reserva se
+    confirma junto con las demás que lleguen en la misma ventana.
+    """
+    writer = booking_writer()
+    if writer is not None:
+        return writer.submit(paciente_id, id_especialidad, especialidad, fecha, hora, motivo)
+    if db.session.scalar(queries.cita_en_conflicto(id_especialidad, fecha, hora)) is not None:
+        return None
+    cita = Cita(pacienteId=paciente_id, doctorId=id_especialidad, especialidad=especialidad,
+                fecha=fecha, hora=hora, motivo=motivo)
+    db.session.add(cita)
+    db.session.flush()
+    # El id se lee antes del commit: después, el objeto expira y leerlo costaría otra consulta.
+    cita_id = cita.id
+    db.session.commit()
+    return cita_id
+
+CITAS_LIMITE_DEFECTO = 50
+CITAS_LIMITE_MAXIMO = 200
+CITA_CAMPOS = tuple(columna.key for columna in CITA_COLUMNAS)
+EXPORT_PAGE_SIZE = 1000
+HORARIO_EXPORT_CAMPOS = ('horarioId', 'doctorId', 'doctor', 'especialidad', 'fecha', 'inicio', 'fin')
+
+def paginas_por_clave(query, clave, tamano=None):
+    """Filas de `query` ordenadas por `clave`, leídas por páginas (keyset).
+
+    Cada página es una lectura corta que se cierra antes de enviarla: un único
+    cursor abierto durante toda la descarga mantendría una transacción de
+    lectura en SQLite y bloquearía las reservas mientras un cliente lento lee.
+    Las columnas de `clave` deben identificar la fila y estar en la selección.
+    """
+    tamano = tamano or EXPORT_PAGE_SIZE
+    posicion = None
+    while True:
+        pagina = query if posicion is None else query.where(tuple_(*clave) > posicion)
+        filas = db.session.execute(pagina.order_by(*clave).limit(tamano)).all()
+        db.session.rollback()
+        yield from filas
+        if len(filas) < tamano:
+            return
+        posicion = tuple(filas[-1]._mapping[columna] for columna in clave)
+
+
+def codificar_cursor(cita):
+    valor = f"{cita.fecha.strftime('%Y-%m-%d')}|{cita.hora}|{cita.id}"
+    return base64.urlsafe_b64encode(valor.encode('utf-8')).decode('ascii')
+
+def decodificar_cursor(cursor):
+    fecha, hora, cita_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+    return datetime.strptime(fecha, '%Y-%m-%d').date(), hora, int(cita_id)
+
 # Routes
 
-@app.route('/register', methods=['POST'])
+@bp.route('/register', methods=['POST'])
+@rate_limited(('register_ip', client_ip))
+@query_budget(2)
 def register():
     """
     Register a new user
@@ -67,9 +249,8 @@ def register():
               example: password123
               description: Contraseña del usuario.
             rol:
-              type: integer
               example: 1
-              description: Rol del usuario (1 para paciente, 2 para doctor, etc.).
+              description: Rol del usuario (1 para paciente, 2 para doctor, etc.); también se acepta el nombre del rol. Requerido.
     responses:
       201:
         description: Usuario registrado con éxito.
@@ -95,6 +276,22 @@ def register():
             message:
               type: string
               example: El correo ya está registrado.
+      429:
+        description: Demasiados intentos desde esta IP; reintentar tras Retry-After.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Demasiados intentos, intente de nuevo más tarde.
+      503:
+        description: Demasiadas operaciones de contraseña en curso; reintentar tras Retry-After.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Servicio ocupado, intente de nuevo en unos segundos.
     """
     data = request.get_json()
     nombre = data.get('nombre')
@@ -102,14 +299,14 @@ def register():
     password = data.get('password')
     rol = data.get('rol')
 
-    if not nombre or not correo or not password:
+    if not nombre or not correo or not password or rol is None:
         return jsonify({"message": "Todos los campos son requeridos"}), 400
 
     existing_user = User.query.filter_by(correo=correo).first()
     if existing_user:
         return jsonify({"message": "El correo ya está registrado."}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = password_hasher().generate_password_hash(password)
     new_user = User(nombre=nombre, correo=correo, password=hashed_password, rol=rol)
     db.session.add(new_user)
     db.session.commit()
@@ -117,7 +314,101 @@ def register():
     return jsonify({"message": "Usuario registrado con éxito."}), 201
 
 
-@app.route('/login', methods=['POST'])
+@bp.route('/register-bulk', methods=['POST'])
+@admin_required
+def register_bulk():
+    """
+    Register many users at once
+    ---
+    tags:
+      - Users
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        required: true
+        type: string
+        description: Token de administración (ADMIN_TOKEN).
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            usuarios:
+              type: array
+              items:
+                type: object
+                properties:
+                  nombre:
+                    type: string
+                    example: Juan Pérez
+                  correo:
+                    type: string
+                    example: juan@example.com
+                  password:
+                    type: string
+                    example: password123
+                  rol:
+                    type: integer
+                    example: 1
+    responses:
+      200:
+        description: Resumen de la importación.
+        schema:
+          type: object
+          properties:
+            creados:
+              type: integer
+              example: 950
+            duplicados:
+              type: array
+              items:
+                type: string
+                example: juan@example.com
+            invalidos:
+              type: array
+              items:
+                type: object
+                properties:
+                  indice:
+                    type: integer
+                    example: 3
+                  error:
+                    type: string
+                    example: "Campo requerido: correo"
+      400:
+        description: El cuerpo no contiene una lista de usuarios.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Se requiere una lista de usuarios.
+      413:
+        description: Más usuarios de los admitidos por petición (BULK_IMPORT_HTTP_MAX); use `flask importar-usuarios`.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: "Como mucho 50 usuarios por petición; use `flask importar-usuarios` para importaciones mayores."
+    """
+    data = request.get_json()
+    usuarios = data.get('usuarios') if isinstance(data, dict) else None
+    if not isinstance(usuarios, list):
+        return jsonify({"message": "Se requiere una lista de usuarios."}), 400
+    maximo = current_app.config['BULK_IMPORT_HTTP_MAX']
+    if len(usuarios) > maximo:
+        return jsonify({"message": f"Como mucho {maximo} usuarios por petición; "
+                                   "use `flask importar-usuarios` para importaciones mayores."}), 413
+
+    resumen = import_users(usuarios, password_hasher())
+    return jsonify(resumen), 200
+
+
+@bp.route('/login', methods=['POST'])
+@rate_limited(('login_ip', client_ip), ('login_correo', json_field('correo')))
+@query_budget(2)
 def login():
     """
     Login a user
@@ -130,6 +421,9 @@ def login():
         required: true
         schema:
           type: object
+          required:
+            - correo
+            - password
           properties:
             correo:
               type: string
@@ -158,6 +452,14 @@ def login():
                 rol:
                   type: integer
                   example: 1
+            token:
+              type: string
+              description: "Token de acceso; enviarlo como 'Authorization: Bearer <token>'."
+              example: eyJpZCI6MSwicm9sIjoxfQ.ZmXq3w.4hB...
+            expiraEn:
+              type: integer
+              description: Segundos de validez del token.
+              example: 43200
       404:
         description: User not found
         schema:
@@ -174,6 +476,22 @@ def login():
             message:
               type: string
               example: Contraseña incorrecta.
+      429:
+        description: Demasiados intentos desde esta IP o para este correo; reintentar tras Retry-After.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Demasiados intentos, intente de nuevo más tarde.
+      503:
+        description: Demasiadas operaciones de contraseña en curso; reintentar tras Retry-After.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Servicio ocupado, intente de nuevo en unos segundos.
     """
     data = request.get_json()
     correo = data.get('correo')
@@ -183,20 +501,34 @@ def login():
     if not user:
         return jsonify({"message": "Usuario no encontrado."}), 404
 
-    if not bcrypt.check_password_hash(user.password, password):
+    hasher = password_hasher()
+    if not hasher.check_password_hash(user.password, password):
         return jsonify({"message": "Contraseña incorrecta."}), 401
 
+    usuario = {
+        "id": user.id,
+        "nombre": user.nombre,
+        "rol": user.rol,
+    }
+    token = issue_token(user)
+
+    if hasher.needs_rehash(user.password):
+        try:
+            user.password = hasher.generate_password_hash(password)
+            db.session.commit()
+        except HasherSaturated:
+            pass
+
     return jsonify({
         "message": "Inicio de sesión exitoso.",
-        "usuario": {
-            "id": user.id,
-            "nombre": user.nombre,
-            "rol": user.rol,
-        },
+        "usuario": usuario,
+        "token": token,
+        "expiraEn": current_app.config['TOKEN_MAX_AGE'],
     }), 200
 
 
-@app.route('/register-especialidad', methods=['POST'])
+@bp.route('/register-especialidad', methods=['POST'])
+@query_budget(3)
 def register_especialidad():
     """
     Register a new specialty
@@ -275,6 +607,7 @@ def register_especialidad():
     nueva_especialidad = Especialidad(nombre=nombre, doctor=doctor, fechaIngreso=fecha_ingreso_dt)
     db.session.add(nueva_especialidad)
     db.session.commit()
+    catalog_version().bump()
 
     return jsonify({"message": "Especialidad registrada con éxito", "data": {
         "id": nueva_especialidad.id,
@@ -284,7 +617,7 @@ def register_especialidad():
     }}), 201
 
 
-@app.route('/register-horario', methods=['POST'])
+@bp.route('/register-horario', methods=['POST'])
 def register_horario():
     """
     Register a new schedule
@@ -297,6 +630,8 @@ def register_horario():
         required: true
         schema:
           type: object
+          required:
+            - horario
           properties:
             especialidad:
               type: string
@@ -310,6 +645,10 @@ def register_horario():
               type: array
               items:
                 type: object
+                required:
+                  - fecha
+                  - inicio
+                  - fin
                 properties:
                   fecha:
                     type: string
@@ -317,10 +656,12 @@ def register_horario():
                     description: Fecha en formato YYYY-MM-DD.
                   inicio:
                     type: string
+                    pattern: '^([01][0-9]|2[0-3]):[0-5][0-9]$'
                     example: "09:00"
                     description: Hora de inicio en formato HH:mm.
                   fin:
                     type: string
+                    pattern: '^([01][0-9]|2[0-3]):[0-5][0-9]$'
                     example: "14:00"
                     description: Hora de fin en formato HH:mm.
     responses:
@@ -352,7 +693,8 @@ def register_horario():
 
     nuevo_horario = Horario(doctorId=especialidad_data.id, doctor=doctor, especialidad=especialidad)
     db.session.add(nuevo_horario)
-    db.session.commit()
+    # flush y no commit: si un detalle es inválido, el rollback descarta también el horario.
+    db.session.flush()
 
     for h in horario:
         try:
@@ -373,16 +715,31 @@ def register_horario():
     return jsonify({"message": "Horario registrado con éxito"}), 201
 
 
-@app.route('/get-especialidades', methods=['GET'])
+@bp.route('/get-especialidades', methods=['GET'])
+@query_budget(1)
+@catalog_etag
 def get_especialidades():
     """
     Get all specialties
     ---
     tags:
       - Especialidades
+    parameters:
+      - name: If-None-Match
+        in: header
+        required: false
+        type: string
+        description: ETag de una respuesta anterior.
     responses:
       200:
         description: Lista de especialidades.
+        headers:
+          ETag:
+            type: string
+            description: Versión del catálogo; enviarla en If-None-Match para revalidar.
+          Cache-Control:
+            type: string
+            description: public, max-age=300
         schema:
           type: array
           items:
@@ -397,6 +754,8 @@ def get_especialidades():
               doctor:
                 type: string
                 example: Dr. Gómez
+      304:
+        description: El catálogo no cambió desde el ETag enviado.
       404:
         description: No hay especialidades registradas.
         schema:
@@ -406,15 +765,17 @@ def get_especialidades():
               type: string
               example: No hay especialidades registradas.
     """
-    especialidades = Especialidad.query.all()
-    if not especialidades:
+    especialidades = db.session.execute(db.select(Especialidad.id, Especialidad.nombre, Especialidad.doctor))
+    datos = rows_to_dicts(especialidades.keys(), especialidades)
+    if not datos:
         return jsonify({"message": "No hay especialidades registradas"}), 404
 
-    datos = [{"id": e.id, "nombre": e.nombre, "doctor": e.doctor} for e in especialidades]
     return jsonify(datos), 200
 
 
-@app.route('/get-doctores/<string:nombre_especialidad>', methods=['GET'])
+@bp.route('/get-doctores/<string:nombre_especialidad>', methods=['GET'])
+@query_budget(1)
+@catalog_etag
 def get_doctores(nombre_especialidad):
     """
     Get doctors by specialty
@@ -427,14 +788,28 @@ def get_doctores(nombre_especialidad):
         required: true
         type: string
         description: Nombre de la especialidad para buscar doctores.
+      - name: If-None-Match
+        in: header
+        required: false
+        type: string
+        description: ETag de una respuesta anterior.
     responses:
       200:
         description: Lista de doctores para la especialidad.
+        headers:
+          ETag:
+            type: string
+            description: Versión del catálogo; enviarla en If-None-Match para revalidar.
+          Cache-Control:
+            type: string
+            description: public, max-age=300
         schema:
           type: array
           items:
             type: string
             example: Dr. Gómez
+      304:
+        description: El catálogo no cambió desde el ETag enviado.
       404:
         description: No se encontraron doctores para esta especialidad.
         schema:
@@ -452,7 +827,8 @@ def get_doctores(nombre_especialidad):
     return jsonify(doctores), 200
 
 
-@app.route("/horarios-disponibles", methods=['GET'])
+@bp.route("/horarios-disponibles", methods=['GET'])
+@query_budget(3)
 def horarios_disponibles():
     """
     Get available schedules for a doctor on a specific date
@@ -501,38 +877,28 @@ def horarios_disponibles():
     if not doctor_nombre or not fecha_str:
         return jsonify({"error": "Doctor y fecha son requeridos"}), 400
 
-    especialidad_data = Especialidad.query.filter_by(doctor=doctor_nombre).first()
-    if not especialidad_data:
+    id_especialidad = db.session.scalar(queries.doctor_id(doctor_nombre))
+    if not id_especialidad:
         return jsonify({"message": "Doctor no encontrado"}), 400
 
-    id_especialidad = especialidad_data.id
-
     try:
         fecha_dt = datetime.strptime(fecha_str, '%Y-%m-%d').date()
     except:
         return jsonify({"error": "Formato de fecha incorrecto, use YYYY-MM-DD"}), 400
 
-    horario = Horario.query.filter_by(doctorId=id_especialidad).join(Horario.detalles).filter(HorarioDetail.fecha == fecha_dt).first()
-    if not horario:
+    horarios_disponibles = disponibilidad(id_especialidad, fecha_dt)
+    if horarios_disponibles is None:
         return jsonify({"error": "No hay horario disponible para esta fecha"}), 404
 
-    horario_dia = next((h for h in horario.detalles if h.fecha == fecha_dt), None)
-    if not horario_dia:
-        return jsonify({"error": "No hay horario en esa fecha"}), 404
-
-    horarios_disponibles = generar_horarios(horario_dia.inicio, horario_dia.fin)
-    citas_ocupadas_query = Cita.query.filter_by(doctorId=id_especialidad, fecha=fecha_dt).all()
-    horarios_ocupados = [cita.hora for cita in citas_ocupadas_query]
-
-    horarios_disponibles = [hora for hora in horarios_disponibles if hora not in horarios_ocupados]
-
     if not horarios_disponibles:
         return jsonify({"message": "No hay horarios disponibles para este doctor en la fecha seleccionada."}), 404
 
     return jsonify(horarios_disponibles), 200
 
 
-@app.route('/register-cita', methods=['POST'])
+@bp.route('/register-cita', methods=['POST'])
+@token_required
+@query_budget(3)
 def register_cita():
     """
     Register a new appointment
@@ -540,6 +906,11 @@ def register_cita():
     tags:
       - Citas
     parameters:
+      - name: Authorization
+        in: header
+        required: true
+        type: string
+        description: "Bearer <token> obtenido en /login."
       - name: body
         in: body
         required: true
@@ -564,6 +935,7 @@ def register_cita():
               description: Fecha de la cita en formato YYYY-MM-DD.
             hora:
               type: string
+              pattern: '^([01][0-9]|2[0-3]):[0-5][0-9]$'
               example: "09:00"
               description: Hora de la cita en formato HH:mm.
             motivo:
@@ -587,6 +959,30 @@ def register_cita():
             message:
               type: string
               example: Faltan campos requeridos.
+      401:
+        description: Falta el token de acceso o es inválido/expiró.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Token inválido o expirado.
+      403:
+        description: La cita pertenece a otro usuario.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: No puede operar sobre citas de otro usuario.
+      503:
+        description: Con el escritor agrupado, la reserva no se aplicó a tiempo y no quedó registrada; reintentar tras Retry-After.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: No se pudo registrar la cita a tiempo, intente de nuevo.
     """
     data = request.get_json()
     pacienteId = data.get('pacienteId')
@@ -599,36 +995,27 @@ def register_cita():
     if not pacienteId or not doctor_nombre or not especialidad or not fecha_str or not hora or not motivo:
         return jsonify({"message": "Faltan campos requeridos."}), 400
 
-    especialidad_data = Especialidad.query.filter_by(doctor=doctor_nombre).first()
-    if not especialidad_data:
-        return jsonify({"message": "Doctor no encontrado"}), 400
+    if pacienteId != g.usuario['id']:
+        return jsonify({"message": "No puede operar sobre citas de otro usuario."}), 403
 
-    id_especialidad = especialidad_data.id
+    id_especialidad = db.session.scalar(queries.doctor_id(doctor_nombre))
+    if not id_especialidad:
+        return jsonify({"message": "Doctor no encontrado"}), 400
 
     try:
         fecha_dt = datetime.strptime(fecha_str, '%Y-%m-%d').date()
     except:
         return jsonify({"error": "Formato de fecha incorrecto para la fecha, use YYYY-MM-DD"}), 400
 
-    existing_appointment = Cita.query.filter_by(doctorId=id_especialidad, fecha=fecha_dt, hora=hora).first()
-    if existing_appointment:
+    if reservar_cita(pacienteId, id_especialidad, especialidad, fecha_dt, hora, motivo) is None:
         return jsonify({"message": "Este horario ya está ocupado."}), 400
 
-    new_cita = Cita(
-        pacienteId=pacienteId,
-        doctorId=id_especialidad,
-        especialidad=especialidad,
-        fecha=fecha_dt,
-        hora=hora,
-        motivo=motivo
-    )
-    db.session.add(new_cita)
-    db.session.commit()
-
-    return jsonify({"message": "Cita registrada exitosamente."}), 
+    return jsonify({"message": "Cita registrada exitosamente."}), 201
 
 
-@app.route('/citas/<int:usuarioId>', methods=['GET'])
+@bp.route('/citas/<int:usuarioId>', methods=['GET'])
+@token_required
+@query_budget(1)
 def get_citas_usuario(usuarioId):
     """
     Get appointments for a specific user
@@ -636,14 +1023,43 @@ def get_citas_usuario(usuarioId):
     tags:
       - Citas
     parameters:
+      - name: Authorization
+        in: header
+        required: true
+        type: string
+        description: "Bearer <token> obtenido en /login."
       - name: usuarioId
         in: path
         required: true
         type: integer
         description: ID del paciente para obtener sus citas.
+      - name: desde
+        in: query
+        required: false
+        type: string
+        description: Fecha mínima (inclusive) en formato YYYY-MM-DD.
+      - name: hasta
+        in: query
+        required: false
+        type: string
+        description: Fecha máxima (inclusive) en formato YYYY-MM-DD.
+      - name: limit
+        in: query
+        required: false
+        type: integer
+        description: Número máximo de citas por página (por defecto 50, máximo 200).
+      - name: cursor
+        in: query
+        required: false
+        type: string
+        description: Valor de X-Next-Cursor de la página anterior.
     responses:
       200:
-        description: Lista de citas del paciente.
+        description: Lista de citas del paciente ordenada por fecha, hora e id.
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor de la página siguiente; ausente en la última página.
         schema:
           type: array
           items:
@@ -670,6 +1086,30 @@ def get_citas_usuario(usuarioId):
               motivo:
                 type: string
                 example: Chequeo general
+      400:
+        description: Parámetros de paginación o filtros no válidos.
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Formato de fecha incorrecto, use YYYY-MM-DD
+      401:
+        description: Falta el token de acceso o es inválido/expiró.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Token inválido o expirado.
+      403:
+        description: La cita pertenece a otro usuario.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: No puede operar sobre citas de otro usuario.
       404:
         description: No se encontraron citas para el usuario.
         schema:
@@ -679,22 +1119,41 @@ def get_citas_usuario(usuarioId):
               type: string
               example: No se encontraron citas para el usuario.
     """
-    citas = Cita.query.filter_by(pacienteId=usuarioId).all()
-    resultado = []
-    for cita in citas:
-        resultado.append({
-            "id": cita.id,
-            "pacienteId": cita.pacienteId,
-            "doctorId": cita.doctorId,
-            "especialidad": cita.especialidad,
-            "fecha": cita.fecha.strftime('%Y-%m-%d'),
-            "hora": cita.hora,
-            "motivo": cita.motivo
-        })
-    return jsonify(resultado), 200
-
-
-@app.route('/citas/<int:citaId>', methods=['DELETE'])
+    if usuarioId != g.usuario['id']:
+        return jsonify({"message": "No puede operar sobre citas de otro usuario."}), 403
+
+    try:
+        limite = int(request.args.get('limit', CITAS_LIMITE_DEFECTO))
+    except ValueError:
+        return jsonify({"error": "El límite debe ser un número entero"}), 400
+    if limite < 1 or limite > CITAS_LIMITE_MAXIMO:
+        return jsonify({"error": f"El límite debe estar entre 1 y {CITAS_LIMITE_MAXIMO}"}), 400
+
+    try:
+        desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date() if request.args.get('desde') else None
+        hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date() if request.args.get('hasta') else None
+    except ValueError:
+        return jsonify({"error": "Formato de fecha incorrecto, use YYYY-MM-DD"}), 400
+
+    posicion = None
+    if request.args.get('cursor'):
+        try:
+            posicion = decodificar_cursor(request.args['cursor'])
+        except ValueError:
+            return jsonify({"error": "Cursor no válido"}), 400
+
+    citas = db.session.execute(queries.citas_de_paciente(usuarioId, limite + 1, desde, hasta, posicion)).all()
+    siguiente = codificar_cursor(citas[limite - 1]) if len(citas) > limite else None
+
+    response = jsonify(rows_to_dicts(CITA_CAMPOS, citas[:limite]))
+    if siguiente:
+        response.headers['X-Next-Cursor'] = siguiente
+    return response, 200
+
+
+@bp.route('/citas/<int:citaId>', methods=['DELETE'])
+@token_required
+@query_budget(2)
 def eliminar_cita(citaId):
     """
     Delete an appointment by ID
@@ -702,6 +1161,11 @@ def eliminar_cita(citaId):
     tags:
       - Citas
     parameters:
+      - name: Authorization
+        in: header
+        required: true
+        type: string
+        description: "Bearer <token> obtenido en /login."
       - name: citaId
         in: path
         required: true
@@ -716,6 +1180,22 @@ def eliminar_cita(citaId):
             message:
               type: string
               example: Cita cancelada correctamente.
+      401:
+        description: Falta el token de acceso o es inválido/expiró.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Token inválido o expirado.
+      403:
+        description: La cita pertenece a otro usuario.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: No puede operar sobre citas de otro usuario.
       404:
         description: Cita no encontrada.
         schema:
@@ -728,15 +1208,175 @@ def eliminar_cita(citaId):
     cita = Cita.query.get(citaId)
     if not cita:
         return jsonify({"message": "Cita no encontrada"}), 404
-    
+
+    if cita.pacienteId != g.usuario['id']:
+        return jsonify({"message": "No puede operar sobre citas de otro usuario."}), 403
+
     db.session.delete(cita)
     db.session.commit()
 
     return jsonify({"message": "Cita cancelada correctamente"}), 200
 
 
+# Sin @query_budget: las páginas se leen mientras se envía la respuesta, después
+# de after_request, y quedan fuera del presupuesto por petición.
+@bp.route('/export/citas', methods=['GET'])
+@admin_required
+def export_citas():
+    """
+    Export all appointments as a streamed JSON array or NDJSON
+    ---
+    tags:
+      - Administración
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        required: true
+        type: string
+        description: Token de administración (ADMIN_TOKEN).
+      - name: formato
+        in: query
+        required: false
+        type: string
+        enum: [json, ndjson]
+        description: json (arreglo, por defecto) o ndjson (una cita por línea).
+    responses:
+      200:
+        description: Todas las citas ordenadas por id, enviadas en streaming.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id:
+                type: integer
+                example: 1
+              pacienteId:
+                type: integer
+                example: 1
+              doctorId:
+                type: integer
+                example: 1
+              especialidad:
+                type: string
+                example: Cardiología
+              fecha:
+                type: string
+                example: 2024-06-10
+              hora:
+                type: string
+                example: "09:00"
+              motivo:
+                type: string
+                example: Chequeo general
+      400:
+        description: Formato no soportado.
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Formato no soportado, use json o ndjson
+      403:
+        description: Token de administración incorrecto.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Acceso denegado
+    """
+    formato = request.args.get('formato', 'json')
+    if formato not in STREAM_MIMETYPES:
+        return jsonify({"error": "Formato no soportado, use json o ndjson"}), 400
+
+    citas = paginas_por_clave(db.select(*CITA_COLUMNAS), (Cita.id,))
+    return stream_rows_response(CITA_CAMPOS, citas, formato)
+
+
+# Sin @query_budget, como /export/citas.
+@bp.route('/export/horarios', methods=['GET'])
+@admin_required
+def export_horarios():
+    """
+    Export all schedule days as a streamed JSON array or NDJSON
+    ---
+    tags:
+      - Administración
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        required: true
+        type: string
+        description: Token de administración (ADMIN_TOKEN).
+      - name: formato
+        in: query
+        required: false
+        type: string
+        enum: [json, ndjson]
+        description: json (arreglo, por defecto) o ndjson (un día de horario por línea).
+    responses:
+      200:
+        description: Todos los días de horario ordenados por horario y fecha, enviados en streaming.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              horarioId:
+                type: integer
+                example: 1
+              doctorId:
+                type: integer
+                example: 1
+              doctor:
+                type: string
+                example: Dr. Gómez
+              especialidad:
+                type: string
+                example: Cardiología
+              fecha:
+                type: string
+                example: 2024-06-10
+              inicio:
+                type: string
+                example: "09:00"
+              fin:
+                type: string
+                example: "14:00"
+      400:
+        description: Formato no soportado.
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: Formato no soportado, use json o ndjson
+      403:
+        description: Token de administración incorrecto.
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: Acceso denegado
+    """
+    formato = request.args.get('formato', 'json')
+    if formato not in STREAM_MIMETYPES:
+        return jsonify({"error": "Formato no soportado, use json o ndjson"}), 400
+
+    # HorarioDetail.id desempata la clave y va al final: no forma parte de la salida.
+    horarios = paginas_por_clave(
+        db.select(Horario.id, Horario.doctorId, Horario.doctor, Horario.especialidad,
+                  HorarioDetail.fecha, HorarioDetail.inicio, HorarioDetail.fin, HorarioDetail.id)
+        .join(HorarioDetail, HorarioDetail.horario_id == Horario.id),
+        (Horario.id, HorarioDetail.fecha, HorarioDetail.id),
+    )
+    return stream_rows_response(HORARIO_EXPORT_CAMPOS, horarios, formato)
+
 
-if __name__ == '_main_':
+if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from metrics import cache_event
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'access-token'
+
+
+class TokenCache:
+    """Caché LRU acotada de tokens ya verificados: token -> (usuario, expira_en)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token, now):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def put(self, token, usuario, expires_at):
+        with self._lock:
+            self._entries[token] = (usuario, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def init_auth(app):
+    if not app.config.get('SECRET_KEY'):
+        # Sin una clave compartida cada proceso firma con la suya y los tokens
+        # dejan de ser válidos al reiniciar o al cambiar de worker.
+        logger.warning('SECRET_KEY no configurada; se usa una clave aleatoria por proceso.')
+        app.config['SECRET_KEY'] = os.urandom(32)
+    app.config.setdefault('TOKEN_MAX_AGE', 12 * 60 * 60)
+    app.config.setdefault('TOKEN_CACHE_SIZE', 10000)
+    app.extensions['token_serializer'] = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=TOKEN_SALT)
+    app.extensions['token_cache'] = TokenCache(app.config['TOKEN_CACHE_SIZE'])
+
+
+def issue_token(user):
+    """Token de acceso firmado (sin estado en el servidor) para el usuario."""
+    return current_app.extensions['token_serializer'].dumps({'id': user.id, 'rol': user.rol})
+
+
+def verify_token(token):
+    """Devuelve el usuario del token o None si es inválido o expiró."""
+    now = time.time()
+    cache = current_app.extensions['token_cache']
+    usuario = cache.get(token, now)
+    cache_event('token', usuario is not None)
+    if usuario is not None:
+        return usuario
+
+    max_age = current_app.config['TOKEN_MAX_AGE']
+    try:
+        usuario, firmado = current_app.extensions['token_serializer'].loads(
+            token, max_age=max_age, return_timestamp=True
+        )
+    except BadSignature:
+        return None
+    cache.put(token, usuario, firmado.timestamp() + max_age)
+    return usuario
+
+
+def token_required(view):
+    """Exige 'Authorization: Bearer <token>' y deja el usuario en g.usuario."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return jsonify({"message": "Token de acceso requerido."}), 401
+        usuario = verify_token(token.strip())
+        if usuario is None:
+            return jsonify({"message": "Token inválido o expirado."}), 401
+        g.usuario = usuario
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,191 @@
+"""Escritura agrupada de reservas (group commit).
+
+Con BOOKING_GROUP_COMMIT_MS, `api.reservar_cita` no hace su propio commit: deja
+la reserva a un hilo escritor que junta las que llegan en esa ventana y las
+confirma en una sola transacción. En SQLite cada commit es un fsync, así que en
+una avalancha de reservas el rendimiento deja de estar limitado a un commit por
+petición. Solo agrupa peticiones concurrentes del mismo proceso: en gunicorn
+requiere workers con hilos (--threads).
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, TimeoutError
+from flask import current_app, jsonify
+from models import db, Cita
+import queries
+
+_STOP = object()
+
+
+class BookingTimeout(Exception):
+    """La reserva no se aplicó a tiempo (escritor atascado o base bloqueada); no quedó registrada."""
+
+
+class BookingWriter:
+    """Hilo escritor que aplica las reservas pendientes por lotes.
+
+    Toma la primera reserva en cola, espera hasta `window` segundos (o hasta
+    `max_batch` reservas) a que lleguen más y las aplica en orden de llegada
+    dentro de una transacción con un único commit. Cada una comprueba el
+    conflicto dentro de esa transacción, así que dos reservas del mismo hueco
+    en el mismo lote se resuelven como si fueran en serie. Si el lote falla, se
+    deshace y se reintenta reserva por reserva, de modo que cada llamante
+    recibe su propio resultado o su propia excepción.
+    """
+
+    def __init__(self, app, window=0.005, max_batch=100, timeout=10):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._reset()
+        _writers.add(self)
+
+    def _reset(self):
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.commits = 0
+        self.bookings = 0
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='booking-writer', daemon=True)
+                    self._thread.start()
+
+    def submit(self, paciente_id, id_especialidad, especialidad, fecha, hora, motivo):
+        """Encola la reserva y espera a su lote; devuelve el id de la cita o None si hay conflicto.
+
+        Si en `timeout` segundos el lote no ha empezado, la reserva se retira de
+        la cola y se lanza BookingTimeout. Si ya está en un lote en curso, se
+        espera a su resultado: la transacción no puede abandonarse a medias.
+        """
+        future = Future()
+        self._ensure_thread()
+        self._queue.put(({'pacienteId': paciente_id, 'doctorId': id_especialidad, 'especialidad': especialidad,
+                          'fecha': fecha, 'hora': hora, 'motivo': motivo}, future))
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise BookingTimeout() from None
+        return future.result()
+
+    def close(self):
+        """Aplica lo pendiente y detiene el hilo escritor."""
+        thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+
+    def _run(self):
+        with self.app.app_context():
+            engine = db.engine
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            lote = [item]
+            limite = time.monotonic() + self.window
+            parar = False
+            while len(lote) < self.max_batch:
+                resto = limite - time.monotonic()
+                if resto <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=resto)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    parar = True
+                    break
+                lote.append(item)
+            self._write(engine, lote)
+            if parar:
+                return
+
+    def _write(self, engine, lote):
+        # Las reservas que agotaron su espera ya se cancelaron y no se aplican.
+        lote = [(datos, future) for datos, future in lote if future.set_running_or_notify_cancel()]
+        if not lote:
+            return
+        try:
+            with engine.begin() as conn:
+                resultados = [_reservar(conn, datos) for datos, _ in lote]
+        except Exception:
+            # Nada del lote quedó confirmado: se reintenta cada reserva por separado.
+            for datos, future in lote:
+                try:
+                    with engine.begin() as conn:
+                        future.set_result(_reservar(conn, datos))
+                except Exception as e:
+                    future.set_exception(e)
+            self.commits += len(lote)
+        else:
+            for (_, future), resultado in zip(lote, resultados):
+                future.set_result(resultado)
+            self.commits += 1
+        self.bookings += len(lote)
+
+
+def _reservar(conn, datos):
+    # La misma comprobación e inserción que api.reservar_cita, en la transacción del lote.
+    if conn.scalar(queries.cita_en_conflicto(datos['doctorId'], datos['fecha'], datos['hora'])) is not None:
+        return None
+    return conn.execute(Cita.__table__.insert(), datos).inserted_primary_key[0]
+
+
+_writers = weakref.WeakSet()
+
+
+def _after_fork():
+    # También tras un fork: el hilo del padre no existe en el hijo.
+    for writer in list(_writers):
+        writer._reset()
+
+
+def _close_all():
+    for writer in list(_writers):
+        writer.close()
+
+
+# Un solo hook por proceso: registrar métodos de cada escritor mantendría vivas
+# para siempre sus aplicaciones.
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_close_all)
+
+
+def _timeout(error):
+    response = jsonify({"message": "No se pudo registrar la cita a tiempo, intente de nuevo."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+def init_booking_writer(app):
+    """Escritor agrupado opcional; sin BOOKING_GROUP_COMMIT_MS cada reserva hace su commit."""
+    app.config.setdefault('BOOKING_GROUP_COMMIT_MS', None)
+    app.config.setdefault('BOOKING_GROUP_COMMIT_MAX', 100)
+    # Por debajo del timeout de gunicorn (30 s): la petición responde 503 en lugar de morir.
+    app.config.setdefault('BOOKING_GROUP_COMMIT_TIMEOUT', 10)
+    if app.config['BOOKING_GROUP_COMMIT_MS'] is None:
+        return
+    app.extensions['booking_writer'] = BookingWriter(
+        app, app.config['BOOKING_GROUP_COMMIT_MS'] / 1000, app.config['BOOKING_GROUP_COMMIT_MAX'],
+        app.config['BOOKING_GROUP_COMMIT_TIMEOUT'])
+    app.register_error_handler(BookingTimeout, _timeout)
+
+
+def booking_writer():
+    return current_app.extensions.get('booking_writer')
@@ -0,0 +1,147 @@
+import csv
+import json
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+from models import db, User
+from hashing import PasswordHasher
+
+# SQLite admite como mucho 32766 parámetros por sentencia.
+MAX_IN_PARAMS = 30000
+
+
+def _existing_emails(correos):
+    existentes = set()
+    correos = list(correos)
+    for i in range(0, len(correos), MAX_IN_PARAMS):
+        chunk = correos[i:i + MAX_IN_PARAMS]
+        existentes.update(db.session.execute(db.select(User.correo).where(User.correo.in_(chunk))).scalars())
+    return existentes
+
+
+def _validate(registro):
+    if not isinstance(registro, dict):
+        return 'Cada usuario debe ser un objeto'
+    for campo in ('nombre', 'correo', 'password'):
+        if not registro.get(campo) or not isinstance(registro[campo], str):
+            return f'Campo requerido: {campo}'
+    return None
+
+
+def _insert_batch(lote, duplicados):
+    """Inserta el lote en una transacción; devuelve cuántos usuarios se crearon."""
+    try:
+        db.session.execute(db.insert(User), lote)
+        db.session.commit()
+        return len(lote)
+    except IntegrityError:
+        # Otro proceso registró alguno de estos correos tras la deduplicación.
+        db.session.rollback()
+    ocupados = _existing_emails(fila['correo'] for fila in lote)
+    duplicados.extend(fila['correo'] for fila in lote if fila['correo'] in ocupados)
+    lote = [fila for fila in lote if fila['correo'] not in ocupados]
+    if not lote:
+        return 0
+    try:
+        db.session.execute(db.insert(User), lote)
+        db.session.commit()
+        return len(lote)
+    except IntegrityError:
+        # La carrera se repite: se sigue fila por fila para no perder el resto del lote.
+        db.session.rollback()
+    creados = 0
+    for fila in lote:
+        try:
+            db.session.execute(db.insert(User), fila)
+            db.session.commit()
+            creados += 1
+        except IntegrityError:
+            db.session.rollback()
+            duplicados.append(fila['correo'])
+    return creados
+
+
+def import_users(registros, hasher, batch_size=500):
+    """Registra usuarios en bloque.
+
+    Descarta inválidos y correos repetidos (en la entrada y en la base, con una
+    sola consulta), calcula los hashes con `hasher` e inserta en transacciones
+    de `batch_size` filas. Devuelve un resumen por categoría.
+    """
+    invalidos = []
+    candidatos = {}
+    duplicados = []
+    for indice, registro in enumerate(registros):
+        error = _validate(registro)
+        if error:
+            invalidos.append({"indice": indice, "error": error})
+        elif registro['correo'] in candidatos:
+            duplicados.append(registro['correo'])
+        else:
+            candidatos[registro['correo']] = registro
+
+    existentes = _existing_emails(candidatos)
+    duplicados.extend(correo for correo in candidatos if correo in existentes)
+    nuevos = [registro for correo, registro in candidatos.items() if correo not in existentes]
+
+    hashes = hasher.hash_many([registro['password'] for registro in nuevos])
+
+    filas = [{
+        "nombre": registro['nombre'],
+        "correo": registro['correo'],
+        "password": pw_hash,
+        "rol": registro.get('rol') or 1,
+    } for registro, pw_hash in zip(nuevos, hashes)]
+
+    creados = 0
+    for i in range(0, len(filas), batch_size):
+        creados += _insert_batch(filas[i:i + batch_size], duplicados)
+
+    return {"creados": creados, "duplicados": duplicados, "invalidos": invalidos}
+
+
+def _read_file(path):
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@click.command('importar-usuarios')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=int, default=None, help='Procesos para calcular los hashes.')
+@click.option('--lote', type=int, default=500, show_default=True, help='Usuarios por transacción.')
+@with_appcontext
+def importar_usuarios_command(archivo, workers, lote):
+    """Importa usuarios desde un CSV (nombre,correo,password,rol) o un JSON."""
+    registros = _read_file(archivo)
+    for registro in registros:
+        if isinstance(registro, dict) and isinstance(registro.get('rol'), str) and registro['rol'].isdigit():
+            registro['rol'] = int(registro['rol'])
+
+    if workers is None:
+        workers = current_app.config['BULK_IMPORT_WORKERS']
+    # Un pool propio para la importación: el de la aplicación queda para los logins.
+    hasher = PasswordHasher(workers, max_pending=1, rounds=current_app.config['BCRYPT_LOG_ROUNDS'])
+    inicio = time.perf_counter()
+    try:
+        resumen = import_users(registros, hasher, lote)
+    finally:
+        hasher.shutdown()
+    segundos = time.perf_counter() - inicio
+
+    click.echo(f"Creados: {resumen['creados']} | duplicados: {len(resumen['duplicados'])} | "
+               f"inválidos: {len(resumen['invalidos'])} | {resumen['creados'] / segundos:.1f} usuarios/s")
+    for invalido in resumen['invalidos']:
+        click.echo(f"  fila {invalido['indice']}: {invalido['error']}", err=True)
+
+
+def init_bulk_import(app):
+    app.config.setdefault('BULK_IMPORT_WORKERS', app.config.get('PASSWORD_HASH_WORKERS') or 1)
+    # /register-bulk calcula los hashes dentro de la petición: el límite la mantiene
+    # por debajo del timeout de gunicorn; las importaciones mayores van por la CLI.
+    app.config.setdefault('BULK_IMPORT_HTTP_MAX', 50)
+    app.cli.add_command(importar_usuarios_command)
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import threading
+import weakref
+from functools import wraps
+from flask import Response, current_app, request
+from metrics import cache_event
+
+
+class CatalogVersion:
+    """Versión del catálogo (especialidades y doctores) para los ETags.
+
+    Sin `path` la versión vive en memoria: un contador más un identificador
+    aleatorio del proceso, que se regenera tras un fork para que dos workers
+    nunca emitan el mismo ETag. Solo es coherente con un único proceso.
+    Con `path` la versión es un token aleatorio guardado en un archivo que
+    comparten todos los workers: cada cambio escribe uno nuevo (reemplazo
+    atómico) y leerla cuesta leer el archivo, nunca una consulta.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._new_epoch()
+        _instances.add(self)
+        if path is not None:
+            # Un arranque nuevo invalida los ETags emitidos antes.
+            self.bump()
+
+    def _new_epoch(self):
+        self._epoch = os.urandom(4).hex()
+
+    def current(self):
+        if self.path is None:
+            return f'{self._epoch}-{self._counter}'
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or '0'
+        except FileNotFoundError:
+            return '0'
+
+    def bump(self):
+        with self._lock:
+            self._counter += 1
+            if self.path is not None:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp = tempfile.mkstemp(dir=directory, prefix='.catalog-')
+                with os.fdopen(fd, 'w') as f:
+                    f.write(f'{os.urandom(8).hex()}\n')
+                os.replace(tmp, self.path)
+
+
+_instances = weakref.WeakSet()
+
+
+def _after_fork():
+    for version in list(_instances):
+        version._lock = threading.Lock()
+        version._new_epoch()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def init_catalog_cache(app):
+    app.config.setdefault('CATALOG_MAX_AGE', 300)
+    app.config.setdefault('CATALOG_VERSION_FILE', None)
+    path = app.config['CATALOG_VERSION_FILE']
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    app.extensions['catalog_version'] = CatalogVersion(path or None)
+
+
+def catalog_version():
+    return current_app.extensions['catalog_version']
+
+
+def catalog_etag(view):
+    """Responde 304 sin ejecutar la vista si el cliente ya tiene la versión actual."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # La versión se lee antes de consultar: si el catálogo cambia a mitad de
+        # la petición el ETag queda atrasado y el siguiente GET lo revalida.
+        etag = f'catalog-{catalog_version().current()}'
+        cache_control = f"public, max-age={current_app.config['CATALOG_MAX_AGE']}"
+
+        hit = request.if_none_match.contains_weak(etag)
+        cache_event('catalog_etag', hit)
+        if hit:
+            response = Response(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        return response
+    return wrapper
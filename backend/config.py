@@ -0,0 +1,54 @@
+import os
+
+DEFAULTS = {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///database.db',
+    'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    'SWAGGER_UI': True,
+    'WARM_UP': False,
+}
+
+
+def from_env(environ=os.environ):
+    """Configuración tomada de variables de entorno; las ausentes usan DEFAULTS."""
+    config = {}
+    if environ.get('DATABASE_URL'):
+        config['SQLALCHEMY_DATABASE_URI'] = environ['DATABASE_URL']
+    if environ.get('SECRET_KEY'):
+        config['SECRET_KEY'] = environ['SECRET_KEY']
+    if environ.get('BCRYPT_TARGET_MS'):
+        config['BCRYPT_TARGET_MS'] = float(environ['BCRYPT_TARGET_MS'])
+    if 'SWAGGER_UI' in environ:
+        config['SWAGGER_UI'] = environ['SWAGGER_UI'] != '0'
+    if environ.get('WEB_CONCURRENCY'):
+        config['WEB_CONCURRENCY'] = int(environ['WEB_CONCURRENCY'])
+    if environ.get('PASSWORD_HASH_WORKERS'):
+        config['PASSWORD_HASH_WORKERS'] = int(environ['PASSWORD_HASH_WORKERS'])
+    if environ.get('BULK_IMPORT_HTTP_MAX'):
+        config['BULK_IMPORT_HTTP_MAX'] = int(environ['BULK_IMPORT_HTTP_MAX'])
+    if environ.get('ADMIN_TOKEN'):
+        config['ADMIN_TOKEN'] = environ['ADMIN_TOKEN']
+    if environ.get('PROFILE_DIR'):
+        config['PROFILE_DIR'] = environ['PROFILE_DIR']
+    if environ.get('PROFILE_SAMPLE_RATE'):
+        config['PROFILE_SAMPLE_RATE'] = float(environ['PROFILE_SAMPLE_RATE'])
+    if environ.get('SQL_SLOW_QUERY_MS'):
+        config['SQL_SLOW_QUERY_MS'] = None if environ['SQL_SLOW_QUERY_MS'] == 'off' else float(environ['SQL_SLOW_QUERY_MS'])
+    if 'RATE_LIMIT_ENABLED' in environ:
+        config['RATE_LIMIT_ENABLED'] = environ['RATE_LIMIT_ENABLED'] != '0'
+    if environ.get('PROXY_FIX_X_FOR'):
+        config['PROXY_FIX_X_FOR'] = int(environ['PROXY_FIX_X_FOR'])
+    if environ.get('RECORD_DIR'):
+        config['RECORD_DIR'] = environ['RECORD_DIR']
+    if environ.get('BOOKING_GROUP_COMMIT_MS'):
+        config['BOOKING_GROUP_COMMIT_MS'] = float(environ['BOOKING_GROUP_COMMIT_MS'])
+    if environ.get('BOOKING_GROUP_COMMIT_TIMEOUT'):
+        config['BOOKING_GROUP_COMMIT_TIMEOUT'] = float(environ['BOOKING_GROUP_COMMIT_TIMEOUT'])
+    if 'AVAILABILITY_SINGLE_FLIGHT' in environ:
+        config['AVAILABILITY_SINGLE_FLIGHT'] = environ['AVAILABILITY_SINGLE_FLIGHT'] != '0'
+    if environ.get('CATALOG_VERSION_FILE'):
+        config['CATALOG_VERSION_FILE'] = environ['CATALOG_VERSION_FILE']
+    if environ.get('METRICS_DIR'):
+        config['METRICS_DIR'] = environ['METRICS_DIR']
+    if 'WARM_UP' in environ:
+        config['WARM_UP'] = environ['WARM_UP'] != '0'
+    return config
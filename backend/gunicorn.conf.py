@@ -0,0 +1,42 @@
+"""
+Configuración de gunicorn para producción
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+La aplicación se crea una sola vez en el proceso maestro (preload_app) y se
+precalienta antes de lanzar los workers, que la heredan ya lista por
+copy-on-write. create_app descarta en cada worker las conexiones de base de
+datos abiertas en el maestro.
+
+Cada worker vuelca sus métricas en METRICS_DIR y /metrics las suma. La versión
+del catálogo (ETags de especialidades y doctores) se comparte entre workers a
+través de CATALOG_VERSION_FILE.
+
+Detrás de un proxy inverso, PROXY_FIX_X_FOR indica cuántos proxies de confianza
+añaden X-Forwarded-For; sin ella todos los clientes comparten la IP del proxy en
+el límite de intentos por IP.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'citatusalud-metrics'))
+os.environ.setdefault('CATALOG_VERSION_FILE', os.path.join(tempfile.gettempdir(), 'citatusalud-catalog.version'))
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+# Procesos de bcrypt por worker: entre todos, como mucho uno por CPU.
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+wsgi_app = 'api:create_app()'
+
+
+def on_starting(server):
+    from metrics import clear_metrics_dir
+    clear_metrics_dir(os.environ['METRICS_DIR'])
+
+
+def when_ready(server):
+    from api import warm_up
+    warm_up(server.app.wsgi())
@@ -0,0 +1,184 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import bcrypt as _bcrypt
+from flask import current_app, jsonify
+
+logger = logging.getLogger(__name__)
+
+
+_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class HasherSaturated(Exception):
+    """La cola de hashing de contraseñas está llena; la petición debe rechazarse."""
+
+
+def _hash_password(password, rounds):
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(pw_hash, password):
+    return _bcrypt.checkpw(password.encode('utf-8'), pw_hash.encode('utf-8'))
+
+
+def hash_rounds(pw_hash):
+    """Factor de coste de un hash bcrypt ('$2b$12$...' -> 12)."""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms, min_rounds=10, max_rounds=16, sample_rounds=8, samples=3):
+    """Elige el mayor coste cuyo hash tarda como mucho `target_ms` en esta máquina.
+
+    Cada ronda adicional duplica el trabajo, así que basta medir un coste bajo
+    y extrapolar en lugar de probar los costes altos uno por uno.
+    """
+    password = b'calibracion'
+    salt = _bcrypt.gensalt(sample_rounds)
+    tiempos = []
+    for _ in range(samples):
+        inicio = time.perf_counter()
+        _bcrypt.hashpw(password, salt)
+        tiempos.append(time.perf_counter() - inicio)
+    base_ms = min(tiempos) * 1000
+
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - sample_rounds) <= target_ms:
+        rounds += 1
+    logger.info('bcrypt calibrado: coste %d (~%.0f ms por hash, objetivo %s ms)',
+                rounds, base_ms * 2 ** (rounds - sample_rounds), target_ms)
+    return rounds
+
+
+class PasswordHasher:
+    """Ejecuta bcrypt en un pool de procesos acotado, fuera del hilo de la petición.
+
+    Como mucho `max_pending` operaciones pueden estar en cola o en ejecución;
+    las siguientes fallan de inmediato con HasherSaturated en lugar de esperar.
+    Con `workers=0` el hash se calcula en el propio hilo (útil en pruebas).
+    Los hashes son compatibles con los de Flask-Bcrypt.
+    """
+
+    def __init__(self, workers, max_pending, rounds=12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+        _instances.add(self)
+
+    @property
+    def queue_depth(self):
+        return self._pending
+
+    def _forget_executor(self):
+        # Un pool heredado por fork no es utilizable en el hijo; se crea otro al primer uso.
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # forkserver: los procesos de bcrypt no se crean con fork desde un
+                    # worker con hilos (un lock tomado por otro hilo quedaría bloqueado).
+                    self._executor = ProcessPoolExecutor(self.workers, mp_context=_MP_CONTEXT)
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherSaturated()
+        with self._lock:
+            self._pending += 1
+        try:
+            if self.workers == 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def generate_password_hash(self, password, rounds=None):
+        return self._run(_hash_password, password, rounds or self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        return self._run(_check_password, pw_hash, password)
+
+    def hash_many(self, passwords, rounds=None, chunksize=8):
+        """Calcula muchos hashes repartidos entre todos los procesos del pool.
+
+        No pasa por el límite de cola: quien llama acota el volumen (la CLI de
+        importación usa un hasher propio; /register-bulk limita las filas).
+        """
+        rounds = rounds or self.rounds
+        if self.workers == 0:
+            return [_hash_password(password, rounds) for password in passwords]
+        return list(self._get_executor().map(_hash_password, passwords, repeat(rounds), chunksize=chunksize))
+
+    def needs_rehash(self, pw_hash):
+        rounds = hash_rounds(pw_hash)
+        return rounds is not None and rounds != self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_instances = weakref.WeakSet()
+
+
+def _after_fork():
+    for hasher in list(_instances):
+        hasher._forget_executor()
+
+
+# Un solo hook por proceso: uno por instancia las mantendría vivas para siempre.
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _saturated(error):
+    response = jsonify({"message": "Servicio ocupado, intente de nuevo en unos segundos."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+def init_hashing(app):
+    # Los procesos de bcrypt se reparten entre los workers web: con uno por CPU en
+    # cada worker, el equipo tendría del orden de CPU² procesos compitiendo.
+    app.config.setdefault('WEB_CONCURRENCY', 1)
+    workers = app.config.setdefault(
+        'PASSWORD_HASH_WORKERS', max(1, (os.cpu_count() or 1) // max(1, app.config['WEB_CONCURRENCY'])))
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', max(workers, 1) * 4)
+    app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+    app.config.setdefault('BCRYPT_TARGET_MS', None)
+    app.config.setdefault('BCRYPT_MIN_ROUNDS', 10)
+    app.config.setdefault('BCRYPT_MAX_ROUNDS', 16)
+    if app.config['BCRYPT_TARGET_MS']:
+        app.config['BCRYPT_LOG_ROUNDS'] = calibrate_rounds(
+            app.config['BCRYPT_TARGET_MS'],
+            app.config['BCRYPT_MIN_ROUNDS'],
+            app.config['BCRYPT_MAX_ROUNDS'],
+        )
+    app.extensions['password_hasher'] = PasswordHasher(
+        workers,
+        app.config['PASSWORD_HASH_MAX_PENDING'],
+        app.config['BCRYPT_LOG_ROUNDS'],
+    )
+    app.register_error_handler(HasherSaturated, _saturated)
+
+
+def password_hasher():
+    return current_app.extensions['password_hasher']
@@ -0,0 +1,318 @@
+"""Generador de carga del flujo de reserva completo.
+
+Cada usuario virtual repite el recorrido de un paciente: login → especialidades
+→ doctores → disponibilidad → reservar → listar → cancelar, contra un servidor
+HTTP (HTTPTransport) o en proceso con el cliente de pruebas (TestClientTransport).
+El informe es un diccionario JSON estable para poder comparar versiones.
+"""
+
+import http.client
+import json
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import quote, urlsplit
+
+FLOW_STEPS = (
+    'POST /login',
+    'GET /get-especialidades',
+    'GET /get-doctores/<nombre>',
+    'GET /horarios-disponibles',
+    'POST /register-cita',
+    'GET /citas/<usuarioId>',
+    'DELETE /citas/<citaId>',
+)
+
+
+class FlowError(Exception):
+    """Un paso del flujo devolvió un estado inesperado; el flujo se abandona."""
+
+
+class TestClientTransport:
+    """Peticiones en proceso con el cliente de pruebas de Flask (un cliente por hilo)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'PUT', 'DELETE'))
+
+
+class HTTPTransport:
+    """Peticiones HTTP con una conexión keep-alive por hilo."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == 'https'
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for intento in range(2):
+            conn = self._connection()
+            # Solo una conexión keep-alive ya usada puede haberla cerrado el servidor.
+            reintentable = not intento and conn.sock is not None
+            try:
+                conn.request(method, self.prefix + path, payload, headers)
+            except (http.client.HTTPException, ConnectionError):
+                # El envío falló: la petición no llegó al servidor y se puede repetir.
+                self._discard(conn)
+                if not reintentable:
+                    raise
+                continue
+            try:
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # La petición pudo procesarse: repetir un POST duplicaría la reserva.
+                self._discard(conn)
+                if not reintentable or method not in IDEMPOTENT_METHODS:
+                    raise
+
+    def _discard(self, conn):
+        conn.close()
+        self._local.conn = None
+
+
+class _Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {step: [] for step in FLOW_STEPS}
+        self.statuses = {step: Counter() for step in FLOW_STEPS}
+        self.flows = []
+        self.failures = Counter()
+
+    def step(self, step, status, elapsed):
+        with self._lock:
+            self.latencies[step].append(elapsed)
+            self.statuses[step][status] += 1
+
+    def flow(self, elapsed):
+        with self._lock:
+            self.flows.append(elapsed)
+
+    def failure(self, reason):
+        with self._lock:
+            self.failures[reason] += 1
+
+
+class BookingFlow:
+    """Recorrido de reserva de un paciente sintético (ver synthetic.populate)."""
+
+    def __init__(self, transport, recorder, rnd, pacientes, password, desde, anios, availability_attempts=5):
+        self.transport = transport
+        self.recorder = recorder
+        self.rnd = rnd
+        self.pacientes = pacientes
+        self.password = password
+        self.desde = desde
+        self.dias = (date(desde.year + anios, desde.month, desde.day) - desde).days
+        self.availability_attempts = availability_attempts
+
+    def _call(self, step, method, path, body=None, headers=None, expected=(200,)):
+        inicio = time.perf_counter()
+        status, data = self.transport.request(method, path, body, headers)
+        self.recorder.step(step, status, time.perf_counter() - inicio)
+        if status not in expected:
+            raise FlowError(f'{step} -> {status}')
+        return status, json.loads(data) if data else None
+
+    def run(self):
+        rnd = self.rnd
+        paciente = rnd.randint(1, self.pacientes)
+        _, login = self._call('POST /login', 'POST', '/login',
+                              {'correo': f'paciente{paciente}@clinica.test', 'password': self.password})
+        auth = {'Authorization': f"Bearer {login['token']}"}
+        usuario_id = login['usuario']['id']
+
+        _, especialidades = self._call('GET /get-especialidades', 'GET', '/get-especialidades')
+        ids = {e['doctor']: e['id'] for e in especialidades}
+        nombre = rnd.choice(sorted({e['nombre'] for e in especialidades}))
+        _, doctores = self._call('GET /get-doctores/<nombre>', 'GET', f'/get-doctores/{quote(nombre)}')
+        doctor = rnd.choice(doctores)
+
+        # Fines de semana o días completos devuelven 404: se prueba otra fecha.
+        for _ in range(self.availability_attempts):
+            fecha = (self.desde + timedelta(days=rnd.randrange(self.dias))).isoformat()
+            status, horas = self._call(
+                'GET /horarios-disponibles', 'GET',
+                f'/horarios-disponibles?doctorId={quote(doctor)}&fecha={fecha}', expected=(200, 404))
+            if status == 200:
+                break
+        else:
+            raise FlowError('sin disponibilidad')
+        hora = rnd.choice(horas)
+
+        status, _ = self._call('POST /register-cita', 'POST', '/register-cita', {
+            'pacienteId': usuario_id, 'doctorId': doctor, 'especialidad': nombre,
+            'fecha': fecha, 'hora': hora, 'motivo': 'Prueba de carga',
+        }, auth, expected=(201, 400))
+        if status == 400:
+            # Otro usuario virtual reservó el mismo hueco entre la consulta y la reserva.
+            raise FlowError('conflicto de reserva')
+
+        _, citas = self._call('GET /citas/<usuarioId>', 'GET', f'/citas/{usuario_id}?desde={fecha}&limit=50',
+                              headers=auth)
+        cita = next((c for c in citas if c['doctorId'] == ids[doctor] and c['fecha'] == fecha and c['hora'] == hora),
+                    None)
+        if cita is None:
+            raise FlowError('cita reservada no listada')
+        self._call('DELETE /citas/<citaId>', 'DELETE', f"/citas/{cita['id']}", headers=auth)
+
+
+def percentiles(values):
+    """p50/p95/p99/media/máximo en ms de una lista de segundos (None si está vacía)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        cuts = ordered * 99
+    else:
+        cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+    return {
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def _version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_load(transport, concurrency=8, duration=None, flows=None, seed=0, pacientes=20000,
+             password='clave-sintetica', desde=date(2023, 1, 1), anios=2, target=None):
+    """Ejecuta el flujo con `concurrency` usuarios virtuales y devuelve el informe.
+
+    Se detiene tras `duration` segundos o cuando se completan (o fallan) `flows`
+    recorridos en total. Cada usuario virtual encadena flujos sin pausa (carga
+    en lazo cerrado) con su propio generador aleatorio derivado de `seed`.
+    """
+    if duration is None and flows is None:
+        raise ValueError('Indique duration o flows.')
+    recorder = _Recorder()
+    restantes = [flows]
+    lock = threading.Lock()
+
+    def turno():
+        with lock:
+            if restantes[0] is None:
+                return True
+            if restantes[0] <= 0:
+                return False
+            restantes[0] -= 1
+            return True
+
+    def usuario(indice):
+        flow = BookingFlow(transport, recorder, random.Random(seed * 1000003 + indice), pacientes, password,
+                           desde, anios)
+        while (fin is None or time.perf_counter() < fin) and turno():
+            inicio = time.perf_counter()
+            try:
+                flow.run()
+            except FlowError as e:
+                recorder.failure(str(e))
+            except Exception as e:
+                recorder.failure(type(e).__name__)
+            else:
+                recorder.flow(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    fin = inicio + duration if duration is not None else None
+    hilos = [threading.Thread(target=usuario, args=(i,), name=f'vu-{i}') for i in range(concurrency)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    elapsed = time.perf_counter() - inicio
+
+    endpoints = {}
+    for step in FLOW_STEPS:
+        latencies = recorder.latencies[step]
+        endpoints[step] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'statuses': {str(status): n for status, n in sorted(recorder.statuses[step].items())},
+            'latency': percentiles(latencies),
+        }
+    return {
+        'meta': {
+            'version': _version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'target': target,
+            'concurrency': concurrency,
+            'seed': seed,
+            'duration_s': round(elapsed, 3),
+        },
+        'flows': {
+            'completed': len(recorder.flows),
+            'failed': sum(recorder.failures.values()),
+            'failures': dict(sorted(recorder.failures.items())),
+            'flows_per_second': round(len(recorder.flows) / elapsed, 2),
+            'latency': percentiles(recorder.flows),
+        },
+        'endpoints': endpoints,
+    }
+
+
+def compare(base, actual):
+    """Variación relativa (en %) de cada métrica entre dos informes; positiva = peor.
+
+    Para el rendimiento (throughput, flujos/s) el signo se invierte, de modo que
+    un valor positivo siempre indica una regresión.
+    """
+    def delta(antes, despues, invertir=False):
+        if not antes or despues is None:
+            return None
+        cambio = (despues - antes) / antes * 100
+        return round(-cambio if invertir else cambio, 1)
+
+    filas = {'flujo': {
+        'flows_per_second': delta(base['flows']['flows_per_second'], actual['flows']['flows_per_second'], True),
+        **{k: delta((base['flows']['latency'] or {}).get(k), (actual['flows']['latency'] or {}).get(k))
+           for k in ('p50_ms', 'p95_ms', 'p99_ms')},
+    }}
+    for step in FLOW_STEPS:
+        antes, despues = base['endpoints'].get(step), actual['endpoints'].get(step)
+        if not antes or not despues:
+            continue
+        filas[step] = {
+            'throughput_rps': delta(antes['throughput_rps'], despues['throughput_rps'], True),
+            **{k: delta((antes['latency'] or {}).get(k), (despues['latency'] or {}).get(k))
+               for k in ('p50_ms', 'p95_ms', 'p99_ms')},
+        }
+    return filas
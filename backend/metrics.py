@@ -0,0 +1,335 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, current_app, g, request
+
+# Límites superiores (segundos) de las cubetas del histograma de latencia.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_START = 'citatusalud.metrics_start'
+_UNMATCHED = 'sin_ruta'
+
+
+class MetricsRegistry:
+    """Contadores del proceso actual.
+
+    Cada worker acumula en memoria y, si hay METRICS_DIR, un hilo en segundo
+    plano vuelca una instantánea a `metrics-<pid>.json` cuando hubo cambios;
+    /metrics suma las de todos los procesos. Registrar una petición solo toma
+    un lock y actualiza diccionarios.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.latency = {}
+            self.db = {}
+            self.cache = {}
+            self.in_flight = 0
+            self.dirty = False
+            self.flusher = None
+
+    def after_fork(self):
+        # El lock pudo quedar tomado por un hilo del padre que no existe en el hijo.
+        self._lock = threading.Lock()
+        self.reset()
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, route, method, status, elapsed, db_time, db_queries):
+        bucket = bisect_left(LATENCY_BUCKETS, elapsed)
+        with self._lock:
+            self.in_flight -= 1
+            key = (route, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((route, method))
+            if histogram is None:
+                histogram = self.latency[(route, method)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            histogram[bucket] += 1
+            histogram[-1] += elapsed
+            db = self.db.get(route)
+            if db is None:
+                db = self.db[route] = [0.0, 0]
+            db[0] += db_time
+            db[1] += db_queries
+            self.dirty = True
+
+    def cache_event(self, cache, hit):
+        key = (cache, 'hit' if hit else 'miss')
+        with self._lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+            self.dirty = True
+
+    def snapshot(self, gauges):
+        with self._lock:
+            self.dirty = False
+            return {
+                'pid': os.getpid(),
+                'requests': [[*key, n] for key, n in self.requests.items()],
+                'latency': [[*key, histogram[:-1], histogram[-1]] for key, histogram in self.latency.items()],
+                'db': [[route, seconds, queries] for route, (seconds, queries) in self.db.items()],
+                'cache': [[*key, n] for key, n in self.cache.items()],
+                'gauges': dict(gauges, in_flight=self.in_flight),
+            }
+
+
+REGISTRY = MetricsRegistry()
+os.register_at_fork(after_in_child=REGISTRY.after_fork)
+
+
+def cache_event(cache, hit):
+    """Registra un acierto o fallo de una caché (p. ej. 'catalog_etag', 'token')."""
+    REGISTRY.cache_event(cache, hit)
+
+
+def _gauges():
+    hasher = current_app.extensions.get('password_hasher')
+    writer = current_app.extensions.get('booking_writer')
+    return {
+        'password_hash_queue_depth': hasher.queue_depth if hasher is not None else 0,
+        'booking_queue_depth': writer.queue_depth if writer is not None else 0,
+    }
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f'metrics-{pid}.json')
+
+
+def flush():
+    """Escribe la instantánea de este proceso en METRICS_DIR (reemplazo atómico)."""
+    directory = current_app.config.get('METRICS_DIR')
+    if not directory:
+        return
+    snapshot = REGISTRY.snapshot(_gauges())
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, _snapshot_path(directory, snapshot['pid']))
+
+
+def _flush_loop(app, interval):
+    thread = threading.current_thread()
+    while REGISTRY.flusher is thread:
+        time.sleep(interval)
+        if REGISTRY.dirty:
+            with app.app_context():
+                flush()
+
+
+def _start_flusher(app):
+    with REGISTRY._lock:
+        if REGISTRY.flusher is None:
+            REGISTRY.flusher = threading.Thread(
+                target=_flush_loop, args=(app, app.config['METRICS_FLUSH_INTERVAL']),
+                name='metrics-flush', daemon=True,
+            )
+            REGISTRY.flusher.start()
+
+
+def reset_metrics():
+    """Descarta lo acumulado por este proceso (p. ej. tras el precalentamiento)."""
+    REGISTRY.reset()
+    directory = current_app.config.get('METRICS_DIR')
+    if directory:
+        try:
+            os.unlink(_snapshot_path(directory, os.getpid()))
+        except FileNotFoundError:
+            pass
+
+
+def clear_metrics_dir(directory):
+    """Borra las instantáneas de una ejecución anterior; llamar antes de lanzar workers."""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        os.unlink(path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(snapshots):
+    """Suma instantáneas de varios procesos.
+
+    Los contadores de workers ya terminados se conservan para que los totales
+    no retrocedan; sus gauges se ignoran.
+    """
+    merged = {'requests': {}, 'latency': {}, 'db': {}, 'cache': {}, 'gauges': {}}
+    for snapshot in snapshots:
+        for *key, n in snapshot['requests']:
+            merged['requests'][tuple(key)] = merged['requests'].get(tuple(key), 0) + n
+        for route, method, counts, total in snapshot['latency']:
+            histogram = merged['latency'].setdefault((route, method), [0] * len(counts) + [0.0])
+            for i, n in enumerate(counts):
+                histogram[i] += n
+            histogram[-1] += total
+        for route, seconds, queries in snapshot['db']:
+            db = merged['db'].setdefault(route, [0.0, 0])
+            db[0] += seconds
+            db[1] += queries
+        for *key, n in snapshot['cache']:
+            merged['cache'][tuple(key)] = merged['cache'].get(tuple(key), 0) + n
+        if _alive(snapshot['pid']):
+            for name, value in snapshot['gauges'].items():
+                merged['gauges'][name] = merged['gauges'].get(name, 0) + value
+    return merged
+
+
+def _read_snapshots(directory):
+    for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+        try:
+            with open(path) as f:
+                yield json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render(merged):
+    """Formato de exposición de texto de Prometheus."""
+    lines = [
+        '# HELP citatusalud_http_requests_total Peticiones atendidas por ruta, método y estado.',
+        '# TYPE citatusalud_http_requests_total counter',
+    ]
+    for (route, method, status), n in sorted(merged['requests'].items()):
+        lines.append(f'citatusalud_http_requests_total{_labels(route=route, method=method, status=status)} {n}')
+
+    lines += [
+        '# HELP citatusalud_http_request_duration_seconds Latencia de las peticiones.',
+        '# TYPE citatusalud_http_request_duration_seconds histogram',
+    ]
+    for (route, method), histogram in sorted(merged['latency'].items()):
+        acumulado = 0
+        for le, n in zip(LATENCY_BUCKETS + ('+Inf',), histogram[:-1]):
+            acumulado += n
+            lines.append('citatusalud_http_request_duration_seconds_bucket'
+                         f'{_labels(route=route, method=method, le=le)} {acumulado}')
+        lines.append(f'citatusalud_http_request_duration_seconds_sum{_labels(route=route, method=method)} '
+                     f'{histogram[-1]:.6f}')
+        lines.append(f'citatusalud_http_request_duration_seconds_count{_labels(route=route, method=method)} '
+                     f'{acumulado}')
+
+    lines += [
+        '# HELP citatusalud_db_seconds_total Tiempo en la base de datos por ruta.',
+        '# TYPE citatusalud_db_seconds_total counter',
+    ]
+    lines += [f'citatusalud_db_seconds_total{_labels(route=route)} {seconds:.6f}'
+              for route, (seconds, _) in sorted(merged['db'].items())]
+    lines += [
+        '# HELP citatusalud_db_queries_total Consultas SQL por ruta.',
+        '# TYPE citatusalud_db_queries_total counter',
+    ]
+    lines += [f'citatusalud_db_queries_total{_labels(route=route)} {queries}'
+              for route, (_, queries) in sorted(merged['db'].items())]
+
+    lines += [
+        '# HELP citatusalud_cache_requests_total Consultas a cachés por resultado (hit/miss).',
+        '# TYPE citatusalud_cache_requests_total counter',
+    ]
+    for (cache, result), n in sorted(merged['cache'].items()):
+        lines.append(f'citatusalud_cache_requests_total{_labels(cache=cache, result=result)} {n}')
+
+    lines += [
+        '# HELP citatusalud_http_requests_in_flight Peticiones en curso.',
+        '# TYPE citatusalud_http_requests_in_flight gauge',
+        f"citatusalud_http_requests_in_flight {merged['gauges'].get('in_flight', 0)}",
+        '# HELP citatusalud_password_hash_queue_depth Operaciones bcrypt en cola o en ejecución.',
+        '# TYPE citatusalud_password_hash_queue_depth gauge',
+        f"citatusalud_password_hash_queue_depth {merged['gauges'].get('password_hash_queue_depth', 0)}",
+        '# HELP citatusalud_booking_queue_depth Reservas esperando al escritor agrupado.',
+        '# TYPE citatusalud_booking_queue_depth gauge',
+        f"citatusalud_booking_queue_depth {merged['gauges'].get('booking_queue_depth', 0)}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view():
+    directory = current_app.config.get('METRICS_DIR')
+    if directory:
+        flush()
+        merged = merge(_read_snapshots(directory))
+    else:
+        merged = merge([REGISTRY.snapshot(_gauges())])
+    return Response(render(merged), mimetype='text/plain; version=0.0.4')
+
+
+# Los hooks resuelven cada proxy de Flask una sola vez: cada acceso a través
+# del proxy cuesta más que todo el registro de la petición.
+
+def _start_request():
+    request._get_current_object().environ[_START] = time.perf_counter()
+    REGISTRY.request_started()
+
+
+def _record_response(response):
+    req = request._get_current_object()
+    start = req.environ.pop(_START, None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    stats = getattr(g._get_current_object(), 'query_stats', None)
+    rule = req.url_rule
+    REGISTRY.request_finished(
+        rule.rule if rule is not None else _UNMATCHED,
+        req.method,
+        response.status_code,
+        elapsed,
+        stats.total_time if stats is not None else 0.0,
+        stats.count if stats is not None else 0,
+    )
+    if REGISTRY.flusher is None:
+        app = current_app._get_current_object()
+        if app.config['METRICS_DIR']:
+            _start_flusher(app)
+    return response
+
+
+def _record_error(exc):
+    # La marca solo sigue ahí si una excepción impidió after_request. Aquí no se
+    # usan `g` ni current_app: el contexto de aplicación puede haberse cerrado ya.
+    req = request._get_current_object()
+    start = req.environ.pop(_START, None)
+    if start is None:
+        return
+    rule = req.url_rule
+    REGISTRY.request_finished(rule.rule if rule is not None else _UNMATCHED, req.method, 500,
+                              time.perf_counter() - start, 0.0, 0)
+
+
+def init_metrics(app):
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_DIR', None)
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', 1.0)
+    if not app.config['METRICS_ENABLED']:
+        return
+    if app.config['METRICS_DIR']:
+        os.makedirs(app.config['METRICS_DIR'], exist_ok=True)
+    app.before_request(_start_request)
+    app.after_request(_record_response)
+    app.teardown_request(_record_error)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
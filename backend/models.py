@@ -21,13 +21,16 @@ class Especialidad(db.Model):
 class Horario(db.Model):
     __tablename__ = 'horario'
     id = db.Column(db.Integer, primary_key=True)
-    doctorId = db.Column(db.Integer, db.ForeignKey('especialidad.id'), nullable=False)
+    doctorId = db.Column(db.Integer, db.ForeignKey('especialidad.id'), nullable=False, index=True)
     doctor = db.Column(db.String(100), nullable=False)
     especialidad = db.Column(db.String(100), nullable=False)
     detalles = db.relationship('HorarioDetail', backref='horario', lazy=True)
 
 class HorarioDetail(db.Model):
     __tablename__ = 'horario_detail'
+    __table_args__ = (
+        db.Index('ix_horario_detail_horario_fecha', 'horario_id', 'fecha'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date, nullable=False)
     inicio = db.Column(db.String(5), nullable=False)  # HH:mm
@@ -36,6 +39,10 @@ class HorarioDetail(db.Model):
 
 class Cita(db.Model):
     __tablename__ = 'cita'
+    __table_args__ = (
+        db.Index('ix_cita_doctor_fecha_hora', 'doctorId', 'fecha', 'hora'),
+        db.Index('ix_cita_paciente_fecha_hora', 'pacienteId', 'fecha', 'hora'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     pacienteId = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     doctorId = db.Column(db.Integer, db.ForeignKey('especialidad.id'), nullable=False)
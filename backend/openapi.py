@@ -0,0 +1,64 @@
+import hashlib
+import json
+import logging
+import os
+from flask import Response, current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'openapi.json')
+
+
+def build_spec(app):
+    """Genera la especificación a partir de los docstrings YAML de las rutas.
+
+    Los ejemplos de fecha que YAML interpreta como `date` se escriben en ISO.
+    """
+    with app.test_request_context():
+        spec = app.swag.get_apispecs()
+    return (json.dumps(spec, indent=2, sort_keys=True, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+def _load_spec(path):
+    with open(path, 'rb') as f:
+        body = f.read()
+    return body, hashlib.sha256(body).hexdigest()[:16]
+
+
+def openapi_spec():
+    """Sirve la especificación generada por scripts/generate_openapi.py.
+
+    El archivo se lee una sola vez por proceso, en la primera petición.
+    """
+    spec = current_app.extensions.get('openapi_spec')
+    if spec is None:
+        try:
+            spec = _load_spec(current_app.config['OPENAPI_SPEC_PATH'])
+        except FileNotFoundError:
+            return jsonify({"message": "Especificación no generada; ejecute scripts/generate_openapi.py."}), 404
+        current_app.extensions['openapi_spec'] = spec
+
+    body, etag = spec
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def init_openapi(app, template):
+    """Registra /openapi.json y, si SWAGGER_UI está activo, la interfaz de flasgger.
+
+    flasgger solo se importa cuando la interfaz está activa, y su vista de
+    especificación se reemplaza por el archivo estático: los docstrings YAML
+    nunca se analizan mientras la aplicación atiende peticiones.
+    """
+    app.config.setdefault('OPENAPI_SPEC_PATH', SPEC_PATH)
+    app.config.setdefault('SWAGGER_UI', True)
+    app.add_url_rule('/openapi.json', 'openapi_spec', openapi_spec)
+    if not os.path.exists(app.config['OPENAPI_SPEC_PATH']):
+        logger.warning('No existe %s; genere la especificación con scripts/generate_openapi.py.',
+                       app.config['OPENAPI_SPEC_PATH'])
+
+    if app.config['SWAGGER_UI']:
+        from flasgger import Swagger
+        Swagger(app, template=template)
+        app.view_functions['flasgger.apispec_1'] = openapi_spec
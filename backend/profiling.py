@@ -0,0 +1,139 @@
+import cProfile
+import glob
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from flask import Response, current_app, jsonify, request
+from admin import admin_required
+
+_STATE = 'citatusalud.profile'
+_NAME = re.compile(r'^(\d+)-(\d+)-(\d+)ms-(\d{3})-([\w.]+)\.prof$')
+
+# cProfile instala un hook de perfilado global al intérprete en versiones
+# recientes; se perfila como mucho una petición a la vez por proceso.
+_busy = threading.Lock()
+
+
+# Decide antes de crear nada: una petición no elegida solo lee la cabecera
+# X-Profile y la tasa de muestreo; cProfile.Profile se crea para las demás.
+def _should_profile(req, config):
+    provided = req.headers.get('X-Profile')
+    if provided:
+        expected = config.get('ADMIN_TOKEN')
+        if expected and hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+            return True
+    rate = config['PROFILE_SAMPLE_RATE']
+    if not rate or random.random() >= rate:
+        return False
+    endpoints = config['PROFILE_ENDPOINTS']
+    return endpoints is None or req.endpoint in endpoints
+
+
+def _start_profile():
+    req = request._get_current_object()
+    config = current_app._get_current_object().config
+    if not _should_profile(req, config) or not _busy.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    req.environ[_STATE] = {
+        'profiler': profiler,
+        'start': time.perf_counter(),
+        'endpoint': req.endpoint or 'sin_ruta',
+        'directory': config['PROFILE_DIR'],
+        'max_files': config['PROFILE_MAX_FILES'],
+    }
+    profiler.enable()
+
+
+def _save(state, status):
+    state['profiler'].disable()
+    _busy.release()
+    elapsed_ms = int((time.perf_counter() - state['start']) * 1000)
+    name = f"{time.time_ns()}-{os.getpid()}-{elapsed_ms}ms-{status}-{state['endpoint']}.prof"
+    state['profiler'].dump_stats(os.path.join(state['directory'], name))
+
+    # Búfer rotativo: se conservan los `max_files` perfiles más recientes.
+    for path in sorted(glob.glob(os.path.join(state['directory'], '*.prof')))[:-state['max_files']]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    return name
+
+
+def _finish_profile(response):
+    state = request._get_current_object().environ.pop(_STATE, None)
+    if state is not None:
+        response.headers['X-Profile-Id'] = _save(state, response.status_code)
+    return response
+
+
+def _abort_profile(exc):
+    # Solo queda estado si una excepción impidió after_request.
+    state = request._get_current_object().environ.pop(_STATE, None)
+    if state is not None:
+        _save(state, 500)
+
+
+@admin_required
+def list_profiles():
+    perfiles = []
+    for path in sorted(glob.glob(os.path.join(current_app.config['PROFILE_DIR'], '*.prof')), reverse=True):
+        match = _NAME.match(os.path.basename(path))
+        if match:
+            time_ns, pid, elapsed_ms, status, endpoint = match.groups()
+            perfiles.append({
+                "id": match.group(0),
+                "endpoint": endpoint,
+                "estado": int(status),
+                "duracionMs": int(elapsed_ms),
+                "pid": int(pid),
+                "fecha": time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(int(time_ns) / 1e9)),
+            })
+    return jsonify(perfiles), 200
+
+
+@admin_required
+def get_profile(profile_id):
+    """El .prof (pstats) para snakeviz/pstats, o un resumen con ?formato=texto."""
+    path = os.path.join(current_app.config['PROFILE_DIR'], profile_id)
+    if not _NAME.match(profile_id) or not os.path.exists(path):
+        return jsonify({"message": "Perfil no encontrado"}), 404
+
+    if request.args.get('formato') == 'texto':
+        salida = io.StringIO()
+        pstats.Stats(path, stream=salida).sort_stats('cumulative').print_stats(
+            current_app.config['PROFILE_TEXT_LINES'])
+        return Response(salida.getvalue(), mimetype='text/plain')
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    return Response(data, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': f'attachment; filename={profile_id}'})
+
+
+def init_profiling(app):
+    """Perfilado bajo demanda con cProfile.
+
+    Sin PROFILE_DIR no se registra ningún hook. Con él, se perfila la petición
+    si trae `X-Profile: <ADMIN_TOKEN>` o, con PROFILE_SAMPLE_RATE, una fracción
+    aleatoria de las peticiones a PROFILE_ENDPOINTS (todas si es None).
+    """
+    app.config.setdefault('PROFILE_DIR', None)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_ENDPOINTS', None)
+    app.config.setdefault('PROFILE_MAX_FILES', 50)
+    app.config.setdefault('PROFILE_TEXT_LINES', 40)
+    if not app.config['PROFILE_DIR']:
+        return
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abort_profile)
+    app.add_url_rule('/admin/profiles', 'list_profiles', list_profiles)
+    app.add_url_rule('/admin/profiles/<profile_id>', 'get_profile', get_profile)
@@ -0,0 +1,57 @@
+"""Consultas de las rutas más frecuentes.
+
+Están aquí, y no en línea en api.py, para que tests/test_query_plans.py pueda
+comprobar con EXPLAIN QUERY PLAN exactamente las mismas sentencias que ejecuta
+la API.
+"""
+
+from sqlalchemy import tuple_
+from models import db, Especialidad, Horario, HorarioDetail, Cita
+
+CITA_COLUMNAS = (Cita.id, Cita.pacienteId, Cita.doctorId, Cita.especialidad, Cita.fecha, Cita.hora, Cita.motivo)
+
+
+def doctor_id(doctor):
+    """Id de la especialidad (doctor) a partir del nombre del doctor."""
+    return db.select(Especialidad.id).where(Especialidad.doctor == doctor)
+
+
+def horario_del_dia(id_especialidad, fecha):
+    """Primera franja de horario del doctor en la fecha."""
+    return (
+        db.select(HorarioDetail.inicio, HorarioDetail.fin)
+        .join(Horario, HorarioDetail.horario_id == Horario.id)
+        .where(Horario.doctorId == id_especialidad, HorarioDetail.fecha == fecha)
+        .order_by(Horario.id, HorarioDetail.id)
+        .limit(1)
+    )
+
+
+def horas_ocupadas(id_especialidad, fecha):
+    """Horas ya reservadas con el doctor en la fecha."""
+    return db.select(Cita.hora).where(Cita.doctorId == id_especialidad, Cita.fecha == fecha)
+
+
+def cita_en_conflicto(id_especialidad, fecha, hora):
+    """Cita que ya ocupa ese doctor, fecha y hora, si la hay."""
+    return (
+        db.select(Cita.id)
+        .where(Cita.doctorId == id_especialidad, Cita.fecha == fecha, Cita.hora == hora)
+        .limit(1)
+    )
+
+
+def citas_de_paciente(paciente_id, limite, desde=None, hasta=None, posicion=None):
+    """Página de citas del paciente ordenada por (fecha, hora, id).
+
+    `posicion` es la tupla (fecha, hora, id) de la última cita de la página
+    anterior (paginación por cursor).
+    """
+    query = db.select(*CITA_COLUMNAS).where(Cita.pacienteId == paciente_id)
+    if desde is not None:
+        query = query.where(Cita.fecha >= desde)
+    if hasta is not None:
+        query = query.where(Cita.fecha <= hasta)
+    if posicion is not None:
+        query = query.where(tuple_(Cita.fecha, Cita.hora, Cita.id) > posicion)
+    return query.order_by(Cita.fecha, Cita.hora, Cita.id).limit(limite)
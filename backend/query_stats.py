@@ -0,0 +1,304 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from admin import admin_required
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Un endpoint emitió más consultas de las declaradas o repitió una sentencia (N+1)."""
+
+
+class QueryStats:
+    """Acumula las sentencias SQL emitidas durante una petición o un bloque de código."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements = {}
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def repeated(self, threshold):
+        """Sentencias idénticas ejecutadas al menos `threshold` veces (patrón N+1)."""
+        return {stmt: n for stmt, n in self.statements.items() if n >= threshold}
+
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def statement_shape(statement):
+    """Plantilla de una sentencia: literales y listas IN de longitud variable se
+    reducen a marcadores para que las variantes de una misma consulta coincidan."""
+    shape = _LITERAL.sub('?', ' '.join(statement.split()))
+    return _IN_LIST.sub('(?, ...)', shape)
+
+
+def _redact(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f'{type(value).__name__}({len(value)})'
+    return type(value).__name__
+
+
+def redact_parameters(parameters, executemany=False):
+    """Solo tipos (y longitudes) de los parámetros: nunca sus valores."""
+    if executemany:
+        return {'filas': len(parameters), 'primera': redact_parameters(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {name: _redact(value) for name, value in parameters.items()}
+    return [_redact(value) for value in parameters or ()]
+
+
+def _explain(conn, statement, parameters):
+    # Cursor DBAPI propio: no pasa por los eventos del Engine ni toca el cursor
+    # de la sentencia original, cuyas filas pueden estar aún sin leer.
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [str(row[-1]) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as exc:
+        return [f'EXPLAIN no disponible: {exc}']
+
+
+class SlowQueryLog:
+    """Tiempo en base de datos agregado por plantilla de sentencia y registro de lentas.
+
+    Cada sentencia suma a su plantilla (ver `statement_shape`). Las que superan
+    `threshold` segundos se registran como una línea JSON con sus parámetros
+    anonimizados y el endpoint que las emitió; la primera vez que una plantilla
+    es lenta se adjunta su EXPLAIN.
+    """
+
+    def __init__(self, threshold, explain=True, max_statements=2000):
+        self.threshold = threshold
+        self.explain = explain
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._shapes_by_statement = {}
+        self.shapes = {}
+
+    def _shape(self, statement):
+        # Las sentencias compiladas se reutilizan, así que normalizar cada texto
+        # una sola vez deja en una búsqueda en diccionario el coste por consulta.
+        shape = self._shapes_by_statement.get(statement)
+        if shape is None:
+            if len(self._shapes_by_statement) >= self.max_statements:
+                self._shapes_by_statement.clear()
+            shape = self._shapes_by_statement[statement] = statement_shape(statement)
+        return shape
+
+    def record(self, conn, statement, parameters, executemany, elapsed, endpoint):
+        shape = self._shape(statement)
+        slow = elapsed >= self.threshold
+        with self._lock:
+            entry = self.shapes.get(shape)
+            if entry is None:
+                entry = self.shapes[shape] = {
+                    'id': hashlib.sha1(shape.encode('utf-8')).hexdigest()[:12],
+                    'count': 0, 'total': 0.0, 'max': 0.0, 'slow': 0,
+                    'endpoints': {}, 'plan': None,
+                }
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['endpoints'][endpoint] = entry['endpoints'].get(endpoint, 0) + 1
+            if not slow:
+                return
+            entry['slow'] += 1
+            first = entry['slow'] == 1
+
+        record = {
+            'event': 'slow_query',
+            'shape': entry['id'],
+            'endpoint': endpoint,
+            'duration_ms': round(elapsed * 1000, 3),
+            'statement': _single_line(statement, 1000),
+            'parameters': redact_parameters(parameters, executemany),
+        }
+        if first and self.explain:
+            entry['plan'] = record['plan'] = _explain(
+                conn, statement, parameters[0] if executemany else parameters)
+        logger.warning('consulta lenta %s', json.dumps(record, ensure_ascii=False, default=str))
+
+    def report(self):
+        """Plantillas ordenadas por tiempo total en base de datos."""
+        with self._lock:
+            entries = [(shape, dict(entry, endpoints=dict(entry['endpoints'])))
+                       for shape, entry in self.shapes.items()]
+        entries.sort(key=lambda item: item[1]['total'], reverse=True)
+        return [{
+            'id': entry['id'],
+            'sentencia': shape,
+            'ejecuciones': entry['count'],
+            'totalMs': round(entry['total'] * 1000, 3),
+            'mediaMs': round(entry['total'] * 1000 / entry['count'], 3),
+            'maxMs': round(entry['max'] * 1000, 3),
+            'lentas': entry['slow'],
+            'endpoints': entry['endpoints'],
+            'plan': entry['plan'],
+        } for shape, entry in entries]
+
+    def reset(self):
+        with self._lock:
+            self.shapes = {}
+
+
+def _collectors():
+    collectors = getattr(_local, 'collectors', None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors():
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors()
+    starts = conn.info.get('query_start_time')
+    if not collectors or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for stats in collectors:
+        stats.record(statement, elapsed)
+    slow_log = getattr(_local, 'slow_log', None)
+    if slow_log is not None:
+        slow_log.record(conn, statement, parameters, executemany, elapsed, _local.endpoint)
+
+
+@contextmanager
+def count_queries():
+    """Cuenta las consultas emitidas por el hilo actual dentro del bloque.
+
+    Ejemplo::
+
+        with count_queries() as stats:
+            client.get('/get-especialidades')
+        assert stats.count == 1
+    """
+    stats = QueryStats()
+    collectors = _collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+
+def query_budget(max_queries):
+    """Declara el número máximo de consultas que puede emitir un endpoint."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _single_line(statement, limit=200):
+    return ' '.join(statement.split())[:limit]
+
+
+def _start_request_stats():
+    stats = g.query_stats = _local.request_stats = QueryStats()
+    _collectors().append(stats)
+    _local.slow_log = current_app.extensions.get('slow_query_log')
+    _local.endpoint = request.endpoint or 'sin_ruta'
+
+
+def _finish_request_stats(response):
+    stats = getattr(_local, 'request_stats', None)
+    if stats is None:
+        return response
+
+    config = current_app.config
+    show_headers = config.get('SQL_STATS_HEADERS')
+    if show_headers is None:
+        show_headers = current_app.debug
+    if show_headers:
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = f'{stats.total_time * 1000:.3f}'
+        if stats.slowest_statement is not None:
+            response.headers['X-DB-Slowest-Ms'] = f'{stats.slowest_time * 1000:.3f}'
+            response.headers['X-DB-Slowest-Query'] = _single_line(stats.slowest_statement)
+
+    problems = []
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None)
+    if budget is not None and stats.count > budget:
+        problems.append(f'{request.endpoint} emitió {stats.count} consultas (presupuesto: {budget})')
+    for statement, times in stats.repeated(config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)).items():
+        problems.append(f'{request.endpoint} repitió {times} veces: {_single_line(statement)}')
+
+    if problems:
+        strict = config.get('SQL_QUERY_BUDGET_STRICT')
+        if strict is None:
+            strict = current_app.testing
+        if strict:
+            raise QueryBudgetExceeded('; '.join(problems))
+        for problem in problems:
+            logger.warning(problem)
+    return response
+
+
+def _stop_request_stats(exc):
+    # Se usa el estado del hilo y no `g`: el contexto de aplicación puede haberse
+    # cerrado ya cuando el cliente de pruebas desmonta la petición preservada.
+    stats = getattr(_local, 'request_stats', None)
+    _local.request_stats = None
+    _local.slow_log = None
+    collectors = _collectors()
+    if stats is not None and stats in collectors:
+        collectors.remove(stats)
+
+
+@admin_required
+def slow_queries():
+    slow_log = current_app.extensions.get('slow_query_log')
+    if slow_log is None:
+        return jsonify({"message": "Registro de consultas lentas desactivado"}), 404
+    return jsonify(slow_log.report()), 200
+
+
+def init_query_stats(app):
+    """Registra la instrumentación de consultas por petición en la aplicación.
+
+    SQL_SLOW_QUERY_MS (100 por defecto) es el umbral del registro de consultas
+    lentas; con None se desactiva junto con la agregación por plantilla.
+    """
+    app.config.setdefault('SQL_SLOW_QUERY_MS', 100)
+    app.config.setdefault('SQL_SLOW_QUERY_EXPLAIN', True)
+    if app.config['SQL_SLOW_QUERY_MS'] is not None:
+        app.extensions['slow_query_log'] = SlowQueryLog(
+            app.config['SQL_SLOW_QUERY_MS'] / 1000, app.config['SQL_SLOW_QUERY_EXPLAIN'])
+    app.add_url_rule('/admin/slow-queries', 'slow_queries', slow_queries)
+    app.before_request(_start_request_stats)
+    app.after_request(_finish_request_stats)
+    app.teardown_request(_stop_request_stats)
@@ -0,0 +1,150 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+
+class MemoryBucketStore:
+    """Cubetas de tokens en memoria del proceso, con expulsión LRU al superar `maxsize` claves."""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, now):
+        """Consume un token; devuelve 0 si se permitió o los segundos hasta el próximo token."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / rate
+
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+  tokens = capacity
+else
+  tokens = math.min(capacity, tokens + (now - tonumber(bucket[2])) * rate)
+end
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBucketStore:
+    """Cubetas compartidas entre workers en Redis (o compatible).
+
+    Recibe un cliente ya creado (p. ej. `redis.Redis(...)`); el cálculo se hace en
+    un script Lua para que leer y actualizar la cubeta sea atómico.
+    """
+
+    def __init__(self, client, prefix='citatusalud:rl:'):
+        self.prefix = prefix
+        self._take = client.register_script(_REDIS_TAKE)
+
+    def take(self, key, rate, capacity, now):
+        return float(self._take(keys=[self.prefix + key], args=[rate, capacity, now]))
+
+
+class RateLimiter:
+    def __init__(self, store, rules):
+        self.store = store
+        self.rules = rules
+
+    def check(self, rule, value):
+        capacity, period = self.rules[rule]
+        return self.store.take(f'{rule}:{value}', capacity / period, capacity, time.time())
+
+
+def init_rate_limit(app):
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    # (intentos, segundos): ráfaga máxima y tiempo en que se recupera por completo.
+    app.config.setdefault('RATE_LIMIT_LOGIN_IP', (20, 60))
+    app.config.setdefault('RATE_LIMIT_LOGIN_CORREO', (5, 60))
+    app.config.setdefault('RATE_LIMIT_REGISTER_IP', (10, 60))
+    app.config.setdefault('RATE_LIMIT_MAX_KEYS', 100000)
+    # Proxies de confianza delante de la app (nginx, balanceador). Con 0, X-Forwarded-For
+    # se ignora: cualquiera podría falsearla para saltarse el límite por IP.
+    app.config.setdefault('PROXY_FIX_X_FOR', 0)
+    if app.config['PROXY_FIX_X_FOR']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    store = app.config.get('RATE_LIMIT_STORE') or MemoryBucketStore(app.config['RATE_LIMIT_MAX_KEYS'])
+    app.extensions['rate_limiter'] = RateLimiter(store, {
+        'login_ip': app.config['RATE_LIMIT_LOGIN_IP'],
+        'login_correo': app.config['RATE_LIMIT_LOGIN_CORREO'],
+        'register_ip': app.config['RATE_LIMIT_REGISTER_IP'],
+    })
+
+
+def client_ip():
+    """IP del cliente; detrás de un proxy requiere PROXY_FIX_X_FOR o todos comparten la del proxy."""
+    return request.remote_addr or '-'
+
+
+def json_field(name):
+    def key():
+        data = request.get_json(silent=True)
+        value = data.get(name) if isinstance(data, dict) else None
+        return value.strip().lower() if isinstance(value, str) else None
+    return key
+
+
+def rate_limited(*rules):
+    """Aplica cubetas de tokens antes de ejecutar la vista.
+
+    Cada regla es (nombre, función que devuelve la clave); si la clave es None
+    la regla no se aplica. Un rechazo responde 429 sin tocar la base ni bcrypt.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_app.config['RATE_LIMIT_ENABLED']:
+                limiter = current_app.extensions['rate_limiter']
+                for rule, key_func in rules:
+                    value = key_func()
+                    if value is None:
+                        continue
+                    retry_after = limiter.check(rule, value)
+                    if retry_after:
+                        response = jsonify({"message": "Demasiados intentos, intente de nuevo más tarde."})
+                        response.headers['Retry-After'] = str(math.ceil(retry_after))
+                        return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
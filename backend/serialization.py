@@ -0,0 +1,103 @@
+import json
+from datetime import date
+from itertools import islice
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default_iso(o):
+    # Las fechas viajan como YYYY-MM-DD, igual que el strftime de los endpoints.
+    if isinstance(o, date):
+        return o.isoformat()
+    return _default(o)
+
+
+def dumps_bytes(obj, indent=False, sort_keys=False):
+    """Serializa `obj` a JSON en bytes con orjson si está instalado."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default_iso, option=option)
+    return json.dumps(
+        obj,
+        default=_default_iso,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=None if indent else (',', ':'),
+    ).encode('utf-8')
+
+
+def rows_to_dicts(keys, rows):
+    """Convierte tuplas de un resultado Core en dicts sin instanciar objetos ORM."""
+    keys = tuple(keys)
+    return [dict(zip(keys, row)) for row in rows]
+
+
+STREAM_MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_json_rows(keys, rows, formato='json', batch_size=500):
+    """Genera un arreglo JSON (o NDJSON) por bloques a partir de tuplas de resultado.
+
+    Solo mantiene en memoria `batch_size` filas codificadas a la vez.
+    """
+    keys = tuple(keys)
+    rows = iter(rows)
+    if formato == 'ndjson':
+        while batch := list(islice(rows, batch_size)):
+            yield b''.join(dumps_bytes(dict(zip(keys, row))) + b'\n' for row in batch)
+        return
+
+    yield b'['
+    separator = b''
+    while batch := list(islice(rows, batch_size)):
+        yield separator + b','.join(dumps_bytes(dict(zip(keys, row))) for row in batch)
+        separator = b','
+    yield b']\n'
+
+
+def stream_rows_response(keys, rows, formato='json'):
+    """Respuesta en streaming que recorre `rows` mientras se envía el cuerpo."""
+    return current_app.response_class(
+        stream_with_context(iter_json_rows(keys, rows, formato)),
+        mimetype=STREAM_MIMETYPES[formato],
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask respaldado por orjson, con json de la stdlib como respaldo."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {'indent', 'separators', 'sort_keys'}:
+            kwargs.setdefault('default', _default_iso)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(
+            obj,
+            indent=bool(kwargs.get('indent')),
+            sort_keys=kwargs.get('sort_keys', self.sort_keys),
+        ).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,260 @@
+"""Simulador de eventos discretos de la operación de la clínica.
+
+Modela semanas de actividad en tiempo simulado: llegan pacientes, buscan hueco
+día a día con `disponibilidad` (los mismos huecos que GET /horarios-disponibles),
+reservan con `reservar_cita` (el mismo camino que POST /register-cita), algunos
+cancelan y otros no se presentan. Todo ocurre en proceso contra la base de datos
+de la aplicación, sin HTTP ni esperas reales, así que un mes de clínica se
+simula en segundos.
+"""
+
+import heapq
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models import db, User, Especialidad, Horario, HorarioDetail, Cita
+from api import disponibilidad, generar_horarios, reservar_cita
+from query_stats import count_queries
+import queries
+
+LLEGADA = 'llegada'
+CANCELACION = 'cancelacion'
+CONSULTA = 'consulta'
+
+
+def _momento(fecha, hora):
+    return datetime.combine(fecha, datetime.strptime(hora, '%H:%M').time())
+
+
+def _resumen(valores):
+    """p50/p95/media/máximo de una lista (None si está vacía)."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    cortes = statistics.quantiles(ordenados, n=20, method='inclusive') if len(ordenados) > 1 else ordenados * 19
+    return {'p50': round(cortes[9], 2), 'p95': round(cortes[18], 2),
+            'media': round(statistics.fmean(ordenados), 2), 'max': round(ordenados[-1], 2)}
+
+
+class _Simulacion:
+    """Cola de eventos (instante, secuencia, tipo, datos) y estado de la clínica."""
+
+    def __init__(self, rnd, inicio, dias, llegadas_por_dia, horizonte, prob_cancelacion, prob_inasistencia,
+                 apertura, cierre):
+        self.rnd = rnd
+        self.inicio = datetime.combine(inicio, datetime.min.time())
+        self.fin = self.inicio + timedelta(days=dias)
+        self.horizonte = horizonte
+        self.prob_cancelacion = prob_cancelacion
+        self.prob_inasistencia = prob_inasistencia
+        self.apertura, self.cierre = apertura, cierre
+        # Llegadas de Poisson durante el horario de atención telefónica/web.
+        self.tasa = llegadas_por_dia / ((cierre - apertura) * 60)
+        self.eventos = []
+        self._secuencia = 0
+
+        filas = db.session.execute(db.select(Especialidad.nombre, Especialidad.doctor)).all()
+        if not filas:
+            raise ValueError('No hay doctores en la base de datos.')
+        self.doctores = [doctor for _, doctor in filas]
+        self.por_especialidad = defaultdict(list)
+        for nombre, doctor in filas:
+            self.por_especialidad[nombre].append((doctor, nombre))
+        self.pacientes = db.session.scalars(db.select(User.id).where(User.rol == 1)).all()
+        if not self.pacientes:
+            raise ValueError('No hay pacientes en la base de datos.')
+        self.especialidad_de = {doctor: nombre for nombre, doctor in filas}
+
+        self.resultados = Counter()
+        self.esperas = []
+        self.busquedas = []
+        self.operaciones = {fase: Counter() for fase in ('busqueda', 'reserva', 'cancelacion')}
+        self.canceladas = set()
+
+    def programar(self, instante, tipo, datos=None):
+        self._secuencia += 1
+        heapq.heappush(self.eventos, (instante, self._secuencia, tipo, datos))
+
+    def siguiente_llegada(self, ahora):
+        ahora = max(ahora, ahora.replace(hour=self.apertura, minute=0, second=0, microsecond=0))
+        resto = timedelta(minutes=self.rnd.expovariate(self.tasa))
+        # El tiempo fuera de horario no cuenta: lo que sobra pasa a la apertura siguiente.
+        while True:
+            cierre = ahora.replace(hour=self.cierre, minute=0, second=0, microsecond=0)
+            if ahora + resto < cierre:
+                ahora += resto
+                break
+            resto -= cierre - ahora
+            ahora = cierre.replace(hour=self.apertura) + timedelta(days=1)
+        if ahora < self.fin:
+            self.programar(ahora, LLEGADA)
+
+    def _operacion(self, fase, funcion, *args):
+        with count_queries() as stats:
+            resultado = funcion(*args)
+        operaciones = self.operaciones[fase]
+        operaciones['llamadas'] += 1
+        operaciones['consultas'] += stats.count
+        operaciones['tiempo_db'] += stats.total_time
+        return resultado
+
+    def _buscar(self, doctor, fecha):
+        # Igual que GET /horarios-disponibles: resolver el doctor por nombre y calcular huecos.
+        id_especialidad = db.session.scalar(queries.doctor_id(doctor))
+        return id_especialidad, disponibilidad(id_especialidad, fecha)
+
+    def _cancelar(self, cita_id):
+        # Igual que DELETE /citas/<citaId>.
+        cita = db.session.get(Cita, cita_id)
+        if cita is not None:
+            db.session.delete(cita)
+            db.session.commit()
+
+    def llegada(self, ahora):
+        self.siguiente_llegada(ahora)
+        rnd = self.rnd
+        paciente = rnd.choice(self.pacientes)
+        # La demanda de cada especialidad es proporcional a sus doctores.
+        doctores = list(self.por_especialidad[self.especialidad_de[rnd.choice(self.doctores)]])
+        rnd.shuffle(doctores)
+        # El paciente acepta el primer día (desde mañana) con hueco en cualquier doctor.
+        busquedas = 0
+        for dias in range(1, self.horizonte + 1):
+            fecha = (ahora + timedelta(days=dias)).date()
+            for doctor, especialidad in doctores:
+                busquedas += 1
+                id_especialidad, horas = self._operacion('busqueda', self._buscar, doctor, fecha)
+                if not horas:
+                    continue
+                hora = rnd.choice(horas)
+                cita_id = self._operacion('reserva', reservar_cita, paciente, id_especialidad, especialidad,
+                                          fecha, hora, 'Simulación')
+                if cita_id is None:
+                    self.resultados['conflictos'] += 1
+                    continue
+                self.busquedas.append(busquedas)
+                self.reservada(ahora, cita_id, _momento(fecha, hora))
+                return
+        self.busquedas.append(busquedas)
+        self.resultados['sin_hueco'] += 1
+
+    def reservada(self, ahora, cita_id, cita_en):
+        self.resultados['reservas'] += 1
+        self.esperas.append((cita_en - ahora).total_seconds())
+        if self.rnd.random() < self.prob_cancelacion:
+            self.programar(ahora + (cita_en - ahora) * self.rnd.random(), CANCELACION, cita_id)
+        if cita_en < self.fin:
+            self.programar(cita_en, CONSULTA, cita_id)
+
+    def cancelacion(self, ahora, cita_id):
+        self._operacion('cancelacion', self._cancelar, cita_id)
+        self.canceladas.add(cita_id)
+        self.resultados['cancelaciones'] += 1
+
+    def consulta(self, ahora, cita_id):
+        if cita_id in self.canceladas:
+            return
+        if self.rnd.random() < self.prob_inasistencia:
+            self.resultados['inasistencias'] += 1
+        else:
+            self.resultados['atendidas'] += 1
+
+    def ejecutar(self):
+        self.siguiente_llegada(self.inicio)
+        procesados = 0
+        while self.eventos:
+            ahora, _, tipo, datos = heapq.heappop(self.eventos)
+            if ahora >= self.fin:
+                break
+            procesados += 1
+            if tipo == LLEGADA:
+                self.llegada(ahora)
+            elif tipo == CANCELACION:
+                self.cancelacion(ahora, datos)
+            else:
+                self.consulta(ahora, datos)
+        return procesados
+
+    def capacidad(self):
+        """Huecos ofrecidos y citas en la ventana simulada (la franja del día, como la API)."""
+        filas = db.session.execute(
+            db.select(Horario.doctorId, HorarioDetail.fecha, HorarioDetail.inicio, HorarioDetail.fin)
+            .join(Horario, HorarioDetail.horario_id == Horario.id)
+            .where(HorarioDetail.fecha >= self.inicio.date(), HorarioDetail.fecha < self.fin.date())
+            .order_by(Horario.id, HorarioDetail.id)
+        ).all()
+        franjas = {}
+        for doctor_id, fecha, inicio, fin in filas:
+            franjas.setdefault((doctor_id, fecha), (inicio, fin))
+        huecos = sum(len(generar_horarios(inicio, fin)) for inicio, fin in franjas.values())
+        citas = db.session.scalar(
+            db.select(func.count(Cita.id))
+            .where(Cita.fecha >= self.inicio.date(), Cita.fecha < self.fin.date()))
+        return huecos, citas
+
+
+def simulate(app, inicio, dias=30, llegadas_por_dia=120, horizonte=21, prob_cancelacion=0.1,
+             prob_inasistencia=0.08, apertura=8, cierre=20, seed=0):
+    """Simula `dias` días de la clínica desde `inicio` y devuelve el informe.
+
+    Usa (y modifica) la base de datos de `app`, con sus doctores, horarios y
+    pacientes (p. ej. de synthetic.populate). Los pacientes llegan entre las
+    `apertura` y `cierre` horas, buscan hueco hasta `horizonte` días vista y
+    reservan el primero disponible; con `prob_cancelacion` cancelan en algún
+    momento antes de la cita y con `prob_inasistencia` no se presentan.
+
+    La ocupación y la utilización se calculan sobre los huecos de la ventana
+    simulada; las citas que ya existían en ella cuentan como atendidas.
+    """
+    with app.app_context():
+        sim = _Simulacion(random.Random(seed), inicio, dias, llegadas_por_dia, horizonte, prob_cancelacion,
+                          prob_inasistencia, apertura, cierre)
+        reloj = time.perf_counter()
+        eventos = sim.ejecutar()
+        reloj = time.perf_counter() - reloj
+        huecos, citas = sim.capacidad()
+        db.session.remove()
+
+    r = sim.resultados
+    llegadas = len(sim.busquedas)
+    operaciones = {}
+    for fase, c in sim.operaciones.items():
+        operaciones[fase] = {
+            'llamadas': c['llamadas'],
+            'consultas': c['consultas'],
+            'consultas_por_llamada': round(c['consultas'] / c['llamadas'], 2) if c['llamadas'] else None,
+            'tiempo_db_s': round(c['tiempo_db'], 3),
+        }
+    return {
+        'parametros': {
+            'inicio': inicio.isoformat(), 'dias': dias, 'llegadas_por_dia': llegadas_por_dia,
+            'horizonte': horizonte, 'prob_cancelacion': prob_cancelacion,
+            'prob_inasistencia': prob_inasistencia, 'seed': seed,
+        },
+        'pacientes': {
+            'llegadas': llegadas,
+            'reservas': r['reservas'],
+            'sin_hueco': r['sin_hueco'],
+            'conflictos': r['conflictos'],
+            'cancelaciones': r['cancelaciones'],
+            'atendidas': r['atendidas'],
+            'inasistencias': r['inasistencias'],
+            'busquedas_por_paciente': round(sum(sim.busquedas) / llegadas, 2) if llegadas else None,
+        },
+        'espera_dias': _resumen([segundos / 86400 for segundos in sim.esperas]),
+        'capacidad': {
+            'huecos': huecos,
+            'citas': citas,
+            'ocupacion': round(citas / huecos, 4) if huecos else None,
+            'utilizacion': round((citas - r['inasistencias']) / huecos, 4) if huecos else None,
+        },
+        'operaciones_db': operaciones,
+        'rendimiento': {
+            'eventos': eventos,
+            'segundos': round(reloj, 3),
+            'eventos_por_segundo': round(eventos / reloj) if reloj else None,
+        },
+    }
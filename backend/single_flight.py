@@ -0,0 +1,85 @@
+"""Agrupación de lecturas idénticas concurrentes (single-flight).
+
+Cuando se publica la agenda de un doctor popular, cientos de clientes piden a la
+vez la disponibilidad del mismo doctor y fecha. Con SingleFlight solo el primero
+calcula el resultado; los que llegan mientras tanto esperan y reciben el mismo
+valor. No guarda nada una vez terminado el cálculo, así que no hay que
+invalidar: una caché de disponibilidad se pondría delante y llamaría aquí en
+cada fallo.
+"""
+
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+from flask import current_app
+from metrics import cache_event
+
+
+class SingleFlight:
+    """Ejecuta `fn` una sola vez por clave entre las llamadas simultáneas.
+
+    El valor se comparte tal cual entre todos los que esperaban: no debe
+    modificarse. Si el cálculo falla, todos reciben la excepción; la siguiente
+    llamada vuelve a intentarlo.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._reset()
+        _instances.add(self)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    @property
+    def in_flight(self):
+        return len(self._calls)
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        cache_event(self.name, not leader)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._done(key)
+            future.set_exception(e)
+            raise
+        # Se retira antes de publicar: quien llegue después calcula con datos nuevos.
+        self._done(key)
+        future.set_result(result)
+        return result
+
+    def _done(self, key):
+        with self._lock:
+            del self._calls[key]
+
+
+_instances = weakref.WeakSet()
+
+
+def _after_fork():
+    # Los cálculos en curso pertenecen a hilos del padre.
+    for vuelos in list(_instances):
+        vuelos._reset()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def init_single_flight(app):
+    """Agrupación de consultas de disponibilidad idénticas; AVAILABILITY_SINGLE_FLIGHT=False la desactiva."""
+    app.config.setdefault('AVAILABILITY_SINGLE_FLIGHT', True)
+    if app.config['AVAILABILITY_SINGLE_FLIGHT']:
+        app.extensions['availability_flights'] = SingleFlight('availability_single_flight')
+
+
+def availability_flights():
+    return current_app.extensions.get('availability_flights')
@@ -0,0 +1,193 @@
+"""Generador determinista de datos sintéticos a escala de producción.
+
+Con la misma semilla y los mismos tamaños produce exactamente las mismas filas,
+así que dos ejecuciones de un benchmark ven la misma base de datos.
+"""
+
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+import bcrypt
+from sqlalchemy import func, select
+from models import db, User, Especialidad, Horario, HorarioDetail, Cita
+from api import generar_horarios
+
+ESPECIALIDADES = (
+    'Medicina General', 'Cardiología', 'Pediatría', 'Dermatología', 'Ginecología', 'Traumatología',
+    'Oftalmología', 'Neurología', 'Psiquiatría', 'Endocrinología', 'Gastroenterología', 'Neumología',
+    'Urología', 'Otorrinolaringología', 'Reumatología', 'Oncología', 'Nefrología', 'Geriatría',
+)
+NOMBRES = ('Ana', 'Luis', 'María', 'Carlos', 'Lucía', 'Jorge', 'Elena', 'Pablo', 'Sofía', 'Diego',
+           'Carmen', 'Javier', 'Laura', 'Andrés', 'Isabel', 'Miguel', 'Paula', 'Raúl', 'Marta', 'Sergio')
+APELLIDOS = ('García', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Fernández',
+             'Díaz', 'Torres', 'Ramírez', 'Flores', 'Vargas', 'Castro', 'Rojas', 'Morales')
+TURNOS = (('08:00', '14:00'), ('14:00', '20:00'), ('09:00', '13:00'), ('15:00', '19:00'))
+MOTIVOS = ('Control', 'Consulta de seguimiento', 'Primera consulta', 'Revisión de resultados',
+           'Dolor persistente', 'Renovación de receta', 'Chequeo anual')
+
+PASSWORD = 'clave-sintetica'
+# Ocupación máxima media de la agenda: por encima, la popularidad de los doctores
+# más solicitados superaría el 100 % de sus huecos.
+MAX_OCUPACION = 0.7
+
+
+_BCRYPT_ALFABETO = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def _password_hash(rnd, password, rounds):
+    # Sal derivada de la semilla (bcrypt.gensalt usa os.urandom): el hash también
+    # es reproducible. El último carácter solo codifica 2 bits de la sal.
+    sal = ''.join(rnd.choice(_BCRYPT_ALFABETO) for _ in range(21)) + rnd.choice('.Oeu')
+    return bcrypt.hashpw(password.encode('utf-8'), f'$2b${rounds:02d}${sal}'.encode('ascii')).decode('utf-8')
+
+
+def _dias_laborables(desde, anios, dias_semana):
+    dia, fin = desde, date(desde.year + anios, desde.month, desde.day)
+    while dia < fin:
+        if dia.weekday() in dias_semana:
+            yield dia
+        dia += timedelta(days=1)
+
+
+class _Plan:
+    """Agenda de cada doctor, derivada de la semilla antes de insertar nada."""
+
+    def __init__(self, rnd, especialidades, doctores, desde, anios):
+        nombres = ESPECIALIDADES + tuple(f'Especialidad {i}' for i in range(len(ESPECIALIDADES), especialidades))
+        self.especialidades = nombres[:especialidades]
+        self.doctores = []
+        for i in range(1, doctores + 1):
+            # Unos pocos doctores trabajan también los sábados.
+            dias_semana = (0, 1, 2, 3, 4, 5) if rnd.random() < 0.1 else (0, 1, 2, 3, 4)
+            inicio, fin = rnd.choice(TURNOS)
+            self.doctores.append({
+                'id': i,
+                'nombre': f'Dr. {rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {i}',
+                'especialidad': self.especialidades[(i - 1) % especialidades],
+                'dias': list(_dias_laborables(desde, anios, dias_semana)),
+                'inicio': inicio,
+                'fin': fin,
+                'huecos': generar_horarios(inicio, fin),
+                'popularidad': rnd.uniform(0.6, 1.4),
+            })
+        # Popularidad media exactamente 1 para que el total de citas se ajuste al pedido.
+        media = sum(d['popularidad'] for d in self.doctores) / doctores if doctores else 1
+        for doctor in self.doctores:
+            doctor['popularidad'] /= media
+        self.capacidad = sum(len(d['dias']) * len(d['huecos']) for d in self.doctores)
+
+
+def _especialidades(plan, fecha_ingreso):
+    for doctor in plan.doctores:
+        yield {'id': doctor['id'], 'nombre': doctor['especialidad'], 'doctor': doctor['nombre'],
+               'fechaIngreso': fecha_ingreso}
+
+
+def _horarios(plan):
+    for doctor in plan.doctores:
+        yield {'id': doctor['id'], 'doctorId': doctor['id'], 'doctor': doctor['nombre'],
+               'especialidad': doctor['especialidad']}
+
+
+def _horario_detalles(plan):
+    for doctor in plan.doctores:
+        for dia in doctor['dias']:
+            yield {'horario_id': doctor['id'], 'fecha': dia, 'inicio': doctor['inicio'], 'fin': doctor['fin']}
+
+
+def _pacientes(rnd, pacientes, password_hash):
+    for i in range(1, pacientes + 1):
+        yield {'id': i, 'nombre': f'{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}',
+               'correo': f'paciente{i}@clinica.test', 'password': password_hash, 'rol': 1}
+
+
+def _citas(rnd, plan, citas, pacientes):
+    ocupacion = citas / plan.capacidad if plan.capacidad else 0
+    for doctor in plan.doctores:
+        huecos = doctor['huecos']
+        esperadas = ocupacion * doctor['popularidad'] * len(huecos)
+        base = int(esperadas)
+        resto = esperadas - base
+        for dia in doctor['dias']:
+            # Redondeo estocástico: el total se ajusta al pedido en promedio.
+            k = min(base + (rnd.random() < resto), len(huecos))
+            for hora in rnd.sample(huecos, k):
+                yield {
+                    # Sesgo hacia ids bajos: unos pocos pacientes concentran muchas citas.
+                    'pacienteId': int(pacientes * rnd.random() ** 2) + 1,
+                    'doctorId': doctor['id'],
+                    'especialidad': doctor['especialidad'],
+                    'fecha': dia,
+                    'hora': hora,
+                    'motivo': rnd.choice(MOTIVOS),
+                }
+
+
+def populate(engine, seed=0, especialidades=12, doctores=200, pacientes=20000, citas=1000000,
+             desde=date(2023, 1, 1), anios=2, password=PASSWORD, password_rounds=4,
+             batch_size=50000, progress=None):
+    """Llena una base de datos vacía con datos sintéticos y devuelve las filas por tabla.
+
+    Todos los pacientes comparten la contraseña `password` (un único hash con
+    coste `password_rounds`), de modo que los benchmarks pueden iniciar sesión
+    como cualquiera de ellos. Las citas nunca se solapan (doctor, fecha y hora
+    son únicos) y caen siempre dentro de los huecos que ofrece la API; su total
+    se aproxima a `citas`. `progress(tabla, filas)` se llama tras cada lote.
+
+    En SQLite se desactivan el diario y fsync durante la carga, y los índices
+    secundarios se crean al final, que es mucho más rápido que mantenerlos fila
+    a fila.
+    """
+    rnd = random.Random(seed)
+    plan = _Plan(rnd, especialidades, doctores, desde, anios)
+    if citas > plan.capacidad * MAX_OCUPACION:
+        raise ValueError(f'{citas} citas no caben en la agenda: con {doctores} doctores y {anios} años '
+                         f'hay {plan.capacidad} huecos (máximo {int(plan.capacidad * MAX_OCUPACION)} citas).')
+
+    db.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if any(conn.scalar(select(func.count()).select_from(model.__table__))
+               for model in (User, Especialidad, Horario, HorarioDetail, Cita)):
+            raise ValueError('La base de datos ya contiene datos; use una vacía.')
+
+    indices = [index for model in (HorarioDetail, Cita, Horario) for index in model.__table__.indexes]
+    filas = {}
+    with engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql('PRAGMA journal_mode=OFF')
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+            conn.commit()
+        with conn.begin():
+            for index in indices:
+                index.drop(conn)
+            tablas = (
+                (Especialidad, _especialidades(plan, datetime(desde.year, desde.month, desde.day))),
+                (Horario, _horarios(plan)),
+                (HorarioDetail, _horario_detalles(plan)),
+                (User, _pacientes(rnd, pacientes, _password_hash(rnd, password, password_rounds))),
+                (Cita, _citas(rnd, plan, citas, pacientes)),
+            )
+            for model, generador in tablas:
+                tabla = model.__tablename__
+                filas[tabla] = 0
+                while True:
+                    lote = list(islice(generador, batch_size))
+                    if not lote:
+                        break
+                    conn.execute(model.__table__.insert(), lote)
+                    filas[tabla] += len(lote)
+                    if progress is not None:
+                        progress(tabla, filas[tabla])
+            inicio = time.perf_counter()
+            for index in indices:
+                index.create(conn)
+            if progress is not None:
+                progress('índices', round(time.perf_counter() - inicio, 1))
+            if conn.dialect.name == 'sqlite':
+                conn.exec_driver_sql('ANALYZE')
+        if conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql('PRAGMA journal_mode=DELETE')
+            conn.commit()
+    return filas
+
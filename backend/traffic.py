@@ -0,0 +1,267 @@
+"""Grabación de peticiones reales y reproducción para pruebas de rendimiento.
+
+Con RECORD_DIR, cada proceso añade sus peticiones a
+`requests-<pid>-<inicio>.ndjson.gz`: una línea JSON por petición con llegada,
+método, ruta, cuerpo JSON, usuario autenticado, estado y duración. Nunca se
+graban tokens ni contraseñas: los campos `password` se sustituyen por
+REDACTED y la autenticación se guarda como el usuario del token, para volver a
+firmar uno con la clave del entorno donde se reproduce.
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, g, request
+from itsdangerous import URLSafeTimedSerializer
+from auth import TOKEN_SALT
+from loadtest import percentiles
+from serialization import dumps_bytes
+
+REDACTED = '***'
+_START = 'citatusalud.record_start'
+
+
+def redact(value):
+    """Copia de un cuerpo JSON con los campos `password` ocultos (a cualquier nivel)."""
+    if isinstance(value, dict):
+        return {k: REDACTED if k == 'password' else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def _restore(value, password):
+    if isinstance(value, dict):
+        return {k: password if v == REDACTED and k == 'password' else _restore(v, password)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore(v, password) for v in value]
+    return value
+
+
+class TrafficRecorder:
+    """Escritor gzip de solo añadir, uno por proceso.
+
+    Los registros se acumulan en el compresor y se vuelcan con un Z_SYNC_FLUSH
+    como mucho cada `flush_interval` segundos (o al cerrar): lo volcado se puede
+    leer en cualquier momento aunque el proceso muera sin cerrar el archivo.
+    Se usa un descriptor propio y no GzipFile para que un hijo tras fork pueda
+    descartar el archivo del padre sin escribir en él.
+    """
+
+    def __init__(self, directory, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._fd = None
+        self._compressor = None
+        self._flushed_at = 0.0
+        self.path = None
+
+    def _open(self):
+        self.path = os.path.join(self.directory, f'requests-{os.getpid()}-{time.time_ns()}.ndjson.gz')
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._compressor = zlib.compressobj(wbits=31)
+
+    def write(self, record):
+        line = dumps_bytes(record) + b'\n'
+        now = time.monotonic()
+        with self._lock:
+            if self._fd is None:
+                self._open()
+            data = self._compressor.compress(line)
+            if now - self._flushed_at >= self.flush_interval:
+                data += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+                self._flushed_at = now
+            if data:
+                os.write(self._fd, data)
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, self._compressor.flush(zlib.Z_SYNC_FLUSH))
+                self._flushed_at = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, self._compressor.flush())
+                os.close(self._fd)
+                self._fd = None
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+_recorders = weakref.WeakSet()
+
+
+def _after_fork():
+    for recorder in list(_recorders):
+        recorder.after_fork()
+
+
+def _close_all():
+    for recorder in list(_recorders):
+        recorder.close()
+
+
+# Un solo par de hooks por proceso: con métodos de cada grabador registrados,
+# sus archivos seguirían abiertos hasta la salida del proceso.
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(_close_all)
+
+
+def _record_start():
+    request._get_current_object().environ[_START] = (time.time(), time.perf_counter())
+
+
+def _record(response):
+    req = request._get_current_object()
+    start = req.environ.pop(_START, None)
+    if start is None:
+        return response
+    app = current_app._get_current_object()
+    if req.path.startswith(app.config['RECORD_EXCLUDE']):
+        return response
+
+    body = None
+    if req.is_json and (req.content_length or 0) <= app.config['RECORD_MAX_BODY']:
+        body = redact(req.get_json(silent=True))
+    rule = req.url_rule
+    app.extensions['traffic_recorder'].write({
+        't': round(start[0], 6),
+        'method': req.method,
+        'path': req.full_path.rstrip('?'),
+        'rule': rule.rule if rule is not None else None,
+        'body': body,
+        'usuario': getattr(g._get_current_object(), 'usuario', None),
+        'admin': 'X-Admin-Token' in req.headers,
+        'status': response.status_code,
+        'dur_ms': round((time.perf_counter() - start[1]) * 1000, 3),
+    })
+    return response
+
+
+def init_traffic(app):
+    """Grabación opcional de tráfico; sin RECORD_DIR no se registra ningún hook."""
+    app.config.setdefault('RECORD_DIR', None)
+    app.config.setdefault('RECORD_MAX_BODY', 64 * 1024)
+    app.config.setdefault('RECORD_FLUSH_INTERVAL', 1.0)
+    app.config.setdefault('RECORD_EXCLUDE', ('/metrics', '/admin/', '/apidocs', '/flasgger_static', '/openapi.json'))
+    if not app.config['RECORD_DIR']:
+        return
+    os.makedirs(app.config['RECORD_DIR'], exist_ok=True)
+    recorder = app.extensions['traffic_recorder'] = TrafficRecorder(
+        app.config['RECORD_DIR'], app.config['RECORD_FLUSH_INTERVAL'])
+    _recorders.add(recorder)
+    app.before_request(_record_start)
+    app.after_request(_record)
+
+
+def read_records(paths):
+    """Registros de uno o varios archivos (o directorios) ordenados por llegada.
+
+    Tolera archivos de procesos que siguen escribiendo o que murieron sin
+    cerrarlos (falta el final del flujo gzip).
+    """
+    files = []
+    for path in paths:
+        files += sorted(glob.glob(os.path.join(path, '*.ndjson.gz'))) if os.path.isdir(path) else [path]
+    records = []
+    for path in files:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.endswith('\n'):
+                        records.append(json.loads(line))
+            except EOFError:
+                pass
+    records.sort(key=lambda r: r['t'])
+    return records
+
+
+def token_signer(secret_key):
+    """`token_for` para replay(): firma tokens como el servidor con esa SECRET_KEY."""
+    return URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT).dumps
+
+
+def replay(records, transport, speed=1.0, concurrency=32, password=None, token_for=None, admin_token=None):
+    """Vuelve a emitir `records` con `transport` (ver loadtest) y devuelve un informe.
+
+    `speed` acelera el ritmo original (2 = el doble de rápido); con 0 o None se
+    emiten tan rápido como lo permita `concurrency`. Las peticiones autenticadas
+    llevan un token de `token_for(usuario)` y los campos `password` ocultos se
+    sustituyen por `password` (p. ej. la contraseña de los datos sintéticos).
+    """
+    lock = threading.Lock()
+    by_rule = {}
+
+    def send(record, scheduled):
+        lag = time.perf_counter() - scheduled
+        headers = {}
+        if record.get('usuario') and token_for is not None:
+            headers['Authorization'] = f"Bearer {token_for(record['usuario'])}"
+        if record.get('admin') and admin_token:
+            headers['X-Admin-Token'] = admin_token
+        body = record['body']
+        if body is not None and password is not None:
+            body = _restore(body, password)
+        inicio = time.perf_counter()
+        try:
+            status, _ = transport.request(record['method'], record['path'], body, headers)
+        except Exception:
+            status = None
+        elapsed = time.perf_counter() - inicio
+        key = f"{record['method']} {record['rule'] or record['path']}"
+        with lock:
+            stats = by_rule.setdefault(key, {'recorded': [], 'replayed': [], 'lag': [], 'mismatches': 0, 'errors': 0})
+            stats['recorded'].append(record['dur_ms'] / 1000)
+            stats['replayed'].append(elapsed)
+            stats['lag'].append(max(lag, 0.0))
+            if status is None:
+                stats['errors'] += 1
+            elif status != record['status']:
+                stats['mismatches'] += 1
+
+    inicio = time.perf_counter()
+    if records:
+        t0 = records[0]['t']
+        with ThreadPoolExecutor(concurrency) as pool:
+            for record in records:
+                scheduled = inicio + (record['t'] - t0) / speed if speed else time.perf_counter()
+                espera = scheduled - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                pool.submit(send, record, scheduled)
+    elapsed = time.perf_counter() - inicio
+
+    endpoints = {}
+    for key, stats in sorted(by_rule.items()):
+        endpoints[key] = {
+            'requests': len(stats['replayed']),
+            'status_mismatches': stats['mismatches'],
+            'errors': stats['errors'],
+            'recorded_latency': percentiles(stats['recorded']),
+            'replayed_latency': percentiles(stats['replayed']),
+            'dispatch_lag': percentiles(stats['lag']),
+        }
+    span = records[-1]['t'] - records[0]['t'] if records else 0
+    return {
+        'requests': len(records),
+        'recorded_span_s': round(span, 3),
+        'replay_duration_s': round(elapsed, 3),
+        'speed': speed or None,
+        'status_mismatches': sum(e['status_mismatches'] for e in endpoints.values()),
+        'endpoints': endpoints,
+    }
@@ -0,0 +1,138 @@
+import json
+import logging
+import re
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+TYPE_NAMES = {
+    'object': 'objeto',
+    'array': 'lista',
+    'string': 'texto',
+    'integer': 'entero',
+    'number': 'número',
+    'boolean': 'booleano',
+}
+
+_TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+}
+
+
+def _join(path, name):
+    return f'{path}.{name}' if path else name
+
+
+def compile_schema(schema):
+    """Convierte un esquema Swagger 2.0 en una función `validar(valor, ruta)`.
+
+    La función devuelve el primer error encontrado o None. Solo se interpreta
+    lo que usan los specs de la API: type, properties, required, items y
+    pattern. Un
+    campo con valor null se trata como ausente, para que las vistas sigan
+    respondiendo con sus propios mensajes de campos requeridos.
+    """
+    tipo = schema.get('type')
+    type_check = _TYPE_CHECKS.get(tipo)
+
+    if tipo == 'object':
+        properties = {name: compile_schema(sub) for name, sub in schema.get('properties', {}).items()}
+        required = tuple(schema.get('required', ()))
+
+        def validate(value, path):
+            if not type_check(value):
+                return f"'{path or 'cuerpo'}' debe ser de tipo {TYPE_NAMES[tipo]}."
+            for name in required:
+                if value.get(name) is None:
+                    return f"El campo '{_join(path, name)}' es requerido."
+            for name, validate_property in properties.items():
+                item = value.get(name)
+                if item is not None:
+                    error = validate_property(item, _join(path, name))
+                    if error:
+                        return error
+            return None
+        return validate
+
+    if tipo == 'array':
+        validate_item = compile_schema(schema.get('items', {}))
+
+        def validate(value, path):
+            if not type_check(value):
+                return f"'{path}' debe ser de tipo {TYPE_NAMES[tipo]}."
+            for indice, item in enumerate(value):
+                if item is None:
+                    return f"'{path}[{indice}]' no puede ser null."
+                error = validate_item(item, f'{path}[{indice}]')
+                if error:
+                    return error
+            return None
+        return validate
+
+    if type_check is None:
+        return lambda value, path: None
+
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+
+    def validate(value, path):
+        if not type_check(value):
+            return f"'{path}' debe ser de tipo {TYPE_NAMES[tipo]}."
+        if pattern is not None and not pattern.search(value):
+            return f"'{path}' no tiene el formato esperado."
+        return None
+    return validate
+
+
+def _spec_path(rule):
+    # '/citas/<int:citaId>' -> '/citas/{citaId}', como en la especificación.
+    return re.sub(r'<(?:[^<>:]+:)?([^<>]+)>', r'{\1}', rule)
+
+
+def build_validators(app, spec):
+    """Valida los cuerpos de cada (regla, método) que declara un parámetro `in: body`."""
+    validators = {}
+    for rule in app.url_map.iter_rules():
+        operations = spec.get('paths', {}).get(_spec_path(rule.rule), {})
+        for method in rule.methods:
+            operation = operations.get(method.lower(), {})
+            for parameter in operation.get('parameters', ()):
+                if parameter.get('in') == 'body' and 'schema' in parameter:
+                    validators[(rule.rule, method)] = compile_schema(parameter['schema'])
+    return validators
+
+
+def _validate_request():
+    if request.url_rule is None:
+        return None
+    validate = current_app.extensions['request_validators'].get((request.url_rule.rule, request.method))
+    if validate is None:
+        return None
+
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"message": "Se requiere un cuerpo JSON."}), 400
+    error = validate(data, '')
+    if error:
+        return jsonify({"message": error}), 400
+    return None
+
+
+def init_validation(app):
+    """Compila los validadores a partir de la especificación estática.
+
+    Debe llamarse con todas las rutas registradas. Las peticiones inválidas se
+    rechazan en before_request, antes de la vista y de cualquier consulta.
+    """
+    try:
+        with open(app.config['OPENAPI_SPEC_PATH'], encoding='utf-8') as f:
+            spec = json.load(f)
+    except FileNotFoundError:
+        logger.warning('Sin especificación no se validan los cuerpos de las peticiones.')
+        spec = {}
+    app.extensions['request_validators'] = build_validators(app, spec)
+    app.before_request(_validate_request)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de avalancha de reservas: reservas/s con y sin escritor agrupado
+
+Simula la apertura de un mes nuevo de agenda: muchos hilos reservan a la vez
+huecos distintos con `reservar_cita`, el mismo camino que POST /register-cita,
+sobre una base SQLite en archivo (con fsync en cada commit). Se mide primero
+con un commit por reserva y después con cada ventana de --agrupar-ms.
+
+Uso:
+    python scripts/bench_booking_burst.py
+    python scripts/bench_booking_burst.py --hilos 32 --reservas 100 --agrupar-ms 1 2 5 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from api import create_app, db, generar_horarios, reservar_cita
+import synthetic
+
+DESDE = date(2024, 1, 1)
+
+
+def medir(directorio, ventana_ms, hilos, reservas, doctores):
+    ruta = os.path.join(directorio, f'avalancha-{ventana_ms}.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta}', 'SECRET_KEY': 'bench', 'SWAGGER_UI': False,
+                      'BOOKING_GROUP_COMMIT_MS': ventana_ms})
+    with app.app_context():
+        synthetic.populate(db.engine, doctores=doctores, pacientes=hilos, citas=0, desde=DESDE, anios=1)
+    # Huecos distintos para cada reserva: doctor x día laborable x hora.
+    horas = generar_horarios('09:00', '13:00')
+    dias = [DESDE + timedelta(days=i) for i in range(31, 120) if (DESDE + timedelta(days=i)).weekday() < 5]
+    huecos = [(doctor, dia, hora) for dia in dias for hora in horas for doctor in range(1, doctores + 1)]
+    if len(huecos) < hilos * reservas:
+        raise SystemExit(f'Solo hay {len(huecos)} huecos para {hilos * reservas} reservas; suba --doctores.')
+    errores = []
+    barrera = threading.Barrier(hilos + 1)
+
+    def usuario(i):
+        with app.app_context():
+            barrera.wait()
+            for doctor, dia, hora in huecos[i::hilos][:reservas]:
+                try:
+                    if reservar_cita(i + 1, doctor, 'Benchmark', dia, hora, 'Avalancha') is None:
+                        errores.append('conflicto')
+                except Exception as e:
+                    errores.append(type(e).__name__)
+            db.session.remove()
+
+    trabajadores = [threading.Thread(target=usuario, args=(i,)) for i in range(hilos)]
+    for hilo in trabajadores:
+        hilo.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    writer = app.extensions.get('booking_writer')
+    commits = writer.commits if writer is not None else hilos * reservas
+    if writer is not None:
+        writer.close()
+    return hilos * reservas / segundos, commits, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hilos', type=int, default=16, help='peticiones simultáneas')
+    parser.add_argument('--reservas', type=int, default=50, help='reservas por hilo')
+    parser.add_argument('--doctores', type=int, default=50)
+    parser.add_argument('--agrupar-ms', type=float, nargs='+', default=[2, 5], help='ventanas a probar')
+    args = parser.parse_args()
+
+    total = args.hilos * args.reservas
+    print(f"{'modo':<16} {'reservas/s':>11} {'commits':>8} {'reservas/commit':>16}  errores")
+    with tempfile.TemporaryDirectory() as directorio:
+        for ventana in [None] + args.agrupar_ms:
+            por_segundo, commits, errores = medir(directorio, ventana, args.hilos, args.reservas, args.doctores)
+            modo = 'commit propio' if ventana is None else f'agrupado {ventana:g} ms'
+            print(f"{modo:<16} {por_segundo:>11.0f} {commits:>8} {total / commits:>16.1f}  {len(errores)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga del flujo de reserva: pacientes por segundo de extremo a extremo
+
+Cada usuario virtual repite login → especialidades → doctores → disponibilidad →
+reservar → listar citas → cancelar. Informa p50/p95/p99 y peticiones/s por
+endpoint y flujos completos por segundo, y guarda un informe JSON que se puede
+comparar con el de otra versión.
+
+Sin --url se prueba en proceso con el cliente de pruebas sobre una base
+sintética temporal. Con --url se ataca un servidor en marcha (p. ej. gunicorn)
+cuya base se haya creado con scripts/generate_synthetic_data.py usando los mismos
+--pacientes, --desde, --anios y --rounds igual al BCRYPT_LOG_ROUNDS del servidor
+(si no, el primer login de cada paciente recalcula su hash). Arranque el servidor
+con RATE_LIMIT_ENABLED=0: todos los logins llegan desde la misma IP.
+
+Uso:
+    python scripts/bench_booking_flow.py --concurrencia 8 --duracion 30 --salida informe.json
+    python scripts/bench_booking_flow.py --url http://127.0.0.1:8000 --pacientes 200000 --comparar base.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import loadtest
+
+
+def transporte_en_proceso(args, directorio):
+    from api import create_app, db
+    import synthetic
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directorio, 'carga.db')}",
+                      'SECRET_KEY': 'bench', 'SWAGGER_UI': False, 'RATE_LIMIT_ENABLED': False})
+    with app.app_context():
+        synthetic.populate(db.engine, seed=args.semilla, doctores=args.doctores, pacientes=args.pacientes,
+                           citas=args.citas, desde=args.desde, anios=args.anios,
+                           password_rounds=app.config['BCRYPT_LOG_ROUNDS'])
+    return loadtest.TestClientTransport(app), 'test_client'
+
+
+def imprimir(informe):
+    flujos = informe['flows']
+    print(f"flujos completos: {flujos['completed']}  fallidos: {flujos['failed']} {flujos['failures'] or ''}")
+    if flujos['latency']:
+        print(f"pacientes/s: {flujos['flows_per_second']:.2f}  flujo p50 {flujos['latency']['p50_ms']:.1f}ms "
+              f"p95 {flujos['latency']['p95_ms']:.1f}ms p99 {flujos['latency']['p99_ms']:.1f}ms")
+    print(f"{'endpoint':<30} {'n':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9}  estados")
+    for paso, datos in informe['endpoints'].items():
+        lat = datos['latency']
+        if lat is None:
+            continue
+        print(f"{paso:<30} {datos['requests']:>7} {datos['throughput_rps']:>8.1f} {lat['p50_ms']:>7.1f}ms "
+              f"{lat['p95_ms']:>7.1f}ms {lat['p99_ms']:>7.1f}ms  {datos['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='servidor a probar; sin él se usa el cliente de pruebas en proceso')
+    parser.add_argument('--concurrencia', type=int, default=8, help='usuarios virtuales simultáneos')
+    parser.add_argument('--duracion', type=float, default=None, help='segundos de carga')
+    parser.add_argument('--flujos', type=int, default=None, help='flujos en total (alternativa a --duracion)')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--pacientes', type=int, default=2000)
+    parser.add_argument('--doctores', type=int, default=50, help='solo en proceso')
+    parser.add_argument('--citas', type=int, default=50000, help='solo en proceso')
+    parser.add_argument('--desde', type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument('--anios', type=int, default=2)
+    parser.add_argument('--salida', help='archivo donde guardar el informe JSON')
+    parser.add_argument('--comparar', help='informe JSON de referencia; muestra la variación en %%')
+    args = parser.parse_args()
+    if args.duracion is None and args.flujos is None:
+        args.duracion = 30
+
+    with tempfile.TemporaryDirectory() as directorio:
+        if args.url:
+            transporte, destino = loadtest.HTTPTransport(args.url), args.url
+        else:
+            transporte, destino = transporte_en_proceso(args, directorio)
+        informe = loadtest.run_load(transporte, concurrency=args.concurrencia, duration=args.duracion,
+                                    flows=args.flujos, seed=args.semilla, pacientes=args.pacientes,
+                                    desde=args.desde, anios=args.anios, target=destino)
+
+    imprimir(informe)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(informe, f, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        print(f"\nvariación frente a {args.comparar} (positivo = peor):")
+        for fila, cambios in loadtest.compare(base, informe).items():
+            print(f"{fila:<30} " + '  '.join(f"{k} {v:+.1f}%" for k, v in cambios.items() if v is not None))
+
+
+if __name__ == "__main__":
+    main()
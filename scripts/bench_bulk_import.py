@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark de importación masiva de usuarios: usuarios/segundo según procesos
+
+Importa el mismo lote de usuarios en una base temporal vacía con 1, 2, 4...
+procesos de hashing (hasta el número de núcleos) y muestra el escalado.
+
+Uso:
+    python scripts/bench_bulk_import.py --usuarios 400 --rounds 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+
+from api import app, db
+from bulk_import import import_users
+from hashing import PasswordHasher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, default=400)
+    parser.add_argument('--rounds', type=int, default=None, help='coste bcrypt (por defecto BCRYPT_LOG_ROUNDS)')
+    parser.add_argument('--lote', type=int, default=500)
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= nucleos:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != nucleos:
+        workers.append(nucleos)
+
+    rounds = args.rounds or app.config['BCRYPT_LOG_ROUNDS']
+    print(f"usuarios={args.usuarios} rounds={rounds} núcleos={nucleos}")
+    print(f"{'workers':>8} {'segundos':>10} {'usuarios/s':>12} {'aceleración':>12}")
+    base = None
+    try:
+        with app.app_context():
+            for n in workers:
+                db.drop_all()
+                db.create_all()
+                registros = [{'nombre': f'Paciente {i}', 'correo': f'paciente{i}@clinica.test', 'password': f'clave{i}'}
+                             for i in range(args.usuarios)]
+                inicio = time.perf_counter()
+                hasher = PasswordHasher(n, max_pending=1, rounds=rounds)
+                try:
+                    resumen = import_users(registros, hasher, args.lote)
+                finally:
+                    hasher.shutdown()
+                segundos = time.perf_counter() - inicio
+                tasa = resumen['creados'] / segundos
+                base = base or tasa
+                print(f"{n:>8} {segundos:>10.2f} {tasa:>12.1f} {tasa / base:>11.2f}x")
+    finally:
+        os.close(_fd)
+        os.unlink(_db_path)
+
+
+if __name__ == "__main__":
+    main()
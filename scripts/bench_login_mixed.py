@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga mixta: ráfaga de logins + consultas de disponibilidad
+
+Simula un servidor con N hilos de atención (como gunicorn --threads N) que
+recibe llegadas a ritmo fijo de /login y /horarios-disponibles, y compara:
+
+  - en línea: bcrypt se calcula en el hilo de la petición, sin límite
+  - pool: bcrypt en el pool de procesos acotado, con rechazo 503 al saturarse
+
+Informa latencia p50/p95/p99 de disponibilidad y el resultado de los logins.
+
+Uso:
+    python scripts/bench_login_mixed.py --duracion 10 --logins 40 --disponibilidad 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+
+from api import app, db
+from hashing import PasswordHasher
+from models import User, Especialidad, Horario, HorarioDetail
+
+
+def preparar_datos():
+    with app.app_context():
+        db.create_all()
+        hasher = app.extensions['password_hasher']
+        db.session.add(User(nombre='Paciente', correo='paciente@test.com',
+                            password=hasher.generate_password_hash('password123'), rol=1))
+        especialidad = Especialidad(nombre='Cardiología', doctor='Dr. Bench', fechaIngreso=datetime(2024, 1, 1))
+        db.session.add(especialidad)
+        db.session.commit()
+        horario = Horario(doctorId=especialidad.id, doctor='Dr. Bench', especialidad='Cardiología')
+        db.session.add(horario)
+        db.session.commit()
+        db.session.add(HorarioDetail(fecha=date(2024, 12, 15), inicio='08:00', fin='18:00', horario_id=horario.id))
+        db.session.commit()
+
+
+def login(client):
+    return client.post('/login', data=json.dumps({'correo': 'paciente@test.com', 'password': 'password123'}),
+                       content_type='application/json').status_code
+
+
+def disponibilidad(client):
+    return client.get('/horarios-disponibles?doctorId=Dr. Bench&fecha=2024-12-15').status_code
+
+
+def ejecutar(hilos, duracion, tasa_login, tasa_disponibilidad):
+    latencias = {'login': [], 'disponibilidad': []}
+    estados = {'login': Counter(), 'disponibilidad': Counter()}
+    lock = threading.Lock()
+
+    def atender(tipo, programado):
+        with app.test_client() as client:
+            status = login(client) if tipo == 'login' else disponibilidad(client)
+        with lock:
+            latencias[tipo].append(time.perf_counter() - programado)
+            estados[tipo][status] += 1
+
+    llegadas = sorted(
+        [(i / tasa_login, 'login') for i in range(int(duracion * tasa_login))] +
+        [(i / tasa_disponibilidad, 'disponibilidad') for i in range(int(duracion * tasa_disponibilidad))]
+    )
+    with ThreadPoolExecutor(hilos) as pool:
+        inicio = time.perf_counter()
+        for offset, tipo in llegadas:
+            espera = inicio + offset - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            pool.submit(atender, tipo, inicio + offset)
+    return latencias, estados
+
+
+def percentiles(valores):
+    cortes = statistics.quantiles(valores, n=100)
+    return cortes[49] * 1000, cortes[94] * 1000, cortes[98] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duracion', type=float, default=10, help='segundos de carga por modo')
+    parser.add_argument('--hilos', type=int, default=8, help='hilos de atención del servidor simulado')
+    parser.add_argument('--logins', type=float, default=40, help='logins por segundo')
+    parser.add_argument('--disponibilidad', type=float, default=200, help='consultas de disponibilidad por segundo')
+    parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help='procesos del pool de hashing')
+    args = parser.parse_args()
+
+    preparar_datos()
+    # Todos los logins usan el mismo correo; aquí se mide bcrypt, no el limitador.
+    app.config['RATE_LIMIT_ENABLED'] = False
+    rounds = app.config['BCRYPT_LOG_ROUNDS']
+    modos = {
+        'en línea': PasswordHasher(workers=0, max_pending=10 ** 6, rounds=rounds),
+        'pool': PasswordHasher(workers=args.workers, max_pending=args.workers * 4, rounds=rounds),
+    }
+
+    print(f"hilos={args.hilos} logins/s={args.logins} disponibilidad/s={args.disponibilidad} "
+          f"duración={args.duracion}s rounds={rounds} workers pool={args.workers}")
+    print(f"{'modo':<10} {'disp p50':>9} {'disp p95':>9} {'disp p99':>9} {'login p50':>10} {'login 200':>10} {'login 503':>10}")
+    try:
+        for nombre, hasher in modos.items():
+            app.extensions['password_hasher'] = hasher
+            latencias, estados = ejecutar(args.hilos, args.duracion, args.logins, args.disponibilidad)
+            p50, p95, p99 = percentiles(latencias['disponibilidad'])
+            login_p50 = statistics.median(latencias['login']) * 1000
+            print(f"{nombre:<10} {p50:>8.1f}ms {p95:>8.1f}ms {p99:>8.1f}ms {login_p50:>8.1f}ms "
+                  f"{estados['login'][200]:>10} {estados['login'][503]:>10}")
+            hasher.shutdown()
+    finally:
+        os.close(_fd)
+        os.unlink(_db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark del coste de recolección de métricas por petición
+
+Mide tres niveles:
+
+  - registro: request_started + request_finished sobre el registro del proceso
+  - hooks: before_request + after_request de metrics dentro de un contexto de
+    petición (lo que se añade realmente a cada petición)
+  - extremo a extremo: GET /openapi.json con el cliente de pruebas, con y sin
+    métricas, alternando rondas y tomando la mejor (el ruido de Flask y del
+    cliente es mayor que la diferencia)
+
+Uso:
+    python scripts/bench_metrics.py --iteraciones 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from flask import Response
+from api import create_app
+import metrics
+
+
+def por_operacion(funcion, iteraciones):
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iteraciones', type=int, default=200000, help='operaciones por medición directa')
+    parser.add_argument('--peticiones', type=int, default=2000, help='peticiones por ronda extremo a extremo')
+    parser.add_argument('--rondas', type=int, default=5, help='rondas alternadas extremo a extremo')
+    args = parser.parse_args()
+
+    registro = metrics.MetricsRegistry()
+
+    def registrar():
+        registro.request_started()
+        registro.request_finished('/get-especialidades', 'GET', 200, 0.0123, 0.001, 1)
+
+    print(f"registro:        {por_operacion(registrar, args.iteraciones):6.2f} µs/petición")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'bench', 'SWAGGER_UI': False,
+                          'METRICS_DIR': directorio})
+        respuesta = Response(status=200)
+        with app.test_request_context('/get-especialidades'):
+            def hooks():
+                metrics._start_request()
+                metrics._record_response(respuesta)
+
+            print(f"hooks:           {por_operacion(hooks, args.iteraciones):6.2f} µs/petición")
+
+        clientes = {}
+        for habilitadas in (False, True):
+            app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'bench', 'SWAGGER_UI': False,
+                              'METRICS_ENABLED': habilitadas, 'METRICS_DIR': directorio})
+            clientes[habilitadas] = app.test_client()
+            clientes[habilitadas].get('/openapi.json')
+        mejores = {False: float('inf'), True: float('inf')}
+        for _ in range(args.rondas):
+            for habilitadas, client in clientes.items():
+                tiempo = por_operacion(lambda: client.get('/openapi.json'), args.peticiones)
+                mejores[habilitadas] = min(mejores[habilitadas], tiempo)
+        for habilitadas, tiempo in mejores.items():
+            print(f"extremo a extremo ({'con' if habilitadas else 'sin'} métricas): {tiempo:8.1f} µs/petición")
+
+
+if __name__ == "__main__":
+    main()
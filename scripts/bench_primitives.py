@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks de las primitivas de agenda con umbrales de regresión
+
+Mide generación de huecos (generar_horarios), filtrado de huecos libres
+(horarios_libres), serialización de listados y resolución de doctor por nombre,
+con tamaños realistas, y compara con la línea base guardada en
+bench_primitives_baseline.json. Termina con código 1 si alguna primitiva es más
+lenta que la base por encima de la tolerancia.
+
+Los tiempos se normalizan con una carga de calibración medida en la misma
+ejecución, para que la base sirva (aproximadamente) en otra máquina; para
+comparaciones finas, regenere la base en la máquina de CI.
+
+Uso:
+    python scripts/bench_primitives.py                  # compara con la base
+    python scripts/bench_primitives.py --actualizar     # guarda una base nueva
+    python scripts/bench_primitives.py --tolerancia 0.3 --filtro horarios
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from api import CITA_CAMPOS, generar_horarios, horarios_libres
+from serialization import dumps_bytes, orjson, rows_to_dicts
+from models import Especialidad
+import queries
+import synthetic
+
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_primitives_baseline.json')
+
+
+def calibracion():
+    # Trabajo Python puro y estable (cadenas, dicts, ordenación) de referencia.
+    datos = {str(i): i * 7 % 13 for i in range(300)}
+    return sorted(datos, key=datos.get)
+
+
+def citas(n):
+    inicio = date(2024, 1, 1)
+    return [(i, 1 + i % 500, 1 + i % 40, 'Cardiología', inicio + timedelta(days=i // 9),
+             f'{8 + i % 9:02d}:{(i % 3) * 20:02d}', 'Consulta de seguimiento') for i in range(n)]
+
+
+def casos():
+    """Nombre -> función sin argumentos; el tamaño va entre corchetes."""
+    dia = generar_horarios('08:00', '20:00')
+    ocupados = {p: set(dia[:int(len(dia) * p / 100)]) for p in (0, 50, 100)}
+    casos = {
+        'generar_horarios[6h]': lambda: generar_horarios('08:00', '14:00'),
+        'generar_horarios[12h]': lambda: generar_horarios('08:00', '20:00'),
+        'generar_horarios[24h]': lambda: generar_horarios('00:00', '23:59'),
+    }
+    for p, libres in ocupados.items():
+        casos[f'horarios_libres[12h,{p}%]'] = lambda libres=libres: horarios_libres('08:00', '20:00', libres)
+    for n in (50, 200):
+        filas = citas(n)
+        casos[f'serializar_citas[{n}]'] = lambda filas=filas: dumps_bytes(rows_to_dicts(CITA_CAMPOS, filas))
+    catalogo = [(i, synthetic.ESPECIALIDADES[i % 12], f'Dr. Ana García {i}') for i in range(1, 1501)]
+    casos['serializar_catalogo[1500]'] = lambda: dumps_bytes(rows_to_dicts(('id', 'nombre', 'doctor'), catalogo))
+
+    for n in (200, 1500):
+        # Una sesión ORM propia por tamaño, como db.session en la petición.
+        engine = create_engine('sqlite://')
+        synthetic.populate(engine, doctores=n, pacientes=1, citas=0, anios=1)
+        session = Session(engine)
+        nombre = session.scalar(select(Especialidad.doctor).where(Especialidad.id == n // 2))
+        casos[f'resolver_doctor[{n}]'] = lambda session=session, nombre=nombre: session.scalar(queries.doctor_id(nombre))
+    return casos
+
+
+def _numero(timer, objetivo):
+    numero = 1
+    while timer.timeit(numero) < objetivo:
+        numero *= 2
+    return numero
+
+
+def medir(funcion, repeticiones, objetivo):
+    """Tiempo por llamada (ns) y su relación con la calibración.
+
+    Cada repetición mide la calibración justo antes que el caso y se toma la
+    mediana de los cocientes: los cambios de frecuencia de la CPU o la carga de
+    otros procesos afectan a ambos por igual y se cancelan.
+    """
+    timer, referencia = timeit.Timer(funcion), timeit.Timer(calibracion)
+    numero, numero_ref = _numero(timer, objetivo), _numero(referencia, objetivo)
+    tiempos, cocientes = [], []
+    for _ in range(repeticiones):
+        ref = referencia.timeit(numero_ref) / numero_ref
+        tiempo = timer.timeit(numero) / numero
+        tiempos.append(tiempo)
+        cocientes.append(tiempo / ref)
+    return min(tiempos) * 1e9, statistics.median(cocientes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base', default=BASE, help='archivo de línea base')
+    parser.add_argument('--actualizar', action='store_true', help='guarda los resultados como nueva base')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='empeoramiento admitido (0.25 = 25%%)')
+    parser.add_argument('--filtro', default='', help='solo casos cuyo nombre contenga este texto')
+    parser.add_argument('--repeticiones', type=int, default=15)
+    parser.add_argument('--objetivo', type=float, default=0.02, help='segundos mínimos por repetición')
+    args = parser.parse_args()
+
+    base = None
+    if not args.actualizar:
+        if not os.path.exists(args.base):
+            print(f"No existe {args.base}; genérela con --actualizar.")
+            sys.exit(2)
+        with open(args.base) as f:
+            base = json.load(f)
+
+    calibracion_ns, _ = medir(calibracion, args.repeticiones, args.objetivo)
+    resultados = {}
+    print(f"calibración: {calibracion_ns / 1000:.1f} µs" +
+          (f" (base {base['calibracion_ns'] / 1000:.1f} µs)" if base else ''))
+    print(f"{'caso':<30} {'µs':>10} {'relativo':>9} {'base':>9} {'cambio':>8}")
+    regresiones = []
+    for nombre, funcion in casos().items():
+        if args.filtro not in nombre:
+            continue
+        ns, relativo = medir(funcion, args.repeticiones, args.objetivo)
+        resultados[nombre] = {'ns': round(ns, 1), 'relativo': round(relativo, 4)}
+        linea = f"{nombre:<30} {ns / 1000:>10.2f} {relativo:>9.3f}"
+        anterior = (base or {}).get('casos', {}).get(nombre)
+        if anterior:
+            cambio = relativo / anterior['relativo'] - 1
+            linea += f" {anterior['relativo']:>9.3f} {cambio:>+7.1%}"
+            if cambio > args.tolerancia:
+                regresiones.append(nombre)
+                linea += '  REGRESIÓN'
+        print(linea)
+
+    if args.actualizar:
+        with open(args.base, 'w') as f:
+            json.dump({
+                'meta': {'python': platform.python_version(), 'maquina': platform.machine(),
+                         'orjson': orjson is not None},
+                'calibracion_ns': round(calibracion_ns, 1),
+                'casos': resultados,
+            }, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write('\n')
+        print(f"Base guardada en {args.base}")
+    elif regresiones:
+        print(f"\n{len(regresiones)} regresión(es) por encima del {args.tolerancia:.0%}: {', '.join(regresiones)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización del listado de citas (antes/después)
+
+Compara el camino original de get_citas_usuario (objetos ORM, strftime por
+fila y el proveedor JSON por defecto de Flask) con el camino rápido
+(tuplas Core, rows_to_dicts y FastJSONProvider).
+
+Uso:
+    python scripts/bench_serialization.py --citas 10000 --repeticiones 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models import db, Cita
+from serialization import FastJSONProvider, orjson, rows_to_dicts
+
+COLUMNAS = (Cita.id, Cita.pacienteId, Cita.doctorId, Cita.especialidad, Cita.fecha, Cita.hora, Cita.motivo)
+
+
+def crear_app(total_citas):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        inicio = date(2024, 1, 1)
+        filas = [{
+            'pacienteId': 1,
+            'doctorId': 1 + i % 20,
+            'especialidad': 'Cardiología',
+            'fecha': inicio + timedelta(days=i // 12),
+            'hora': f'{8 + (i % 12) * 40 // 60:02d}:{(i % 12) * 40 % 60:02d}',
+            'motivo': 'Control de presión arterial',
+        } for i in range(total_citas)]
+        db.session.execute(db.insert(Cita), filas)
+        db.session.commit()
+    return app
+
+
+def camino_original(app):
+    citas = Cita.query.filter_by(pacienteId=1).all()
+    resultado = []
+    for cita in citas:
+        resultado.append({
+            "id": cita.id,
+            "pacienteId": cita.pacienteId,
+            "doctorId": cita.doctorId,
+            "especialidad": cita.especialidad,
+            "fecha": cita.fecha.strftime('%Y-%m-%d'),
+            "hora": cita.hora,
+            "motivo": cita.motivo
+        })
+    return app.json.response(resultado).get_data()
+
+
+def camino_rapido(app):
+    filas = db.session.execute(db.select(*COLUMNAS).where(Cita.pacienteId == 1))
+    return app.json.response(rows_to_dicts(filas.keys(), filas)).get_data()
+
+
+def medir(app, funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        cuerpo = funcion(app)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, len(cuerpo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--citas', type=int, default=10000)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    app = crear_app(args.citas)
+    print(f"Citas: {args.citas} | repeticiones: {args.repeticiones} | orjson: {'sí' if orjson else 'no'}")
+    print(f"{'camino':<10} {'mediana ms':>12} {'mín ms':>10} {'bytes':>10}")
+
+    with app.test_request_context():
+        resultados = {}
+        app.json = DefaultJSONProvider(app)
+        resultados['antes'] = medir(app, camino_original, args.repeticiones)
+        app.json = FastJSONProvider(app)
+        resultados['después'] = medir(app, camino_rapido, args.repeticiones)
+
+    for nombre, (tiempos, tamano) in resultados.items():
+        print(f"{nombre:<10} {statistics.median(tiempos) * 1000:>12.2f} {min(tiempos) * 1000:>10.2f} {tamano:>10}")
+
+    aceleracion = statistics.median(resultados['antes'][0]) / statistics.median(resultados['después'][0])
+    print(f"Aceleración: x{aceleracion:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque de worker: creación de la app, primera petición al
+catálogo y a la especificación, y memoria residente (RSS)
+
+Cada medición corre en un proceso nuevo, como un worker recién lanzado:
+
+  - docstrings: flasgger cargado y especificación generada analizando el YAML
+    de cada ruta (comportamiento anterior)
+  - UI + estática: flasgger cargado, especificación leída de backend/openapi.json
+  - sin UI: SWAGGER_UI=0, flasgger no se importa; solo /openapi.json
+  - sin UI + warm-up: además WARM_UP=1, las rutas de lectura se recorren al
+    crear la app (lo que hace gunicorn.conf.py antes del fork)
+
+Uso:
+    python scripts/bench_startup.py --repeticiones 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+HIJO = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+inicio = time.perf_counter()
+from api import app
+importado = time.perf_counter()
+assert app.test_client().get('/get-especialidades').status_code in (200, 404)
+catalogo = time.perf_counter()
+if {modo!r} == 'docstrings':
+    from openapi import build_spec
+    build_spec(app)
+else:
+    ruta = '/apispec_1.json' if {modo!r} == 'UI + estática' else '/openapi.json'
+    assert app.test_client().get(ruta).status_code == 200
+primera = time.perf_counter()
+with open('/proc/self/status') as f:
+    rss = next(int(linea.split()[1]) for linea in f if linea.startswith('VmRSS'))
+print(json.dumps({{'importacion': importado - inicio, 'catalogo': catalogo - importado,
+                  'primera': primera - catalogo, 'rss_kb': rss,
+                  'flasgger': 'flasgger' in sys.modules}}))
+"""
+
+MODOS = {
+    'docstrings': {'SWAGGER_UI': '1', 'WARM_UP': '0'},
+    'UI + estática': {'SWAGGER_UI': '1', 'WARM_UP': '0'},
+    'sin UI': {'SWAGGER_UI': '0', 'WARM_UP': '0'},
+    'sin UI + warm-up': {'SWAGGER_UI': '0', 'WARM_UP': '1'},
+}
+
+
+def crear_base(path):
+    sys.path.insert(0, BACKEND)
+    from api import create_app, db
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SECRET_KEY': 'bench', 'SWAGGER_UI': False})
+    with app.app_context():
+        db.create_all()
+
+
+def medir(modo, variables, db_path):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', SECRET_KEY='bench', **variables)
+    salida = subprocess.run([sys.executable, '-c', HIJO.format(backend=BACKEND, modo=modo)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=5, help='procesos lanzados por modo')
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    try:
+        crear_base(db_path)
+        print(f"{'modo':<18} {'creación':>10} {'1.ª catálogo':>13} {'1.ª spec':>10} {'RSS':>10} {'flasgger':>9}")
+        for modo, variables in MODOS.items():
+            muestras = [medir(modo, variables, db_path) for _ in range(args.repeticiones)]
+            importacion = statistics.median(m['importacion'] for m in muestras) * 1000
+            catalogo = statistics.median(m['catalogo'] for m in muestras) * 1000
+            primera = statistics.median(m['primera'] for m in muestras) * 1000
+            rss = statistics.median(m['rss_kb'] for m in muestras) / 1024
+            print(f"{modo:<18} {importacion:>8.1f}ms {catalogo:>11.1f}ms {primera:>8.1f}ms {rss:>8.1f}MB "
+                  f"{'sí' if muestras[0]['flasgger'] else 'no':>9}")
+    finally:
+        os.close(fd)
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Genera backend/openapi.json a partir de los docstrings de las rutas
+
+La aplicación sirve este archivo estático en /openapi.json (y en la interfaz
+Swagger, si está activa) en lugar de analizar el YAML en cada worker.
+Ejecutar tras modificar la documentación de cualquier ruta.
+
+Uso:
+    python scripts/generate_openapi.py            # escribe el archivo
+    python scripts/generate_openapi.py --check    # falla si está desactualizado
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+# La generación necesita flasgger aunque el despliegue lo tenga desactivado.
+os.environ['SWAGGER_UI'] = '1'
+
+from api import app
+from openapi import build_spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--salida', default=app.config['OPENAPI_SPEC_PATH'], help='ruta del archivo generado')
+    parser.add_argument('--check', action='store_true', help='no escribe; sale con error si el archivo difiere')
+    args = parser.parse_args()
+
+    spec = build_spec(app)
+    if args.check:
+        try:
+            with open(args.salida, 'rb') as f:
+                actual = f.read()
+        except FileNotFoundError:
+            actual = None
+        if actual != spec:
+            print(f"{args.salida} está desactualizado; ejecute scripts/generate_openapi.py", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.salida} está al día")
+        return
+
+    with open(args.salida, 'wb') as f:
+        f.write(spec)
+    print(f"Especificación escrita en {args.salida} ({len(spec)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Reproduce tráfico grabado con RECORD_DIR contra una instancia nueva
+
+Lee los archivos requests-*.ndjson.gz (o un directorio que los contenga), los
+ordena por llegada y vuelve a emitir cada petición respetando los intervalos
+originales, acelerados con --velocidad (0 = tan rápido como sea posible).
+Compara estados y latencias con los grabados por endpoint.
+
+La instancia debe partir de la base de datos que había al empezar la grabación
+(una copia, o la misma base sintética). Las peticiones autenticadas se firman
+de nuevo para el mismo usuario con la SECRET_KEY del destino; las contraseñas
+no se graban, así que los logins solo se reproducen con --password (p. ej.
+'clave-sintetica' sobre datos sintéticos).
+
+Uso:
+    python scripts/replay_traffic.py grabacion/ --url http://127.0.0.1:8000 --secret-key ... --velocidad 10
+    DATABASE_URL=sqlite:////tmp/copia.db python scripts/replay_traffic.py grabacion/ --velocidad 0
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import loadtest
+import traffic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('grabaciones', nargs='+', help='archivos .ndjson.gz o directorios')
+    parser.add_argument('--url', help='servidor destino; sin él se usa la app en proceso (config del entorno)')
+    parser.add_argument('--secret-key', help='SECRET_KEY del servidor destino (para firmar tokens)')
+    parser.add_argument('--admin-token', help='ADMIN_TOKEN del destino para las peticiones de administración')
+    parser.add_argument('--password', help='contraseña a usar en lugar de las ocultas')
+    parser.add_argument('--velocidad', type=float, default=1.0, help='factor de aceleración (0 = sin esperas)')
+    parser.add_argument('--concurrencia', type=int, default=32, help='peticiones en vuelo como máximo')
+    parser.add_argument('--salida', help='archivo donde guardar el informe JSON')
+    args = parser.parse_args()
+
+    registros = traffic.read_records(args.grabaciones)
+    if args.url:
+        transporte = loadtest.HTTPTransport(args.url)
+        token_for = traffic.token_signer(args.secret_key) if args.secret_key else None
+    else:
+        from api import create_app
+        app = create_app()
+        app.config['RATE_LIMIT_ENABLED'] = False
+        transporte = loadtest.TestClientTransport(app)
+        token_for = app.extensions['token_serializer'].dumps
+
+    print(f"{len(registros)} peticiones grabadas")
+    informe = traffic.replay(registros, transporte, speed=args.velocidad, concurrency=args.concurrencia,
+                             password=args.password, token_for=token_for, admin_token=args.admin_token)
+    print(f"reproducidas en {informe['replay_duration_s']:.1f}s (grabadas en {informe['recorded_span_s']:.1f}s), "
+          f"estados distintos: {informe['status_mismatches']}")
+    print(f"{'endpoint':<40} {'n':>6} {'≠estado':>8} {'grab p50':>9} {'repr p50':>9} {'repr p99':>9} {'retraso p99':>12}")
+    for endpoint, datos in informe['endpoints'].items():
+        grabada, reproducida, retraso = datos['recorded_latency'], datos['replayed_latency'], datos['dispatch_lag']
+        print(f"{endpoint:<40} {datos['requests']:>6} {datos['status_mismatches']:>8} {grabada['p50_ms']:>7.1f}ms "
+              f"{reproducida['p50_ms']:>7.1f}ms {reproducida['p99_ms']:>7.1f}ms {retraso['p99_ms']:>10.1f}ms")
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(informe, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Simulación de eventos discretos de un mes de la clínica para planificar capacidad
+
+Pacientes que llegan, buscan hueco, reservan, cancelan y no se presentan, en
+tiempo simulado y con el código real de agenda y reservas (ver
+backend/simulation.py). Informa ocupación y utilización de la agenda, espera
+hasta la cita y consultas a la base de datos por operación.
+
+Por defecto trabaja sobre una base sintética en memoria (scripts/
+generate_synthetic_data.py con los mismos parámetros); --citas reserva de
+antemano parte de la agenda de todo el calendario.
+
+Uso:
+    python scripts/simulate_clinic.py                                  # 30 días, 120 pacientes/día
+    python scripts/simulate_clinic.py --doctores 80 --llegadas 400 --inasistencia 0.15 --salida mes.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from api import create_app, db
+import simulation
+import synthetic
+
+
+def imprimir(informe):
+    p, e, c = informe['pacientes'], informe['espera_dias'], informe['capacidad']
+    print(f"pacientes: {p['llegadas']}  reservas: {p['reservas']}  sin hueco: {p['sin_hueco']}  "
+          f"cancelaciones: {p['cancelaciones']}  inasistencias: {p['inasistencias']}  "
+          f"búsquedas/paciente: {p['busquedas_por_paciente']}")
+    if e:
+        print(f"espera hasta la cita (días): p50 {e['p50']}  p95 {e['p95']}  media {e['media']}  máx {e['max']}")
+    if c['huecos']:
+        print(f"agenda: {c['citas']}/{c['huecos']} huecos  ocupación {c['ocupacion']:.1%}  "
+              f"utilización {c['utilizacion']:.1%}")
+    print(f"{'operación':<12} {'llamadas':>9} {'consultas':>10} {'por llamada':>12} {'tiempo db':>10}")
+    for fase, datos in informe['operaciones_db'].items():
+        print(f"{fase:<12} {datos['llamadas']:>9} {datos['consultas']:>10} "
+              f"{datos['consultas_por_llamada'] or 0:>12} {datos['tiempo_db_s']:>9.2f}s")
+    r = informe['rendimiento']
+    print(f"{r['eventos']} eventos en {r['segundos']:.1f}s ({r['eventos_por_segundo']} eventos/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=30, help='días simulados')
+    parser.add_argument('--inicio', type=date.fromisoformat, default=date(2024, 3, 1), help='primer día simulado')
+    parser.add_argument('--llegadas', type=float, default=120, help='pacientes nuevos por día')
+    parser.add_argument('--horizonte', type=int, default=21, help='días vista que un paciente está dispuesto a esperar')
+    parser.add_argument('--cancelacion', type=float, default=0.1, help='probabilidad de cancelar una cita')
+    parser.add_argument('--inasistencia', type=float, default=0.08, help='probabilidad de no presentarse')
+    parser.add_argument('--doctores', type=int, default=40)
+    parser.add_argument('--especialidades', type=int, default=12)
+    parser.add_argument('--pacientes', type=int, default=2000)
+    parser.add_argument('--citas', type=int, default=0, help='citas previas repartidas por todo el calendario')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help='archivo donde guardar el informe JSON')
+    args = parser.parse_args()
+
+    # El calendario sintético cubre un año desde el primer día del mes de inicio.
+    desde = args.inicio.replace(day=1)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'simulacion', 'SWAGGER_UI': False})
+    with app.app_context():
+        synthetic.populate(db.engine, seed=args.semilla, especialidades=args.especialidades,
+                           doctores=args.doctores, pacientes=args.pacientes, citas=args.citas, desde=desde, anios=1)
+    informe = simulation.simulate(app, args.inicio, dias=args.dias, llegadas_por_dia=args.llegadas,
+                                  horizonte=args.horizonte, prob_cancelacion=args.cancelacion,
+                                  prob_inasistencia=args.inasistencia, seed=args.semilla)
+
+    imprimir(informe)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            json.dump(informe, f, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,14 @@ sys.path.insert(0, backend_path)
 parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_path)
 
+# `api.app` toma la base de datos del entorno al crearse; las pruebas usan un
+# archivo temporal en lugar de backend/instance/database.db.
+_database_fd, _database_path = tempfile.mkstemp(suffix='.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + _database_path
+
 try:
-    from api import app, db
+    import synthetic
+    from api import app, create_app, db
     from models import User, Especialidad, Horario, HorarioDetail, Cita
     from flask_bcrypt import Bcrypt
 except ImportError as e:
@@ -34,19 +40,41 @@ except ImportError as e:
 @pytest.fixture
 def client():
     """Crea un cliente de prueba para la aplicación Flask"""
-    database_fd, app.config['DATABASE'] = tempfile.mkstemp()
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + app.config['DATABASE']
     app.config['TESTING'] = True
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.extensions['rate_limiter'].store.clear()
     
     with app.test_client() as client:
         with app.app_context():
             db.create_all()
             yield client
             db.drop_all()
-    
-    os.close(database_fd)
-    os.unlink(app.config['DATABASE'])
+
+# Base para las aplicaciones sintéticas: sin Swagger ni límite de intentos y con
+# bcrypt barato, para que los flujos de login no dominen el tiempo de las pruebas.
+SYNTHETIC_CONFIG = {'SECRET_KEY': 'sintetica', 'SWAGGER_UI': False, 'RATE_LIMIT_ENABLED': False,
+                    'BCRYPT_LOG_ROUNDS': 4}
+
+
+@pytest.fixture(scope='session')
+def app_sintetica(tmp_path_factory):
+    """Fábrica de aplicaciones, cada una sobre su propia base sintética.
+
+    `app_sintetica(config, **poblar)` crea la aplicación en un archivo temporal
+    nuevo (o en el SQLALCHEMY_DATABASE_URI de `config`) y la llena con
+    `synthetic.populate(db.engine, **poblar)`. `config` se aplica sobre
+    SYNTHETIC_CONFIG.
+    """
+    def crear(config=None, **poblar):
+        path = tmp_path_factory.mktemp('sintetica') / 'sintetica.db'
+        nueva = create_app({**SYNTHETIC_CONFIG, 'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', **(config or {})})
+        with nueva.app_context():
+            synthetic.populate(db.engine, **poblar)
+        return nueva
+    return crear
+
+def pytest_sessionfinish(session, exitstatus):
+    os.close(_database_fd)
+    os.unlink(_database_path)
 
 @pytest.fixture
 def bcrypt_instance():
@@ -114,4 +142,10 @@ def sample_horario(client, sample_especialidad):
     db.session.add(detalle)
     db.session.commit()
     
-    return horario
\ No newline at end of file
+    return horario
+
+@pytest.fixture
+def auth_headers(sample_user):
+    """Cabecera Authorization con un token de acceso de sample_user"""
+    from auth import issue_token
+    return {'Authorization': f'Bearer {issue_token(sample_user)}'}
@@ -0,0 +1,96 @@
+import pytest
+import gc
+import sys
+import os
+import weakref
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import api
+from api import create_app, db, warm_up
+from config import from_env
+from models import Especialidad
+from query_stats import count_queries
+
+
+@pytest.fixture
+def nueva_app(tmp_path):
+    """Aplicación independiente de `api.app`, con su propia base de datos"""
+    nueva = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'factory.db'}",
+        'SECRET_KEY': 'clave-de-prueba',
+        'SWAGGER_UI': False,
+    })
+    with nueva.app_context():
+        db.create_all()
+    return nueva
+
+
+class TestAppFactory:
+    """Pruebas para create_app, el precalentamiento y el fork de workers"""
+
+    def test_apps_independientes(self, client, nueva_app):
+        """Test que cada app usa la base de datos de su configuración"""
+        with nueva_app.app_context():
+            db.session.add(Especialidad(nombre='Dermatología', doctor='Dr. Factory'))
+            db.session.commit()
+
+        assert nueva_app.test_client().get('/get-doctores/Dermatología').status_code == 200
+        assert client.get('/get-doctores/Dermatología').status_code == 404
+
+    def test_sin_swagger_ui(self, nueva_app):
+        """Test que con SWAGGER_UI desactivado no se registra flasgger"""
+        assert 'flasgger' not in nueva_app.blueprints
+        assert 'api.login' in nueva_app.view_functions
+
+    def test_config_desde_entorno(self):
+        """Test lectura de la configuración desde variables de entorno"""
+        config = from_env({'DATABASE_URL': 'sqlite://', 'SWAGGER_UI': '0', 'BCRYPT_TARGET_MS': '250'})
+
+        assert config == {'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SWAGGER_UI': False, 'BCRYPT_TARGET_MS': 250.0}
+
+    def test_warm_up(self, nueva_app):
+        """Test que el precalentamiento consulta la base y carga la especificación"""
+        with count_queries() as stats:
+            warm_up(nueva_app)
+
+        assert stats.count > 0
+        assert 'openapi_spec' in nueva_app.extensions
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere os.fork')
+    def test_fork_descarta_conexiones(self, nueva_app):
+        """Test que un worker creado por fork no reutiliza el pool del maestro"""
+        warm_up(nueva_app)
+        with nueva_app.app_context():
+            pool_maestro = id(db.engine.pool)
+
+        pid = os.fork()
+        if pid == 0:
+            codigo = 1
+            try:
+                with nueva_app.app_context():
+                    nuevo_pool = id(db.engine.pool) != pool_maestro
+                    db.session.execute(db.select(Especialidad.id)).all()
+                codigo = 0 if nuevo_pool else 2
+            finally:
+                os._exit(codigo)
+
+        _, estado = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(estado) == 0
+
+    def test_app_descartada_sale_del_hook_de_fork(self, tmp_path):
+        """Test que una app descartada deja de atenderse en el hook de fork y no queda retenida"""
+        nueva = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'tmp.db'}",
+                            'SECRET_KEY': 'x', 'SWAGGER_UI': False})
+        referencia = weakref.ref(nueva)
+        assert nueva in api._apps
+
+        del nueva
+        gc.collect()
+
+        assert referencia() is None
@@ -11,7 +11,10 @@ sys.path.insert(0, backend_path)
 sys.path.insert(0, '.')
 
 import json
+import time
 from models import User
+from api import app
+from auth import TokenCache, issue_token, verify_token
 
 class TestAuth:
     """Pruebas para endpoints de autenticación"""
@@ -110,4 +113,77 @@ class TestAuth:
         
         assert response.status_code == 401
         json_data = json.loads(response.data)
-        assert json_data['message'] == 'Contraseña incorrecta.'
\ No newline at end of file
+        assert json_data['message'] == 'Contraseña incorrecta.'
+
+    def test_login_devuelve_token(self, client, sample_user):
+        """Test que el login emite un token de acceso válido"""
+        data = {
+            'correo': 'juan@test.com',
+            'password': 'password123'
+        }
+        response = client.post('/login',
+                             data=json.dumps(data),
+                             content_type='application/json')
+
+        json_data = json.loads(response.data)
+        assert json_data['expiraEn'] == app.config['TOKEN_MAX_AGE']
+        assert verify_token(json_data['token']) == {'id': sample_user.id, 'rol': 'paciente'}
+
+    def test_endpoint_protegido_sin_token(self, client, sample_user):
+        """Test acceso a citas sin cabecera Authorization"""
+        response = client.get(f'/citas/{sample_user.id}')
+
+        assert response.status_code == 401
+        json_data = json.loads(response.data)
+        assert json_data['message'] == 'Token de acceso requerido.'
+
+    def test_endpoint_protegido_token_alterado(self, client, sample_user, auth_headers):
+        """Test acceso con un token con la firma alterada"""
+        headers = {'Authorization': auth_headers['Authorization'][:-2] + 'xx'}
+        response = client.delete('/citas/1', headers=headers)
+
+        assert response.status_code == 401
+        json_data = json.loads(response.data)
+        assert json_data['message'] == 'Token inválido o expirado.'
+
+    def test_endpoint_protegido_token_expirado(self, client, sample_user, monkeypatch):
+        """Test acceso con un token expirado"""
+        monkeypatch.setitem(app.config, 'TOKEN_MAX_AGE', -1)
+        headers = {'Authorization': f'Bearer {issue_token(sample_user)}'}
+
+        response = client.get(f'/citas/{sample_user.id}', headers=headers)
+
+        assert response.status_code == 401
+
+    def test_citas_de_otro_usuario(self, client, sample_user, sample_doctor, auth_headers):
+        """Test que un usuario no puede consultar las citas de otro"""
+        response = client.get(f'/citas/{sample_doctor.id}', headers=auth_headers)
+
+        assert response.status_code == 403
+        json_data = json.loads(response.data)
+        assert json_data['message'] == 'No puede operar sobre citas de otro usuario.'
+
+    def test_token_verificado_se_cachea(self, client, sample_user, monkeypatch):
+        """Test que la segunda verificación del token no vuelve a comprobar la firma"""
+        token = issue_token(sample_user)
+        assert verify_token(token)['id'] == sample_user.id
+
+        def falla(*args, **kwargs):
+            raise AssertionError('la firma no debería verificarse de nuevo')
+        monkeypatch.setattr(app.extensions['token_serializer'], 'loads', falla)
+
+        assert verify_token(token)['id'] == sample_user.id
+
+    def test_token_cache_lru_y_expiracion(self):
+        """Test expulsión LRU y caducidad de la caché de tokens"""
+        cache = TokenCache(maxsize=2)
+        ahora = time.time()
+        cache.put('a', {'id': 1}, ahora + 60)
+        cache.put('b', {'id': 2}, ahora + 60)
+        cache.get('a', ahora)
+        cache.put('c', {'id': 3}, ahora + 60)
+
+        assert cache.get('b', ahora) is None
+        assert cache.get('a', ahora) == {'id': 1}
+        assert cache.get('c', ahora + 61) is None
+        assert len(cache) == 1
@@ -0,0 +1,148 @@
+import pytest
+import gc
+import json
+import sys
+import os
+import threading
+import time
+import weakref
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import booking_writer
+import loadtest
+from sqlalchemy import func
+from api import db, reservar_cita
+from auth import issue_token
+from booking_writer import BookingWriter
+from models import Cita, Especialidad, User
+
+DESDE = date(2024, 1, 1)
+FECHA = date(2024, 2, 5)
+
+
+@pytest.fixture
+def agrupada(app_sintetica):
+    """Aplicación con el escritor agrupado y una ventana amplia para que los lotes se formen"""
+    app = app_sintetica({'BOOKING_GROUP_COMMIT_MS': 50}, doctores=10, pacientes=20, citas=0, desde=DESDE, anios=1)
+    yield app
+    app.extensions['booking_writer'].close()
+
+
+def _en_paralelo(app, reservas):
+    """Lanza cada reserva en su propio hilo a la vez y devuelve los resultados en orden."""
+    resultados = [None] * len(reservas)
+    barrera = threading.Barrier(len(reservas))
+
+    def reservar(i, args):
+        with app.app_context():
+            barrera.wait()
+            try:
+                resultados[i] = reservar_cita(*args)
+            except Exception as e:
+                resultados[i] = e
+            db.session.remove()
+
+    hilos = [threading.Thread(target=reservar, args=(i, args)) for i, args in enumerate(reservas)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+class TestBookingWriter:
+    """Pruebas del escritor agrupado de reservas (group commit)"""
+
+    def test_reservas_concurrentes_en_pocos_commits(self, agrupada):
+        """Test que reservas simultáneas se confirman juntas y cada una recibe su id"""
+        reservas = [(1, doctor, 'Medicina General', FECHA, '09:00', 'Control') for doctor in range(1, 9)]
+
+        resultados = _en_paralelo(agrupada, reservas)
+
+        assert all(isinstance(r, int) for r in resultados)
+        assert len(set(resultados)) == len(reservas)
+        writer = agrupada.extensions['booking_writer']
+        assert writer.bookings == len(reservas)
+        assert writer.commits < len(reservas)
+        with agrupada.app_context():
+            assert db.session.scalar(db.select(func.count(Cita.id))) == len(reservas)
+
+    def test_mismo_hueco_un_solo_ganador(self, agrupada):
+        """Test que en un lote con el mismo hueco repetido solo una reserva tiene éxito"""
+        reservas = [(paciente, 3, 'Pediatría', FECHA, '10:20', 'Control') for paciente in range(1, 7)]
+
+        resultados = _en_paralelo(agrupada, reservas)
+
+        assert len([r for r in resultados if r is not None]) == 1
+        with agrupada.app_context():
+            assert db.session.scalar(db.select(func.count(Cita.id))) == 1
+
+    def test_error_aislado_por_reserva(self, agrupada):
+        """Test que si una reserva del lote falla, las demás se confirman y solo ella recibe el error"""
+        reservas = [(1, doctor, 'Cardiología', FECHA, '11:00', 'Control') for doctor in range(1, 5)]
+        reservas.append((None, 5, 'Cardiología', FECHA, '11:00', 'Control'))
+
+        resultados = _en_paralelo(agrupada, reservas)
+
+        assert all(isinstance(r, int) for r in resultados[:4])
+        assert isinstance(resultados[4], Exception)
+        with agrupada.app_context():
+            assert db.session.scalar(db.select(func.count(Cita.id))) == 4
+
+    def test_flujo_http_con_escritor(self, agrupada):
+        """Test que POST /register-cita funciona igual con el escritor agrupado"""
+        informe = loadtest.run_load(loadtest.TestClientTransport(agrupada), concurrency=4, flows=8,
+                                    pacientes=20, desde=DESDE, anios=1)
+
+        assert informe['flows']['completed'] == 8
+        assert informe['endpoints']['POST /register-cita']['statuses'] == {'201': 8}
+
+    def test_espera_acotada(self, agrupada, monkeypatch):
+        """Test que una reserva que no entra a tiempo en un lote responde 503 y no se aplica"""
+        writer = agrupada.extensions['booking_writer']
+        monkeypatch.setattr(writer, 'timeout', 0.3)
+        liberar = threading.Event()
+        original = booking_writer._reservar
+
+        def atascada(conn, datos):
+            liberar.wait(5)
+            return original(conn, datos)
+
+        monkeypatch.setattr(booking_writer, '_reservar', atascada)
+        primera = []
+        hilo = threading.Thread(target=lambda: primera.extend(
+            _en_paralelo(agrupada, [(1, 1, 'Medicina General', FECHA, '09:00', 'Control')])))
+        hilo.start()
+        time.sleep(0.1)
+
+        with agrupada.app_context():
+            paciente = db.session.get(User, 2)
+            doctor = db.session.get(Especialidad, 2)
+            token = issue_token(paciente)
+        response = agrupada.test_client().post('/register-cita', data=json.dumps({
+            'pacienteId': paciente.id, 'doctorId': doctor.doctor, 'especialidad': doctor.nombre,
+            'fecha': FECHA.isoformat(), 'hora': '10:20', 'motivo': 'Control'}),
+            content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+        liberar.set()
+        hilo.join()
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        # La primera ya estaba en un lote en curso: espera más allá del límite y se confirma.
+        assert isinstance(primera[0], int)
+        with agrupada.app_context():
+            assert db.session.scalar(db.select(func.count(Cita.id))) == 1
+
+    def test_escritor_liberable(self):
+        """Test que un escritor descartado no queda retenido por los hooks de fork y de salida"""
+        referencia = weakref.ref(BookingWriter(None))
+        gc.collect()
+
+        assert referencia() is None
@@ -0,0 +1,136 @@
+import pytest
+import gc
+import json
+import sys
+import os
+import weakref
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from api import app
+import bulk_import
+from bulk_import import import_users, importar_usuarios_command
+from hashing import PasswordHasher
+from models import User
+from query_stats import count_queries
+
+ADMIN = {'X-Admin-Token': 'secreto-admin'}
+
+
+@pytest.fixture
+def config_importacion(monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', ADMIN['X-Admin-Token'])
+    monkeypatch.setitem(app.config, 'BCRYPT_LOG_ROUNDS', 4)
+    monkeypatch.setitem(app.config, 'BULK_IMPORT_WORKERS', 0)
+    monkeypatch.setitem(app.extensions, 'password_hasher', PasswordHasher(workers=0, max_pending=1, rounds=4))
+
+
+class TestBulkImport:
+    """Pruebas para la importación masiva de usuarios"""
+
+    def test_register_bulk(self, client, sample_user, config_importacion):
+        """Test importación con duplicados e inválidos"""
+        data = {'usuarios': [
+            {'nombre': 'Ana', 'correo': 'ana@test.com', 'password': 'clave1', 'rol': 1},
+            {'nombre': 'Luis', 'correo': 'luis@test.com', 'password': 'clave2'},
+            {'nombre': 'Ana bis', 'correo': 'ana@test.com', 'password': 'clave3'},
+            {'nombre': 'Juan', 'correo': 'juan@test.com', 'password': 'clave4'},
+            {'nombre': 'Sin correo', 'password': 'clave5'},
+        ]}
+        response = client.post('/register-bulk',
+                               data=json.dumps(data),
+                               content_type='application/json',
+                               headers=ADMIN)
+
+        assert response.status_code == 200
+        json_data = json.loads(response.data)
+        assert json_data['creados'] == 2
+        assert sorted(json_data['duplicados']) == ['ana@test.com', 'juan@test.com']
+        assert json_data['invalidos'] == [{'indice': 4, 'error': 'Campo requerido: correo'}]
+
+        luis = User.query.filter_by(correo='luis@test.com').first()
+        assert luis.rol == 1
+        assert PasswordHasher(0, 1).check_password_hash(luis.password, 'clave2')
+
+    def test_register_bulk_cuerpo_invalido(self, client, config_importacion):
+        """Test importación sin lista de usuarios"""
+        response = client.post('/register-bulk',
+                               data=json.dumps({'usuarios': 'no-es-lista'}),
+                               content_type='application/json',
+                               headers=ADMIN)
+
+        assert response.status_code == 400
+
+    def test_register_bulk_limite_http(self, client, config_importacion, monkeypatch):
+        """Test que /register-bulk rechaza más filas de las admitidas y remite a la CLI"""
+        monkeypatch.setitem(app.config, 'BULK_IMPORT_HTTP_MAX', 3)
+        data = {'usuarios': [{'nombre': f'P{i}', 'correo': f'p{i}@test.com', 'password': 'x'} for i in range(4)]}
+
+        response = client.post('/register-bulk', data=json.dumps(data),
+                               content_type='application/json', headers=ADMIN)
+
+        assert response.status_code == 413
+        assert 'flask importar-usuarios' in json.loads(response.data)['message']
+        assert User.query.count() == 0
+
+    def test_register_bulk_usa_hasher_de_la_app(self, client, config_importacion, monkeypatch):
+        """Test que la importación por HTTP no crea un hasher por petición"""
+        creados = []
+        monkeypatch.setattr(PasswordHasher, '__init__', lambda *args, **kwargs: creados.append(args))
+        data = {'usuarios': [{'nombre': 'Ana', 'correo': 'ana@test.com', 'password': 'clave1'}]}
+
+        response = client.post('/register-bulk', data=json.dumps(data),
+                               content_type='application/json', headers=ADMIN)
+
+        assert response.status_code == 200
+        assert creados == []
+
+    def test_hasher_liberable(self):
+        """Test que un hasher descartado no queda retenido por el hook de fork"""
+        referencia = weakref.ref(PasswordHasher(workers=0, max_pending=1, rounds=4))
+        gc.collect()
+
+        assert referencia() is None
+
+    def test_reintento_con_conflicto_repetido(self, client, sample_user, config_importacion, monkeypatch):
+        """Test que si el reintento del lote vuelve a chocar se sigue fila por fila"""
+        # La deduplicación nunca ve el correo existente, como si otro proceso lo insertara cada vez.
+        monkeypatch.setattr(bulk_import, '_existing_emails', lambda correos: set())
+        registros = [{'nombre': 'Ana', 'correo': 'ana@test.com', 'password': 'x'},
+                     {'nombre': 'Juan', 'correo': 'juan@test.com', 'password': 'x'},
+                     {'nombre': 'Luis', 'correo': 'luis@test.com', 'password': 'x'}]
+
+        resumen = import_users(registros, PasswordHasher(0, 1, rounds=4))
+
+        assert resumen['creados'] == 2
+        assert resumen['duplicados'] == ['juan@test.com']
+        assert User.query.count() == 3
+
+    def test_deduplicacion_y_lotes(self, client, sample_user, config_importacion):
+        """Test una consulta de deduplicación y una inserción por lote"""
+        registros = [{'nombre': f'P{i}', 'correo': f'p{i}@test.com', 'password': 'x'} for i in range(25)]
+
+        with count_queries() as stats:
+            resumen = import_users(registros, PasswordHasher(0, 1, rounds=4), batch_size=10)
+
+        assert resumen['creados'] == 25
+        assert stats.count == 1 + 3
+        assert User.query.count() == 26
+
+    def test_cli_importar_usuarios(self, client, tmp_path, config_importacion):
+        """Test comando de línea de órdenes con un CSV"""
+        archivo = tmp_path / 'usuarios.csv'
+        archivo.write_text('nombre,correo,password,rol\n'
+                           'Ana,ana@test.com,clave1,1\n'
+                           'Luis,luis@test.com,clave2,2\n', encoding='utf-8')
+
+        result = app.test_cli_runner().invoke(importar_usuarios_command, [str(archivo), '--workers', '0'])
+
+        assert result.exit_code == 0, result.output
+        assert 'Creados: 2' in result.output
+        assert User.query.filter_by(correo='luis@test.com').first().rol == 2
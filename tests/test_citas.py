@@ -12,13 +12,14 @@ sys.path.insert(0, backend_path)
 sys.path.insert(0, '.')
 
 import json
+from api import db
 from models import User, Cita
 
 
 class TestCitas:
     """Pruebas para endpoints de citas"""
     
-    def test_register_cita_success(self, client, sample_user, sample_horario):
+    def test_register_cita_success(self, client, sample_user, sample_horario, auth_headers):
         """Test registro exitoso de cita"""
         data = {
             'pacienteId': sample_user.id,
@@ -31,7 +32,8 @@ class TestCitas:
         
         response = client.post('/register-cita',
                              data=json.dumps(data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=auth_headers)
         
         assert response.status_code == 201
         json_data = json.loads(response.data)
@@ -44,7 +46,7 @@ class TestCitas:
         assert cita.hora == '09:00'
         assert cita.motivo == 'Consulta de rutina'
     
-    def test_register_cita_missing_fields(self, client, sample_user):
+    def test_register_cita_missing_fields(self, client, sample_user, auth_headers):
         """Test registro de cita con campos faltantes"""
         data = {
             'pacienteId': sample_user.id,
@@ -56,13 +58,14 @@ class TestCitas:
         
         response = client.post('/register-cita',
                              data=json.dumps(data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=auth_headers)
         
         assert response.status_code == 400
         json_data = json.loads(response.data)
         assert json_data['message'] == 'Faltan campos requeridos.'
     
-    def test_register_cita_doctor_not_found(self, client, sample_user):
+    def test_register_cita_doctor_not_found(self, client, sample_user, auth_headers):
         """Test registro de cita con doctor inexistente"""
         data = {
             'pacienteId': sample_user.id,
@@ -75,13 +78,14 @@ class TestCitas:
         
         response = client.post('/register-cita',
                              data=json.dumps(data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=auth_headers)
         
         assert response.status_code == 400
         json_data = json.loads(response.data)
         assert json_data['message'] == 'Doctor no encontrado'
     
-    def test_register_cita_invalid_date(self, client, sample_user, sample_especialidad):
+    def test_register_cita_invalid_date(self, client, sample_user, sample_especialidad, auth_headers):
         """Test registro de cita con fecha inválida"""
         data = {
             'pacienteId': sample_user.id,
@@ -94,13 +98,14 @@ class TestCitas:
         
         response = client.post('/register-cita',
                              data=json.dumps(data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=auth_headers)
         
         assert response.status_code == 400
         json_data = json.loads(response.data)
         assert json_data['error'] == 'Formato de fecha incorrecto para la fecha, use YYYY-MM-DD'
     
-    def test_register_cita_time_conflict(self, client, sample_user, sample_horario):
+    def test_register_cita_time_conflict(self, client, sample_user, sample_horario, auth_headers):
         """Test registro de cita con conflicto de horario"""
         # Primero crear una cita
         cita_existente = Cita(
@@ -127,13 +132,14 @@ class TestCitas:
         
         response = client.post('/register-cita',
                              data=json.dumps(data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=auth_headers)
         
         assert response.status_code == 400
         json_data = json.loads(response.data)
         assert json_data['message'] == 'Este horario ya está ocupado.'
     
-    def test_get_citas_usuario_success(self, client, sample_user, sample_horario):
+    def test_get_citas_usuario_success(self, client, sample_user, sample_horario, auth_headers):
         """Test obtener citas de un usuario"""
         # Crear una cita de prueba
         cita = Cita(
@@ -148,7 +154,7 @@ class TestCitas:
         db.session.add(cita)
         db.session.commit()
         
-        response = client.get(f'/citas/{sample_user.id}')
+        response = client.get(f'/citas/{sample_user.id}', headers=auth_headers)
         
         assert response.status_code == 200
         json_data = json.loads(response.data)
@@ -158,15 +164,15 @@ class TestCitas:
         assert json_data[0]['motivo'] == 'Consulta de rutina'
         assert json_data[0]['fecha'] == '2024-12-15'
     
-    def test_get_citas_usuario_empty(self, client, sample_user):
+    def test_get_citas_usuario_empty(self, client, sample_user, auth_headers):
         """Test obtener citas de usuario sin citas"""
-        response = client.get(f'/citas/{sample_user.id}')
+        response = client.get(f'/citas/{sample_user.id}', headers=auth_headers)
         
         assert response.status_code == 200
         json_data = json.loads(response.data)
         assert json_data == []
     
-    def test_eliminar_cita_success(self, client, sample_user, sample_horario):
+    def test_eliminar_cita_success(self, client, sample_user, sample_horario, auth_headers):
         """Test eliminar cita exitosamente"""
         cita = Cita(
             pacienteId=sample_user.id,
@@ -181,7 +187,7 @@ class TestCitas:
         db.session.commit()
         cita_id = cita.id
         
-        response = client.delete(f'/citas/{cita_id}')
+        response = client.delete(f'/citas/{cita_id}', headers=auth_headers)
         
         assert response.status_code == 200
         json_data = json.loads(response.data)
@@ -191,10 +197,86 @@ class TestCitas:
         cita_eliminada = Cita.query.get(cita_id)
         assert cita_eliminada is None
     
-    def test_eliminar_cita_not_found(self, client):
+    def test_eliminar_cita_not_found(self, client, auth_headers):
         """Test eliminar cita inexistente"""
-        response = client.delete('/citas/999')
+        response = client.delete('/citas/999', headers=auth_headers)
         
         assert response.status_code == 404
         json_data = json.loads(response.data)
-        assert json_data['message'] == 'Cita no encontrada'
\ No newline at end of file
+        assert json_data['message'] == 'Cita no encontrada'
+
+    def _crear_citas(self, paciente_id, doctor_id, fechas_horas):
+        for fecha, hora in fechas_horas:
+            db.session.add(Cita(
+                pacienteId=paciente_id,
+                doctorId=doctor_id,
+                especialidad='Cardiología',
+                fecha=fecha,
+                hora=hora,
+                motivo='Control'
+            ))
+        db.session.commit()
+
+    def test_get_citas_usuario_paginacion(self, client, sample_user, sample_horario, auth_headers):
+        """Test paginación por cursor ordenada por fecha, hora e id"""
+        self._crear_citas(sample_user.id, sample_horario.doctorId, [
+            (date(2024, 12, 16), '09:00'),
+            (date(2024, 12, 15), '10:20'),
+            (date(2024, 12, 15), '09:00'),
+            (date(2024, 12, 17), '09:40'),
+            (date(2024, 12, 15), '09:40'),
+        ])
+
+        vistas = []
+        url = f'/citas/{sample_user.id}?limit=2'
+        paginas = 0
+        while url:
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            pagina = json.loads(response.data)
+            assert len(pagina) <= 2
+            vistas.extend((c['fecha'], c['hora']) for c in pagina)
+            cursor = response.headers.get('X-Next-Cursor')
+            url = f'/citas/{sample_user.id}?limit=2&cursor={cursor}' if cursor else None
+            paginas += 1
+
+        assert paginas == 3
+        assert vistas == [
+            ('2024-12-15', '09:00'),
+            ('2024-12-15', '09:40'),
+            ('2024-12-15', '10:20'),
+            ('2024-12-16', '09:00'),
+            ('2024-12-17', '09:40'),
+        ]
+
+    def test_get_citas_usuario_filtro_fechas(self, client, sample_user, sample_horario, auth_headers):
+        """Test filtros desde/hasta sobre las citas del paciente"""
+        self._crear_citas(sample_user.id, sample_horario.doctorId, [
+            (date(2024, 11, 30), '09:00'),
+            (date(2024, 12, 15), '09:00'),
+            (date(2024, 12, 31), '09:00'),
+            (date(2025, 1, 2), '09:00'),
+        ])
+
+        response = client.get(f'/citas/{sample_user.id}?desde=2024-12-01&hasta=2024-12-31', headers=auth_headers)
+
+        assert response.status_code == 200
+        json_data = json.loads(response.data)
+        assert [c['fecha'] for c in json_data] == ['2024-12-15', '2024-12-31']
+        assert 'X-Next-Cursor' not in response.headers
+
+    def test_get_citas_usuario_parametros_invalidos(self, client, sample_user, auth_headers):
+        """Test parámetros de paginación no válidos"""
+        response = client.get(f'/citas/{sample_user.id}?limit=0', headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.get(f'/citas/{sample_user.id}?limit=abc', headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.get(f'/citas/{sample_user.id}?desde=15-12-2024', headers=auth_headers)
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'Formato de fecha incorrecto, use YYYY-MM-DD'
+
+        response = client.get(f'/citas/{sample_user.id}?cursor=no-es-un-cursor', headers=auth_headers)
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'Cursor no válido'
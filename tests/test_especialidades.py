@@ -10,7 +10,10 @@ if not os.path.exists(backend_path):
 sys.path.insert(0, backend_path)
 sys.path.insert(0, '.')
 
+from api import create_app, db
 from models import Especialidad
+from catalog_cache import CatalogVersion
+from query_stats import count_queries
 
 
 class TestEspecialidades:
@@ -116,4 +119,98 @@ class TestEspecialidades:
         
         assert response.status_code == 404
         json_data = json.loads(response.data)
-        assert json_data['message'] == 'No se encontraron doctores para esta especialidad'
\ No newline at end of file
+        assert json_data['message'] == 'No se encontraron doctores para esta especialidad'
+
+    def test_get_especialidades_etag_304(self, client, sample_especialidad):
+        """Test revalidación con If-None-Match sin tocar la base de datos"""
+        response = client.get('/get-especialidades')
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'].startswith('public, max-age=')
+
+        with count_queries() as stats:
+            response = client.get('/get-especialidades', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert stats.count == 0
+
+    def test_get_doctores_etag_cambia_al_registrar(self, client, sample_especialidad):
+        """Test que registrar una especialidad invalida el ETag del catálogo"""
+        response = client.get('/get-doctores/Cardiología')
+        etag = response.headers['ETag']
+
+        data = {
+            'nombre': 'Cardiología',
+            'doctor': 'Dr. García',
+            'fechaIngreso': '2024-01-15'
+        }
+        client.post('/register-especialidad',
+                    data=json.dumps(data),
+                    content_type='application/json')
+
+        response = client.get('/get-doctores/Cardiología', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert sorted(json.loads(response.data)) == ['Dr. García', 'Dr. Smith']
+
+    def test_get_especialidades_empty_sin_etag(self, client):
+        """Test que las respuestas 404 no llevan ETag"""
+        response = client.get('/get-especialidades')
+
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+
+    def test_catalog_version_compartida_por_archivo(self, tmp_path):
+        """Test versión del catálogo compartida entre procesos mediante un archivo"""
+        path = str(tmp_path / 'catalog.version')
+        worker_a = CatalogVersion(path)
+        worker_b = CatalogVersion(path)
+
+        antes = worker_b.current()
+        worker_a.bump()
+
+        assert worker_b.current() != antes
+        assert worker_b.current() == worker_a.current()
+
+    def test_catalog_version_distinta_tras_fork(self):
+        """Test que dos procesos nacidos de un fork nunca comparten la versión en memoria"""
+        version = CatalogVersion()
+        version.bump()
+        lectura, escritura = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(lectura)
+            version.bump()
+            os.write(escritura, version.current().encode())
+            os._exit(0)
+        os.close(escritura)
+        version.bump()
+        en_hijo = os.read(lectura, 100).decode()
+        os.close(lectura)
+        os.waitpid(pid, 0)
+
+        assert en_hijo != version.current()
+
+    def test_etag_compartido_entre_workers(self, tmp_path):
+        """Test que un cambio del catálogo en un worker invalida el ETag emitido por otro"""
+        config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'catalogo.db'}", 'SECRET_KEY': 'catalogo',
+                  'SWAGGER_UI': False, 'RATE_LIMIT_ENABLED': False,
+                  'CATALOG_VERSION_FILE': str(tmp_path / 'catalog.version')}
+        worker_a, worker_b = create_app(dict(config)), create_app(dict(config))
+        with worker_a.app_context():
+            db.create_all()
+        cliente_a, cliente_b = worker_a.test_client(), worker_b.test_client()
+        cliente_a.post('/register-especialidad',
+                       json={'nombre': 'Cardiología', 'doctor': 'Dr. Smith', 'fechaIngreso': '2024-01-15'})
+        etag = cliente_b.get('/get-doctores/Cardiología').headers['ETag']
+
+        cliente_a.post('/register-especialidad',
+                       json={'nombre': 'Cardiología', 'doctor': 'Dr. García', 'fechaIngreso': '2024-01-15'})
+        response = cliente_b.get('/get-doctores/Cardiología', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert sorted(response.get_json()) == ['Dr. García', 'Dr. Smith']
@@ -0,0 +1,151 @@
+import pytest
+import json
+import sys
+import os
+import sqlite3
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import api
+from api import app, db
+from models import Cita
+from query_stats import count_queries
+from serialization import iter_json_rows
+
+ADMIN = {'X-Admin-Token': 'secreto-admin'}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', ADMIN['X-Admin-Token'])
+
+
+@pytest.fixture
+def citas(sample_user, sample_horario):
+    for i in range(7):
+        db.session.add(Cita(
+            pacienteId=sample_user.id,
+            doctorId=sample_horario.doctorId,
+            especialidad='Cardiología',
+            fecha=date(2024, 12, 15 + i),
+            hora='09:00',
+            motivo=f'Consulta {i}'
+        ))
+    db.session.commit()
+
+
+class TestExport:
+    """Pruebas para las exportaciones en streaming"""
+
+    def test_iter_json_rows_por_bloques(self):
+        """Test que el arreglo se emite en varios bloques y es JSON válido"""
+        filas = [(i, f'fila {i}') for i in range(5)]
+
+        bloques = list(iter_json_rows(('id', 'nombre'), filas, batch_size=2))
+
+        assert len(bloques) == 5
+        assert json.loads(b''.join(bloques)) == [{'id': i, 'nombre': f'fila {i}'} for i in range(5)]
+
+    def test_iter_json_rows_vacio(self):
+        """Test exportación sin filas"""
+        assert json.loads(b''.join(iter_json_rows(('id',), []))) == []
+        assert b''.join(iter_json_rows(('id',), [], 'ndjson')) == b''
+
+    def test_export_citas_json(self, client, admin_token, citas):
+        """Test exportación de citas como arreglo JSON en streaming"""
+        response = client.get('/export/citas', headers=ADMIN)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'application/json'
+        json_data = json.loads(response.data)
+        assert len(json_data) == 7
+        assert json_data[0]['fecha'] == '2024-12-15'
+        assert json_data[6]['motivo'] == 'Consulta 6'
+
+    def test_export_citas_ndjson(self, client, admin_token, citas):
+        """Test exportación de citas en NDJSON"""
+        response = client.get('/export/citas?formato=ndjson', headers=ADMIN)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lineas = response.data.decode('utf-8').splitlines()
+        assert len(lineas) == 7
+        assert json.loads(lineas[3])['fecha'] == '2024-12-18'
+
+    def test_export_paginado(self, client, admin_token, citas, monkeypatch):
+        """Test que la exportación lee una página por consulta, fuera del presupuesto por petición"""
+        monkeypatch.setattr(api, 'EXPORT_PAGE_SIZE', 2)
+
+        with count_queries() as stats:
+            response = client.get('/export/citas?formato=ndjson', headers=ADMIN)
+            filas = [json.loads(linea) for linea in response.get_data().splitlines()]
+
+        assert [fila['motivo'] for fila in filas] == [f'Consulta {i}' for i in range(7)]
+        assert stats.count == 4
+        assert not hasattr(app.view_functions['api.export_citas'], 'query_budget')
+        assert not hasattr(app.view_functions['api.export_horarios'], 'query_budget')
+
+    def test_export_horarios(self, client, admin_token, sample_horario):
+        """Test exportación de horarios con sus días"""
+        response = client.get('/export/horarios', headers=ADMIN)
+
+        assert response.status_code == 200
+        json_data = json.loads(response.data)
+        assert json_data == [{
+            'horarioId': sample_horario.id,
+            'doctorId': sample_horario.doctorId,
+            'doctor': 'Dr. Smith',
+            'especialidad': 'Cardiología',
+            'fecha': '2024-12-15',
+            'inicio': '09:00',
+            'fin': '17:00'
+        }]
+
+    def test_export_formato_invalido(self, client, admin_token):
+        """Test formato de exportación no soportado"""
+        response = client.get('/export/citas?formato=csv', headers=ADMIN)
+
+        assert response.status_code == 400
+
+    def test_export_requiere_token(self, client, admin_token):
+        """Test exportación sin token de administración"""
+        response = client.get('/export/citas')
+
+        assert response.status_code == 403
+
+    def test_export_deshabilitado_sin_configuracion(self, client):
+        """Test que sin ADMIN_TOKEN los endpoints de administración no existen"""
+        response = client.get('/export/citas', headers=ADMIN)
+
+        assert response.status_code == 404
+
+    def test_export_no_bloquea_escrituras(self, client, admin_token, sample_user, sample_horario):
+        """Test que una exportación a medio leer no impide reservar"""
+        db.session.execute(Cita.__table__.insert(), [
+            {'pacienteId': sample_user.id, 'doctorId': sample_horario.doctorId, 'especialidad': 'Cardiología',
+             'fecha': date(2024, 1, 1 + i % 28), 'hora': f'{8 + i % 10:02d}:00', 'motivo': f'Consulta {i}'}
+            for i in range(1500)
+        ])
+        db.session.commit()
+        response = client.get('/export/citas?formato=ndjson', headers=ADMIN)
+        cuerpo = response.response
+        primero = next(cuerpo)
+
+        conexion = sqlite3.connect(db.engine.url.database, timeout=0.5)
+        try:
+            conexion.execute("INSERT INTO cita (\"pacienteId\", \"doctorId\", especialidad, fecha, hora, motivo) "
+                             "VALUES (1, 1, 'Cardiología', '2025-01-10', '10:00', 'Durante la exportación')")
+            conexion.commit()
+        finally:
+            conexion.close()
+
+        lineas = (primero + b''.join(cuerpo)).decode().splitlines()
+        cuerpo.close()
+        assert len(lineas) >= 1500
@@ -0,0 +1,136 @@
+import pytest
+import json
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from flask_bcrypt import Bcrypt
+from api import app, create_app
+from hashing import HasherSaturated, PasswordHasher, calibrate_rounds, hash_rounds
+from models import User
+
+
+@pytest.fixture
+def hasher_lleno(monkeypatch):
+    """Reemplaza el hasher de la app por uno sin capacidad disponible"""
+    hasher = PasswordHasher(workers=0, max_pending=1, rounds=4)
+    hasher._slots.acquire()
+    monkeypatch.setitem(app.extensions, 'password_hasher', hasher)
+    return hasher
+
+
+class TestHashing:
+    """Pruebas para el hashing de contraseñas fuera del hilo de la petición"""
+
+    @pytest.mark.parametrize('workers', [0, 1])
+    def test_compatible_con_flask_bcrypt(self, workers):
+        """Test que los hashes son intercambiables con Flask-Bcrypt"""
+        hasher = PasswordHasher(workers=workers, max_pending=2, rounds=4)
+        flask_bcrypt = Bcrypt(app)
+        try:
+            propio = hasher.generate_password_hash('password123')
+            assert flask_bcrypt.check_password_hash(propio, 'password123')
+
+            externo = flask_bcrypt.generate_password_hash('password123').decode('utf-8')
+            assert hasher.check_password_hash(externo, 'password123')
+            assert not hasher.check_password_hash(externo, 'otra')
+            assert hasher.queue_depth == 0
+        finally:
+            hasher.shutdown()
+
+    def test_pool_repartido_entre_workers_web(self):
+        """Test que los procesos de bcrypt por defecto se reparten entre los workers web"""
+        cpus = os.cpu_count() or 1
+        por_worker = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'x', 'SWAGGER_UI': False,
+                                 'WEB_CONCURRENCY': cpus * 2})
+
+        assert por_worker.config['PASSWORD_HASH_WORKERS'] == 1
+        assert por_worker.extensions['password_hasher'].workers == 1
+
+    def test_pool_sin_fork_desde_el_worker(self):
+        """Test que el pool de bcrypt no crea sus procesos con fork desde un worker con hilos"""
+        hasher = PasswordHasher(workers=1, max_pending=1, rounds=4)
+        try:
+            assert hasher._get_executor()._mp_context.get_start_method() in ('forkserver', 'spawn')
+        finally:
+            hasher.shutdown()
+
+    def test_saturacion_rechaza_sin_esperar(self, hasher_lleno):
+        """Test que con la cola llena se rechaza de inmediato"""
+        with pytest.raises(HasherSaturated):
+            hasher_lleno.generate_password_hash('password123')
+
+    def test_login_saturado_responde_503(self, client, sample_user, hasher_lleno):
+        """Test que el login devuelve 503 cuando el pool está saturado"""
+        data = {
+            'correo': 'juan@test.com',
+            'password': 'password123'
+        }
+        response = client.post('/login',
+                               data=json.dumps(data),
+                               content_type='application/json')
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert json.loads(response.data)['message'] == 'Servicio ocupado, intente de nuevo en unos segundos.'
+
+    def test_disponibilidad_no_depende_del_pool(self, client, sample_horario, hasher_lleno):
+        """Test que las consultas de disponibilidad siguen atendiéndose con el pool lleno"""
+        response = client.get('/horarios-disponibles?doctorId=Dr. Smith&fecha=2024-12-15')
+
+        assert response.status_code == 200
+
+    def test_hash_rounds(self):
+        """Test lectura del factor de coste de un hash"""
+        assert hash_rounds('$2b$12$abcdefghijklmnopqrstuu') == 12
+        assert hash_rounds('$2a$04$abcdefghijklmnopqrstuu') == 4
+        assert hash_rounds('no-es-bcrypt') is None
+
+    def test_calibrate_rounds_respeta_limites(self):
+        """Test que la calibración se mantiene entre el mínimo y el máximo"""
+        assert calibrate_rounds(0.0001, min_rounds=4, max_rounds=6, sample_rounds=4, samples=1) == 4
+        assert calibrate_rounds(10 ** 6, min_rounds=4, max_rounds=6, sample_rounds=4, samples=1) == 6
+
+    def test_login_rehash_con_coste_distinto(self, client, monkeypatch):
+        """Test que el login vuelve a calcular el hash si su coste no es el objetivo"""
+        from api import db
+        antiguo = PasswordHasher(workers=0, max_pending=1, rounds=4)
+        user = User(nombre='Ana', correo='ana@test.com',
+                    password=antiguo.generate_password_hash('password123'), rol=1)
+        db.session.add(user)
+        db.session.commit()
+        monkeypatch.setitem(app.extensions, 'password_hasher', PasswordHasher(workers=0, max_pending=1, rounds=5))
+
+        data = {
+            'correo': 'ana@test.com',
+            'password': 'password123'
+        }
+        response = client.post('/login',
+                               data=json.dumps(data),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        db.session.refresh(user)
+        assert hash_rounds(user.password) == 5
+        assert antiguo.check_password_hash(user.password, 'password123')
+
+    def test_login_sin_rehash_con_coste_objetivo(self, client, sample_user):
+        """Test que un hash con el coste objetivo no se modifica"""
+        from api import db
+        anterior = sample_user.password
+        data = {
+            'correo': 'juan@test.com',
+            'password': 'password123'
+        }
+        client.post('/login',
+                    data=json.dumps(data),
+                    content_type='application/json')
+
+        db.session.refresh(sample_user)
+        assert sample_user.password == anterior
@@ -10,8 +10,10 @@ if not os.path.exists(backend_path):
 sys.path.insert(0, backend_path)
 sys.path.insert(0, '.')
 
-from models import Horario, HorarioDetail
-from api import generar_horarios
+from datetime import date, timedelta
+from models import Horario, HorarioDetail, Cita
+from api import generar_horarios, db
+from query_stats import count_queries
 
 class TestHorarios:
     """Pruebas para endpoints de horarios"""
@@ -151,4 +153,28 @@ class TestHorarios:
         
         assert response.status_code == 404
         json_data = json.loads(response.data)
-        assert json_data['error'] == 'No hay horario disponible para esta fecha'
\ No newline at end of file
+        assert json_data['error'] == 'No hay horario disponible para esta fecha'
+
+    def test_horarios_disponibles_query_count(self, client, sample_horario, sample_user):
+        """Test número fijo de consultas sin importar la longitud del horario"""
+        with count_queries() as consultas_corto:
+            client.get('/horarios-disponibles?doctorId=Dr. Smith&fecha=2024-12-15')
+
+        inicio = date(2025, 1, 1)
+        for i in range(365):
+            db.session.add(HorarioDetail(fecha=inicio + timedelta(days=i), inicio='08:00',
+                                         fin='18:00', horario_id=sample_horario.id))
+        for hora in ('08:00', '08:40', '09:20'):
+            db.session.add(Cita(pacienteId=sample_user.id, doctorId=sample_horario.doctorId,
+                                especialidad='Cardiología', fecha=date(2025, 6, 1),
+                                hora=hora, motivo='Control'))
+        db.session.commit()
+
+        with count_queries() as consultas_largo:
+            response = client.get('/horarios-disponibles?doctorId=Dr. Smith&fecha=2025-06-01')
+
+        assert response.status_code == 200
+        json_data = json.loads(response.data)
+        assert json_data[0] == '10:00'
+        assert '08:40' not in json_data
+        assert consultas_corto.count == consultas_largo.count == 3
@@ -76,6 +76,7 @@ class TestIntegration:
         assert '09:00' in horarios_disponibles
         
         paciente = User.query.filter_by(correo='ana@test.com').first()
+        headers = self._login(client, 'ana@test.com', 'password123')
         cita_data = {
             'pacienteId': paciente.id,
             'doctorId': 'Dr. Martínez',
@@ -86,7 +87,8 @@ class TestIntegration:
         }
         response = client.post('/register-cita',
                              data=json.dumps(cita_data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=headers)
         assert response.status_code == 201
         
         response = client.get('/horarios-disponibles?doctorId=Dr. Martínez&fecha=2024-12-20')
@@ -94,7 +96,7 @@ class TestIntegration:
         horarios_disponibles = json.loads(response.data)
         assert '09:00' not in horarios_disponibles
         
-        response = client.get(f'/citas/{paciente.id}')
+        response = client.get(f'/citas/{paciente.id}', headers=headers)
         assert response.status_code == 200
         citas = json.loads(response.data)
         assert len(citas) == 1
@@ -107,6 +109,7 @@ class TestIntegration:
         self._setup_test_data(client)
         
         paciente = User.query.filter_by(correo='test@example.com').first()
+        headers = self._login(client, 'test@example.com', 'password123')
         
         cita_data = {
             'pacienteId': paciente.id,
@@ -118,14 +121,15 @@ class TestIntegration:
         }
         response = client.post('/register-cita',
                              data=json.dumps(cita_data),
-                             content_type='application/json')
+                             content_type='application/json',
+                             headers=headers)
         assert response.status_code == 201
         
-        response = client.get(f'/citas/{paciente.id}')
+        response = client.get(f'/citas/{paciente.id}', headers=headers)
         citas = json.loads(response.data)
         cita_id = citas[0]['id']
         
-        response = client.delete(f'/citas/{cita_id}')
+        response = client.delete(f'/citas/{cita_id}', headers=headers)
         assert response.status_code == 200
         
         response = client.get('/horarios-disponibles?doctorId=Dr. Test&fecha=2024-12-25')
@@ -133,7 +137,7 @@ class TestIntegration:
         horarios_disponibles = json.loads(response.data)
         assert '10:00' in horarios_disponibles
         
-        response = client.get(f'/citas/{paciente.id}')
+        response = client.get(f'/citas/{paciente.id}', headers=headers)
         citas = json.loads(response.data)
         assert len(citas) == 0
     
@@ -149,6 +153,7 @@ class TestIntegration:
         ]
         
         pacientes_ids = []
+        pacientes_headers = {}
         for paciente_data in pacientes_data:
             response = client.post('/register',
                                  data=json.dumps(paciente_data),
@@ -157,6 +162,7 @@ class TestIntegration:
             
             paciente = User.query.filter_by(correo=paciente_data['correo']).first()
             pacientes_ids.append(paciente.id)
+            pacientes_headers[paciente.id] = self._login(client, paciente_data['correo'], paciente_data['password'])
         
         horarios = ['09:00', '09:40', '10:20']
         
@@ -171,7 +177,8 @@ class TestIntegration:
             }
             response = client.post('/register-cita',
                                  data=json.dumps(cita_data),
-                                 content_type='application/json')
+                                 content_type='application/json',
+                                 headers=pacientes_headers[paciente_id])
             assert response.status_code == 201
         
         response = client.get('/horarios-disponibles?doctorId=Dr. Test&fecha=2024-12-25')
@@ -182,7 +189,7 @@ class TestIntegration:
             assert hora not in horarios_disponibles
         
         for paciente_id in pacientes_ids:
-            response = client.get(f'/citas/{paciente_id}')
+            response = client.get(f'/citas/{paciente_id}', headers=pacientes_headers[paciente_id])
             citas = json.loads(response.data)
             assert len(citas) == 1
     
@@ -216,6 +223,14 @@ class TestIntegration:
         response = client.get('/get-especialidades')
         assert response.status_code == 404
     
+    def _login(self, client, correo, password):
+        """Método helper que inicia sesión y devuelve la cabecera Authorization"""
+        response = client.post('/login',
+                               data=json.dumps({'correo': correo, 'password': password}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        return {'Authorization': f"Bearer {json.loads(response.data)['token']}"}
+    
     def _setup_test_data(self, client):
         """Método helper para configurar datos de prueba"""
         # Registrar paciente
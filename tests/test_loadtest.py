@@ -0,0 +1,140 @@
+import pytest
+import http.client
+import sys
+import os
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import loadtest
+from api import db
+from models import Cita
+
+DESDE = date(2024, 1, 1)
+
+
+@pytest.fixture(scope='module')
+def sintetica(app_sintetica):
+    """Aplicación sobre una base sintética pequeña con bcrypt barato"""
+    return app_sintetica(doctores=10, pacientes=50, citas=2000, desde=DESDE, anios=1)
+
+
+class _ConexionCerrada:
+    """Conexión keep-alive ya usada que el servidor cerró: falla al enviar o al leer la respuesta."""
+
+    def __init__(self, falla_en, enviadas):
+        self.sock = object()
+        self.falla_en = falla_en
+        self.enviadas = enviadas
+
+    def request(self, method, url, body, headers):
+        if self.falla_en == 'request':
+            raise BrokenPipeError()
+        self.enviadas.append(method)
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected()
+
+    def close(self):
+        self.sock = None
+
+
+class _Respuesta:
+    status = 200
+
+    def read(self):
+        return b'{}'
+
+
+class _ConexionNueva:
+    sock = None
+
+    def __init__(self, enviadas):
+        self.enviadas = enviadas
+
+    def request(self, method, url, body, headers):
+        self.enviadas.append(method)
+
+    def getresponse(self):
+        return _Respuesta()
+
+
+def _transporte(falla_en, enviadas):
+    transporte = loadtest.HTTPTransport('http://localhost:1')
+    conexiones = iter([_ConexionCerrada(falla_en, enviadas), _ConexionNueva(enviadas)])
+    transporte._connection = lambda: next(conexiones)
+    return transporte
+
+
+def _informe(app, **kwargs):
+    return loadtest.run_load(loadtest.TestClientTransport(app), pacientes=50, desde=DESDE, anios=1, **kwargs)
+
+
+class TestLoadTest:
+    """Pruebas para el generador de carga del flujo de reserva"""
+
+    def test_flujo_completo(self, sintetica):
+        """Test que cada flujo recorre todos los endpoints y deja la base como estaba"""
+        with sintetica.app_context():
+            antes = db.session.query(Cita).count()
+
+        informe = _informe(sintetica, concurrency=3, flows=9)
+
+        assert informe['flows']['completed'] + informe['flows']['failed'] == 9
+        assert informe['flows']['completed'] >= 8
+        for paso in loadtest.FLOW_STEPS:
+            datos = informe['endpoints'][paso]
+            assert datos['requests'] >= informe['flows']['completed']
+            assert datos['latency']['p50_ms'] <= datos['latency']['p99_ms']
+        assert informe['endpoints']['POST /register-cita']['statuses'].get('201') == informe['flows']['completed']
+        with sintetica.app_context():
+            assert db.session.query(Cita).count() == antes
+
+    def test_fallos_por_paso(self, sintetica):
+        """Test que un paso con estado inesperado abandona el flujo y se contabiliza"""
+        informe = _informe(sintetica, concurrency=2, flows=4, password='incorrecta')
+
+        assert informe['flows'] == dict(informe['flows'], completed=0, failed=4,
+                                        failures={'POST /login -> 401': 4})
+        assert informe['endpoints']['GET /get-especialidades']['latency'] is None
+
+    def test_compare(self):
+        """Test variación entre informes: positiva cuando empeora"""
+        def informe(rps, p50):
+            lat = {'p50_ms': p50, 'p95_ms': p50 * 2, 'p99_ms': p50 * 3}
+            return {'flows': {'flows_per_second': rps, 'latency': lat},
+                    'endpoints': {'POST /login': {'throughput_rps': rps, 'latency': lat}}}
+
+        cambios = loadtest.compare(informe(10, 100), informe(8, 150))
+
+        assert cambios['flujo']['flows_per_second'] == 20.0
+        assert cambios['POST /login'] == {'throughput_rps': 20.0, 'p50_ms': 50.0, 'p95_ms': 50.0, 'p99_ms': 50.0}
+
+    @pytest.mark.parametrize('metodo, falla_en, reintenta, llegadas', [
+        ('POST', 'request', True, 1),
+        ('POST', 'getresponse', False, 1),
+        ('GET', 'getresponse', True, 2),
+        ('DELETE', 'getresponse', True, 2),
+    ])
+    def test_reintento_solo_si_es_seguro(self, metodo, falla_en, reintenta, llegadas):
+        """Test que un POST que pudo llegar al servidor no se envía dos veces"""
+        enviadas = []
+        transporte = _transporte(falla_en, enviadas)
+
+        if reintenta:
+            assert transporte.request(metodo, '/register-cita', body={}) == (200, b'{}')
+        else:
+            with pytest.raises(http.client.RemoteDisconnected):
+                transporte.request(metodo, '/register-cita', body={})
+
+        assert len(enviadas) == llegadas
+
+    def test_requiere_limite(self, sintetica):
+        """Test que sin duración ni número de flujos se rechaza la ejecución"""
+        with pytest.raises(ValueError):
+            _informe(sintetica)
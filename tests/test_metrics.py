@@ -0,0 +1,91 @@
+import pytest
+import json
+import re
+import subprocess
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import metrics
+from api import app
+
+
+def _valor(client, serie):
+    """Valor actual de una serie de /metrics (0 si todavía no existe)"""
+    texto = client.get('/metrics').get_data(as_text=True)
+    match = re.search(r'^' + re.escape(serie) + r' (\S+)$', texto, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def _snapshot(pid, peticiones, en_curso):
+    return {
+        'pid': pid,
+        'requests': [['/login', 'POST', 200, peticiones]],
+        'latency': [['/login', 'POST', [0] * 6 + [peticiones] + [0] * 5, 0.3 * peticiones]],
+        'db': [['/login', 0.002 * peticiones, 2 * peticiones]],
+        'cache': [['token', 'hit', peticiones]],
+        'gauges': {'in_flight': en_curso, 'password_hash_queue_depth': en_curso},
+    }
+
+
+class TestMetrics:
+    """Pruebas para el endpoint /metrics"""
+
+    def test_peticiones_latencia_y_base(self, client, sample_especialidad):
+        """Test contadores, histograma y tiempo en base por ruta"""
+        ruta = 'route="/get-especialidades"'
+        peticiones = f'citatusalud_http_requests_total{{{ruta},method="GET",status="200"}}'
+        total = f'citatusalud_http_request_duration_seconds_bucket{{{ruta},method="GET",le="+Inf"}}'
+        consultas = f'citatusalud_db_queries_total{{{ruta}}}'
+        antes = [_valor(client, serie) for serie in (peticiones, total, consultas)]
+
+        client.get('/get-especialidades')
+        client.get('/get-especialidades')
+
+        despues = [_valor(client, serie) for serie in (peticiones, total, consultas)]
+        assert [b - a for a, b in zip(antes, despues)] == [2, 2, 2]
+
+    def test_aciertos_de_cache(self, client, sample_especialidad):
+        """Test que un 304 del catálogo cuenta como acierto"""
+        serie = 'citatusalud_cache_requests_total{cache="catalog_etag",result="hit"}'
+        etag = client.get('/get-especialidades').headers['ETag']
+        antes = _valor(client, serie)
+
+        client.get('/get-especialidades', headers={'If-None-Match': etag})
+
+        assert _valor(client, serie) - antes == 1
+
+    def test_gauges(self, client):
+        """Test que se exponen las peticiones en curso y la cola de bcrypt"""
+        texto = client.get('/metrics').get_data(as_text=True)
+
+        assert 'citatusalud_http_requests_in_flight 1' in texto
+        assert 'citatusalud_password_hash_queue_depth 0' in texto
+        assert client.get('/metrics').mimetype == 'text/plain'
+
+    def test_agregacion_entre_procesos(self, client, tmp_path, monkeypatch):
+        """Test suma de instantáneas; los gauges de procesos terminados se ignoran"""
+        metrics.REGISTRY.reset()
+        monkeypatch.setitem(app.config, 'METRICS_DIR', str(tmp_path))
+        monkeypatch.setattr(metrics.REGISTRY, 'flusher', object())
+        terminado = subprocess.Popen([sys.executable, '-c', 'pass'])
+        terminado.wait()
+        for pid, peticiones, en_curso in ((os.getppid(), 3, 2), (terminado.pid, 4, 5)):
+            with open(tmp_path / f'metrics-{pid}.json', 'w') as f:
+                json.dump(_snapshot(pid, peticiones, en_curso), f)
+
+        texto = client.get('/metrics').get_data(as_text=True)
+
+        assert 'citatusalud_http_requests_total{route="/login",method="POST",status="200"} 7' in texto
+        assert 'citatusalud_http_request_duration_seconds_bucket{route="/login",method="POST",le="0.25"} 0' in texto
+        assert 'citatusalud_http_request_duration_seconds_bucket{route="/login",method="POST",le="0.5"} 7' in texto
+        assert 'citatusalud_db_queries_total{route="/login"} 14' in texto
+        assert 'citatusalud_cache_requests_total{cache="token",result="hit"} 7' in texto
+        assert 'citatusalud_password_hash_queue_depth 2' in texto
+        assert os.path.exists(tmp_path / f'metrics-{os.getpid()}.json')
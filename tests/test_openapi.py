@@ -0,0 +1,60 @@
+import pytest
+import json
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from flask import Flask
+from api import app
+from openapi import build_spec, init_openapi
+
+
+class TestOpenAPI:
+    """Pruebas para la especificación OpenAPI precalculada"""
+
+    def test_spec_estatica_al_dia(self):
+        """Test que backend/openapi.json coincide con los docstrings de las rutas"""
+        with open(app.config['OPENAPI_SPEC_PATH'], 'rb') as f:
+            actual = f.read()
+
+        assert actual == build_spec(app), 'Ejecute scripts/generate_openapi.py'
+
+    def test_openapi_json_con_etag(self, client):
+        """Test que /openapi.json se sirve con ETag y responde 304 si no cambió"""
+        response = client.get('/openapi.json')
+
+        assert response.status_code == 200
+        assert '/login' in json.loads(response.data)['paths']
+        etag = response.headers['ETag']
+
+        response = client.get('/openapi.json', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_swagger_ui_no_analiza_docstrings(self, client, monkeypatch):
+        """Test que la interfaz Swagger recibe la especificación estática"""
+        def no_llamar(*args, **kwargs):
+            raise AssertionError('no debe analizar los docstrings')
+        monkeypatch.setattr(app.swag, 'get_apispecs', no_llamar)
+
+        response = client.get('/apispec_1.json')
+
+        assert response.status_code == 200
+        assert response.data == client.get('/openapi.json').data
+
+    def test_sin_swagger_ui(self):
+        """Test que con SWAGGER_UI desactivado solo se registra /openapi.json"""
+        nueva = Flask(__name__)
+        nueva.config['SWAGGER_UI'] = False
+        nueva.config['OPENAPI_SPEC_PATH'] = app.config['OPENAPI_SPEC_PATH']
+        init_openapi(nueva, {})
+
+        rutas = {rule.rule for rule in nueva.url_map.iter_rules()}
+        assert '/openapi.json' in rutas
+        assert '/apidocs/' not in rutas
+        assert nueva.test_client().get('/openapi.json').status_code == 200
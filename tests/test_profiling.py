@@ -0,0 +1,95 @@
+import pytest
+import json
+import sys
+import os
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import profiling
+from api import app, create_app, db
+from models import Especialidad, Horario, HorarioDetail
+
+ADMIN = {'X-Admin-Token': 'secreto-admin'}
+PERFILAR = {'X-Profile': 'secreto-admin'}
+DISPONIBILIDAD = '/horarios-disponibles?doctorId=Dr. Smith&fecha=2024-12-15'
+
+
+@pytest.fixture
+def perfilada(tmp_path):
+    """Aplicación con perfilado activo y un horario cargado"""
+    nueva = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'perfil.db'}",
+        'SECRET_KEY': 'clave-de-prueba',
+        'SWAGGER_UI': False,
+        'ADMIN_TOKEN': ADMIN['X-Admin-Token'],
+        'PROFILE_DIR': str(tmp_path / 'perfiles'),
+    })
+    with nueva.app_context():
+        db.create_all()
+        especialidad = Especialidad(nombre='Cardiología', doctor='Dr. Smith')
+        db.session.add(especialidad)
+        db.session.commit()
+        horario = Horario(doctorId=especialidad.id, doctor='Dr. Smith', especialidad='Cardiología')
+        db.session.add(horario)
+        db.session.commit()
+        db.session.add(HorarioDetail(fecha=date(2024, 12, 15), inicio='09:00', fin='12:00', horario_id=horario.id))
+        db.session.commit()
+    return nueva
+
+
+class TestProfiling:
+    """Pruebas para el perfilado de peticiones bajo demanda"""
+
+    def test_desactivado_sin_hooks(self):
+        """Test que sin PROFILE_DIR no se registra nada"""
+        assert profiling._start_profile not in app.before_request_funcs.get(None, [])
+        assert 'list_profiles' not in app.view_functions
+
+    def test_perfil_por_cabecera(self, perfilada):
+        """Test que la cabecera autorizada genera un perfil recuperable"""
+        client = perfilada.test_client()
+        response = client.get(DISPONIBILIDAD, headers=PERFILAR)
+
+        assert response.status_code == 200
+        perfil = response.headers['X-Profile-Id']
+        assert perfil.endswith('-200-api.horarios_disponibles.prof')
+
+        listado = json.loads(client.get('/admin/profiles', headers=ADMIN).data)
+        assert [p['id'] for p in listado] == [perfil]
+        assert listado[0]['endpoint'] == 'api.horarios_disponibles'
+
+        texto = client.get(f'/admin/profiles/{perfil}?formato=texto', headers=ADMIN)
+        assert 'horarios_disponibles' in texto.get_data(as_text=True)
+        assert client.get(f'/admin/profiles/{perfil}', headers=ADMIN).mimetype == 'application/octet-stream'
+
+    def test_cabecera_no_autorizada(self, perfilada):
+        """Test que una cabecera con otro token no perfila"""
+        response = perfilada.test_client().get(DISPONIBILIDAD, headers={'X-Profile': 'otro'})
+
+        assert 'X-Profile-Id' not in response.headers
+        assert os.listdir(perfilada.config['PROFILE_DIR']) == []
+
+    def test_muestreo_y_rotacion(self, perfilada):
+        """Test muestreo por endpoint y que solo se conservan los últimos perfiles"""
+        perfilada.config.update(PROFILE_SAMPLE_RATE=1.0, PROFILE_MAX_FILES=2,
+                                PROFILE_ENDPOINTS={'api.horarios_disponibles'})
+        client = perfilada.test_client()
+
+        ids = [client.get(DISPONIBILIDAD).headers['X-Profile-Id'] for _ in range(3)]
+        otra = client.get('/get-especialidades')
+
+        assert 'X-Profile-Id' not in otra.headers
+        assert sorted(os.listdir(perfilada.config['PROFILE_DIR'])) == sorted(ids[1:])
+
+    def test_perfil_inexistente(self, perfilada):
+        """Test que un id inválido o inexistente devuelve 404"""
+        client = perfilada.test_client()
+
+        assert client.get('/admin/profiles/..%2Fperfil.db', headers=ADMIN).status_code == 404
+        assert client.get('/admin/profiles/1-1-1ms-200-api.login.prof', headers=ADMIN).status_code == 404
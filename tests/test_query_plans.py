@@ -0,0 +1,72 @@
+import pytest
+import re
+import sys
+import os
+from datetime import date, timedelta
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import queries
+from sqlalchemy import event
+from api import db
+from query_stats import _explain
+
+INICIO = date(2024, 1, 1)
+
+# Recorridos completos de una tabla: "SCAN cita" o "SCAN cita USING INDEX ..." (el
+# índice solo se usa para ordenar). Las búsquedas por índice aparecen como SEARCH.
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)')
+
+
+@pytest.fixture(scope='module')
+def poblada(app_sintetica):
+    """Base de datos con volumen realista y estadísticas del planificador (ANALYZE)"""
+    app = app_sintetica(seed=43, doctores=200, pacientes=5000, citas=60000, desde=INICIO, anios=1)
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def _plan(statement):
+    """Plan de SQLite para la sentencia tal como la emite SQLAlchemy."""
+    conn = db.session.connection()
+    emitida = []
+
+    def capturar(conn, cursor, sql, parameters, context, executemany):
+        emitida.append((sql, parameters))
+
+    event.listen(conn, 'before_cursor_execute', capturar)
+    try:
+        db.session.execute(statement).all()
+    finally:
+        event.remove(conn, 'before_cursor_execute', capturar)
+    return _explain(conn, *emitida[0])
+
+
+HOT_QUERIES = {
+    'doctor': lambda: queries.doctor_id('Dr. Ana García 17'),
+    'horario_del_dia': lambda: queries.horario_del_dia(17, INICIO + timedelta(days=42)),
+    'horas_ocupadas': lambda: queries.horas_ocupadas(17, INICIO + timedelta(days=42)),
+    'cita_en_conflicto': lambda: queries.cita_en_conflicto(17, INICIO + timedelta(days=42), '09:30'),
+    'citas_de_paciente': lambda: queries.citas_de_paciente(42, 21),
+    'citas_de_paciente_rango': lambda: queries.citas_de_paciente(
+        42, 21, desde=INICIO, hasta=INICIO + timedelta(days=90), posicion=(INICIO + timedelta(days=10), '09:00', 5)),
+}
+
+
+class TestQueryPlans:
+    """Pruebas de regresión de planes de consulta para las rutas más frecuentes"""
+
+    @pytest.mark.parametrize('nombre', sorted(HOT_QUERIES))
+    def test_sin_recorrido_completo(self, poblada, nombre):
+        """Test que ninguna consulta frecuente recorre una tabla entera"""
+        with poblada.app_context():
+            plan = _plan(HOT_QUERIES[nombre]())
+
+        assert plan and not plan[0].startswith('EXPLAIN no disponible'), plan
+        assert not [linea for linea in plan if FULL_SCAN.match(linea)], f'{nombre}: {plan}'
@@ -0,0 +1,107 @@
+import pytest
+import json
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from api import app
+from query_stats import QueryBudgetExceeded, SlowQueryLog, count_queries, statement_shape
+
+
+class TestQueryStats:
+    """Pruebas para la instrumentación de consultas SQL por petición"""
+
+    def test_count_queries(self, client, sample_especialidad):
+        """Test conteo de consultas de un endpoint de catálogo"""
+        with count_queries() as stats:
+            response = client.get('/get-especialidades')
+
+        assert response.status_code == 200
+        assert stats.count == 1
+        assert stats.total_time > 0
+        assert 'FROM especialidad' in stats.slowest_statement
+
+    def test_debug_headers(self, client, sample_horario, monkeypatch):
+        """Test cabeceras de diagnóstico cuando están habilitadas"""
+        monkeypatch.setitem(app.config, 'SQL_STATS_HEADERS', True)
+        response = client.get('/horarios-disponibles?doctorId=Dr. Smith&fecha=2024-12-15')
+
+        assert response.status_code == 200
+        assert response.headers['X-DB-Query-Count'] == '3'
+        assert float(response.headers['X-DB-Time-Ms']) > 0
+        assert 'X-DB-Slowest-Query' in response.headers
+
+    def test_headers_hidden_by_default(self, client, sample_especialidad):
+        """Test que fuera de modo debug no se exponen las cabeceras"""
+        response = client.get('/get-especialidades')
+
+        assert 'X-DB-Query-Count' not in response.headers
+
+    def test_budget_exceeded_fails(self, client, sample_especialidad, monkeypatch):
+        """Test que un endpoint que supera su presupuesto falla en pruebas"""
+        monkeypatch.setattr(app.view_functions['api.get_especialidades'], 'query_budget', 0)
+
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/get-especialidades')
+
+    def test_budget_exceeded_only_logged_when_not_strict(self, client, sample_especialidad, monkeypatch, caplog):
+        """Test que fuera del modo estricto solo se registra una advertencia"""
+        monkeypatch.setitem(app.config, 'SQL_QUERY_BUDGET_STRICT', False)
+        monkeypatch.setattr(app.view_functions['api.get_especialidades'], 'query_budget', 0)
+
+        response = client.get('/get-especialidades')
+
+        assert response.status_code == 200
+        assert 'presupuesto: 0' in caplog.text
+
+    def test_repeated_statement_detected(self, client, sample_especialidad, monkeypatch):
+        """Test detección de sentencias repetidas (N+1)"""
+        monkeypatch.setitem(app.config, 'SQL_N_PLUS_ONE_THRESHOLD', 1)
+
+        with pytest.raises(QueryBudgetExceeded, match='repitió'):
+            client.get('/get-especialidades')
+
+    def test_statement_shape(self):
+        """Test que literales y listas IN se reducen a la misma plantilla"""
+        assert statement_shape("SELECT * FROM cita WHERE id IN (?, ?, ?) AND hora = '09:00'") == \
+            statement_shape('SELECT *\n  FROM cita WHERE id IN (?, ?) AND hora = ?')
+
+    def test_slow_query_log(self, client, sample_horario, monkeypatch, caplog):
+        """Test registro de consultas lentas con plan y parámetros anonimizados"""
+        slow_log = SlowQueryLog(0)
+        monkeypatch.setitem(app.extensions, 'slow_query_log', slow_log)
+
+        for _ in range(2):
+            client.get('/horarios-disponibles?doctorId=Dr. Smith&fecha=2024-12-15')
+
+        registros = [json.loads(r.getMessage().split(' ', 2)[2]) for r in caplog.records
+                     if r.getMessage().startswith('consulta lenta')]
+        assert {r['endpoint'] for r in registros} == {'api.horarios_disponibles'}
+        assert sum('plan' in r for r in registros) == 3
+        assert 'Dr. Smith' not in caplog.text
+        assert ['str(9)'] in [r['parameters'][:1] for r in registros]
+
+        informe = slow_log.report()
+        assert len(informe) == 3
+        assert all(e['ejecuciones'] == 2 and e['lentas'] == 2 for e in informe)
+        assert informe[0]['totalMs'] >= informe[-1]['totalMs']
+        assert any('SCAN' in linea or 'SEARCH' in linea for e in informe for linea in e['plan'])
+
+    def test_slow_query_threshold(self, client, sample_especialidad, monkeypatch, caplog):
+        """Test que bajo el umbral solo se agrega, sin registrar"""
+        slow_log = SlowQueryLog(10)
+        monkeypatch.setitem(app.extensions, 'slow_query_log', slow_log)
+        monkeypatch.setitem(app.config, 'ADMIN_TOKEN', 'secreto-admin')
+
+        client.get('/get-especialidades')
+        informe = json.loads(client.get('/admin/slow-queries', headers={'X-Admin-Token': 'secreto-admin'}).data)
+
+        assert 'consulta lenta' not in caplog.text
+        assert informe[0]['endpoints'] == {'api.get_especialidades': 1}
+        assert informe[0]['lentas'] == 0 and informe[0]['plan'] is None
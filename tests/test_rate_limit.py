@@ -0,0 +1,181 @@
+import pytest
+import json
+import math
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from api import app, create_app, db
+from query_stats import count_queries
+import rate_limit
+from rate_limit import MemoryBucketStore, RateLimiter, RedisBucketStore
+
+
+@pytest.fixture
+def limites(monkeypatch):
+    """Límites pequeños para poder agotarlos en una prueba"""
+    limiter = RateLimiter(MemoryBucketStore(), {
+        'login_ip': (5, 60),
+        'login_correo': (2, 60),
+        'register_ip': (2, 60),
+    })
+    monkeypatch.setitem(app.extensions, 'rate_limiter', limiter)
+    return limiter
+
+
+class FakeRedis:
+    """Cliente mínimo: el script registrado aplica en Python lo mismo que _REDIS_TAKE.
+
+    Las claves caducan según el `now` que recibe el script, para poder simular
+    el paso del tiempo sin esperar.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttl = {}
+        self.scripts = []
+
+    def register_script(self, script):
+        self.scripts.append(script)
+
+        def take(keys, args):
+            key = keys[0]
+            rate, capacity, now = (float(arg) for arg in args)
+            if key in self.ttl and now >= self.ttl[key][0] + self.ttl[key][1]:
+                del self.hashes[key], self.ttl[key]
+            bucket = self.hashes.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket['tokens'] + (now - bucket['ts']) * rate)
+            retry_after = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self.hashes[key] = {'tokens': tokens, 'ts': now}
+            self.ttl[key] = (now, math.ceil(capacity / rate) + 1)
+            return str(retry_after).encode()
+        return take
+
+
+def _login(client, correo, password='incorrecta', ip='10.0.0.1'):
+    return client.post('/login',
+                       data=json.dumps({'correo': correo, 'password': password}),
+                       content_type='application/json',
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+class TestRateLimit:
+    """Pruebas para la limitación de intentos de login y registro"""
+
+    def test_bucket_recarga_con_el_tiempo(self):
+        """Test que la cubeta se vacía y recupera tokens a la tasa indicada"""
+        store = MemoryBucketStore()
+        assert store.take('k', 1.0, 2, now=100.0) == 0
+        assert store.take('k', 1.0, 2, now=100.0) == 0
+        assert store.take('k', 1.0, 2, now=100.0) == pytest.approx(1.0)
+        assert store.take('k', 1.0, 2, now=101.0) == 0
+
+    def test_redis_rafaga_recarga_y_caducidad(self):
+        """Test que el store de Redis agota la ráfaga, recarga con el tiempo y pone caducidad a la clave"""
+        redis = FakeRedis()
+        store = RedisBucketStore(redis)
+
+        assert redis.scripts == [rate_limit._REDIS_TAKE]
+        assert [store.take('k', 0.5, 2, now=100.0) for _ in range(3)] == [0, 0, pytest.approx(2.0)]
+        assert store.take('k', 0.5, 2, now=102.0) == 0
+        assert store.take('k', 0.5, 2, now=102.0) == pytest.approx(2.0)
+        # Caduca cuando la cubeta ya estaría llena: ceil(capacidad / tasa) + 1 segundos.
+        assert redis.ttl['citatusalud:rl:k'][1] == 5
+        assert store.take('k', 0.5, 2, now=107.0) == 0
+        assert 'citatusalud:rl:k' in redis.hashes
+
+    def test_login_limitado_con_redis(self, client, monkeypatch):
+        """Test que con el store de Redis el login agotado responde 429 con Retry-After"""
+        redis = FakeRedis()
+        monkeypatch.setitem(app.extensions, 'rate_limiter', RateLimiter(RedisBucketStore(redis), {
+            'login_ip': (2, 60), 'login_correo': (100, 60), 'register_ip': (2, 60)}))
+
+        estados = [_login(client, f'usuario{i}@test.com') for i in range(3)]
+
+        assert [r.status_code for r in estados] == [404, 404, 429]
+        assert int(estados[2].headers['Retry-After']) >= 1
+        assert 'citatusalud:rl:login_ip:10.0.0.1' in redis.ttl
+
+    def test_store_acotado_lru(self):
+        """Test que el store expulsa la clave menos usada al superar el máximo"""
+        store = MemoryBucketStore(maxsize=2)
+        store.take('a', 1.0, 1, now=0.0)
+        store.take('b', 1.0, 1, now=0.0)
+        store.take('a', 1.0, 1, now=0.0)
+        store.take('c', 1.0, 1, now=0.0)
+
+        assert len(store) == 2
+        assert 'b' not in store._buckets
+
+    def test_login_limitado_por_correo(self, client, sample_user, limites, monkeypatch):
+        """Test que se rechaza con 429 sin consultar la base ni calcular bcrypt"""
+        for _ in range(2):
+            assert _login(client, 'juan@test.com').status_code == 401
+
+        def no_llamar(*args, **kwargs):
+            raise AssertionError('bcrypt no debe ejecutarse')
+        monkeypatch.setattr(app.extensions['password_hasher'], 'check_password_hash', no_llamar)
+
+        with count_queries() as stats:
+            response = _login(client, 'JUAN@test.com', password='password123')
+
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert stats.count == 0
+
+    def test_login_limitado_por_ip(self, client, limites):
+        """Test que una IP que prueba muchos correos distintos es rechazada"""
+        estados = [_login(client, f'usuario{i}@test.com').status_code for i in range(6)]
+
+        assert estados[:5] == [404] * 5
+        assert estados[5] == 429
+        assert _login(client, 'otro@test.com', ip='10.0.0.2').status_code == 404
+
+    def test_register_limitado_por_ip(self, client, limites):
+        """Test que el registro también se limita por IP"""
+        estados = []
+        for i in range(3):
+            data = {'nombre': 'Test', 'correo': f'nuevo{i}@test.com', 'password': 'password123', 'rol': 1}
+            estados.append(client.post('/register', data=json.dumps(data),
+                                       content_type='application/json').status_code)
+
+        assert estados == [201, 201, 429]
+
+    def test_limite_desactivado(self, client, limites, monkeypatch):
+        """Test que RATE_LIMIT_ENABLED=False deja pasar todas las peticiones"""
+        monkeypatch.setitem(app.config, 'RATE_LIMIT_ENABLED', False)
+
+        estados = [_login(client, 'juan@test.com').status_code for _ in range(4)]
+
+        assert 429 not in estados
+
+    @pytest.mark.parametrize('proxies, limitado', [(1, False), (0, True)])
+    def test_limite_por_ip_tras_proxy(self, tmp_path, proxies, limitado):
+        """Test que con PROXY_FIX_X_FOR la IP sale de X-Forwarded-For y sin él se ignora"""
+        proxy_app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'proxy.db'}", 'SECRET_KEY': 'proxy',
+                                'SWAGGER_UI': False, 'RATE_LIMIT_LOGIN_IP': (2, 60), 'PROXY_FIX_X_FOR': proxies})
+        with proxy_app.app_context():
+            db.create_all()
+        client = proxy_app.test_client()
+
+        def login(i, cliente):
+            return client.post('/login', data=json.dumps({'correo': f'usuario{i}@test.com', 'password': 'x'}),
+                               content_type='application/json',
+                               environ_base={'REMOTE_ADDR': '10.0.0.254'},
+                               headers={'X-Forwarded-For': cliente})
+
+        assert [login(i, '203.0.113.1').status_code for i in range(3)] == [404, 404, 429]
+        assert login(3, '203.0.113.2').status_code == (429 if limitado else 404)
@@ -0,0 +1,52 @@
+import pytest
+import json
+import sys
+import os
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import serialization
+from serialization import dumps_bytes, rows_to_dicts
+
+
+class TestSerialization:
+    """Pruebas para la serialización JSON rápida"""
+
+    @pytest.fixture(params=['orjson', 'stdlib'])
+    def backend(self, request, monkeypatch):
+        if request.param == 'stdlib':
+            monkeypatch.setattr(serialization, 'orjson', None)
+        elif serialization.orjson is None:
+            pytest.skip('orjson no está instalado')
+        return request.param
+
+    def test_dumps_fechas_y_acentos(self, backend):
+        """Test fechas en formato YYYY-MM-DD y texto sin escapar"""
+        data = dumps_bytes({'fecha': date(2024, 12, 15), 'especialidad': 'Cardiología'})
+
+        assert json.loads(data) == {'fecha': '2024-12-15', 'especialidad': 'Cardiología'}
+        assert 'Cardiología'.encode('utf-8') in data
+
+    def test_rows_to_dicts(self, backend):
+        """Test conversión de tuplas de resultado a objetos JSON"""
+        filas = [(1, date(2024, 12, 15), '09:00'), (2, date(2024, 12, 16), '09:40')]
+
+        datos = rows_to_dicts(('id', 'fecha', 'hora'), filas)
+
+        assert json.loads(dumps_bytes(datos)) == [
+            {'id': 1, 'fecha': '2024-12-15', 'hora': '09:00'},
+            {'id': 2, 'fecha': '2024-12-16', 'hora': '09:40'},
+        ]
+
+    def test_jsonify_usa_proveedor_rapido(self, client, backend):
+        """Test que las respuestas de la API usan el proveedor configurado"""
+        response = client.get('/horarios-disponibles?doctorId=Dr. Smith')
+
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == {'error': 'Doctor y fecha son requeridos'}
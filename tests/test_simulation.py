@@ -0,0 +1,73 @@
+import pytest
+import sys
+import os
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import simulation
+from sqlalchemy import func
+from api import db
+from models import Cita
+
+INICIO = date(2024, 3, 4)
+
+
+@pytest.fixture
+def clinica(app_sintetica):
+    """Fábrica de clínicas sintéticas en memoria"""
+    def crear(doctores=6, citas=0):
+        return app_sintetica({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, seed=48, especialidades=3, doctores=doctores,
+                             pacientes=50, citas=citas, desde=date(2024, 3, 1), anios=1)
+    return crear
+
+
+class TestSimulation:
+    """Pruebas del simulador de eventos discretos de la clínica"""
+
+    def test_simulacion_reserva_en_la_base(self, clinica):
+        """Test que las reservas simuladas quedan en la base sin solaparse"""
+        app = clinica()
+        informe = simulation.simulate(app, INICIO, dias=5, llegadas_por_dia=30, seed=1)
+
+        pacientes = informe['pacientes']
+        assert pacientes['llegadas'] > 0
+        assert pacientes['reservas'] + pacientes['sin_hueco'] == pacientes['llegadas']
+        with app.app_context():
+            citas = db.session.scalar(db.select(func.count(Cita.id)))
+            distintas = db.session.execute(
+                db.select(Cita.doctorId, Cita.fecha, Cita.hora).distinct()).all()
+        assert citas == pacientes['reservas'] - pacientes['cancelaciones']
+        assert len(distintas) == citas
+
+        operaciones = informe['operaciones_db']
+        assert operaciones['busqueda']['llamadas'] >= pacientes['llegadas']
+        assert operaciones['busqueda']['consultas_por_llamada'] <= 3
+        assert operaciones['reserva']['llamadas'] == pacientes['reservas']
+        assert 0 < informe['capacidad']['utilizacion'] <= informe['capacidad']['ocupacion'] <= 1
+        assert informe['espera_dias']['p50'] >= 0
+
+    def test_simulacion_determinista(self, clinica):
+        """Test que la misma semilla produce el mismo resultado"""
+        a = simulation.simulate(clinica(), INICIO, dias=3, llegadas_por_dia=40, seed=7)
+        b = simulation.simulate(clinica(), INICIO, dias=3, llegadas_por_dia=40, seed=7)
+
+        for clave in ('pacientes', 'espera_dias', 'capacidad'):
+            assert a[clave] == b[clave]
+        assert a['operaciones_db']['busqueda']['consultas'] == b['operaciones_db']['busqueda']['consultas']
+
+    def test_simulacion_saturada(self, clinica):
+        """Test que con más demanda que agenda los pacientes se quedan sin hueco"""
+        app = clinica(doctores=2)
+        informe = simulation.simulate(app, INICIO, dias=2, llegadas_por_dia=200, horizonte=3,
+                                      prob_cancelacion=0, prob_inasistencia=0, seed=3)
+
+        assert informe['pacientes']['sin_hueco'] > 0
+        assert informe['pacientes']['inasistencias'] == 0
+        # El primer día no admite reservas (se busca desde mañana): la ventana no llega al 100 %.
+        assert 0 < informe['capacidad']['ocupacion'] <= 1
@@ -0,0 +1,108 @@
+import pytest
+import gc
+import sys
+import os
+import threading
+import time
+import weakref
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import api
+from api import db
+from single_flight import SingleFlight
+
+DESDE = date(2024, 1, 1)
+
+
+def _a_la_vez(n, funcion):
+    """Ejecuta `funcion(i)` en n hilos que arrancan juntos y devuelve los resultados en orden."""
+    resultados = [None] * n
+    barrera = threading.Barrier(n)
+
+    def hilo(i):
+        barrera.wait()
+        try:
+            resultados[i] = funcion(i)
+        except Exception as e:
+            resultados[i] = e
+
+    hilos = [threading.Thread(target=hilo, args=(i,)) for i in range(n)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resultados
+
+
+class TestSingleFlight:
+    """Pruebas de la agrupación de lecturas idénticas concurrentes"""
+
+    def test_un_calculo_por_clave(self):
+        """Test que las llamadas simultáneas con la misma clave comparten un único cálculo"""
+        vuelos = SingleFlight('prueba')
+        llamadas = []
+
+        def lento(clave):
+            llamadas.append(clave)
+            time.sleep(0.3)
+            return [clave]
+
+        resultados = _a_la_vez(8, lambda i: vuelos.do(i % 2, lento, i % 2))
+
+        assert sorted(llamadas) == [0, 1]
+        assert all(r == [i % 2] for i, r in enumerate(resultados))
+        assert vuelos.in_flight == 0
+        # Terminado el cálculo no se guarda nada: la siguiente llamada vuelve a calcular.
+        assert vuelos.do(0, lento, 0) == [0]
+        assert len(llamadas) == 3
+
+    def test_error_compartido(self):
+        """Test que si el cálculo falla todos los que esperaban reciben la excepción"""
+        vuelos = SingleFlight('prueba')
+
+        def falla():
+            time.sleep(0.3)
+            raise RuntimeError('sin base de datos')
+
+        resultados = _a_la_vez(4, lambda i: vuelos.do('k', falla))
+
+        assert all(isinstance(r, RuntimeError) for r in resultados)
+        assert vuelos.in_flight == 0
+        assert vuelos.do('k', lambda: 'ok') == 'ok'
+
+    def test_liberable(self):
+        """Test que una instancia descartada no queda retenida por el hook de fork"""
+        referencia = weakref.ref(SingleFlight('prueba'))
+        gc.collect()
+
+        assert referencia() is None
+
+    @pytest.mark.parametrize('activo', [True, False])
+    def test_horarios_disponibles_agrupados(self, app_sintetica, monkeypatch, activo):
+        """Test que peticiones idénticas simultáneas a /horarios-disponibles hacen un solo cálculo"""
+        app = app_sintetica({'AVAILABILITY_SINGLE_FLIGHT': activo}, doctores=4, pacientes=5, citas=0,
+                            desde=DESDE, anios=1)
+        with app.app_context():
+            doctor = db.session.scalar(db.select(api.Especialidad.doctor).where(api.Especialidad.id == 1))
+        original = api.horarios_libres
+        calculos = []
+
+        def lento(*args):
+            calculos.append(args)
+            time.sleep(0.5)
+            return original(*args)
+
+        monkeypatch.setattr(api, 'horarios_libres', lento)
+        url = f'/horarios-disponibles?doctorId={doctor}&fecha=2024-02-05'
+        respuestas = _a_la_vez(6, lambda i: app.test_client().get(url))
+
+        assert all(r.status_code == 200 for r in respuestas)
+        assert len({r.get_data() for r in respuestas}) == 1
+        assert len(calculos) == (1 if activo else 6)
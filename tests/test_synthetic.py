@@ -0,0 +1,88 @@
+import pytest
+import sys
+import os
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import synthetic
+from sqlalchemy import create_engine, text
+from api import generar_horarios
+from hashing import _check_password
+
+TAMANOS = {'especialidades': 5, 'doctores': 20, 'pacientes': 300, 'citas': 5000, 'anios': 1,
+           'desde': date(2024, 1, 1)}
+
+
+def _poblar(tmp_path, nombre, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / nombre}")
+    filas = synthetic.populate(engine, **dict(TAMANOS, **kwargs))
+    return engine, filas
+
+
+def _volcado(engine):
+    with engine.connect() as conn:
+        return [conn.execute(text(f'SELECT * FROM {tabla} ORDER BY id')).all()
+                for tabla in ('especialidad', 'horario_detail', 'user', 'cita')]
+
+
+class TestSynthetic:
+    """Pruebas para el generador de datos sintéticos"""
+
+    def test_determinista(self, tmp_path):
+        """Test que la misma semilla produce las mismas filas y otra semilla no"""
+        uno, filas = _poblar(tmp_path, 'uno.db')
+        dos, _ = _poblar(tmp_path, 'dos.db')
+        otra, _ = _poblar(tmp_path, 'otra.db', seed=1)
+
+        assert _volcado(uno) == _volcado(dos)
+        assert _volcado(uno)[3] != _volcado(otra)[3]
+        assert filas['especialidad'] == 20 and filas['user'] == 300
+        assert abs(filas['cita'] - 5000) < 250
+
+    def test_citas_coherentes(self, tmp_path):
+        """Test que las citas no se solapan y caen en huecos ofrecidos por la API"""
+        engine, _ = _poblar(tmp_path, 'coherente.db')
+        with engine.connect() as conn:
+            duplicadas = conn.execute(text(
+                'SELECT COUNT(*) FROM (SELECT 1 FROM cita GROUP BY doctorId, fecha, hora HAVING COUNT(*) > 1)'
+            )).scalar()
+            citas = conn.execute(text(
+                'SELECT c.hora, d.inicio, d.fin FROM cita c '
+                'JOIN horario h ON h.doctorId = c.doctorId '
+                'JOIN horario_detail d ON d.horario_id = h.id AND d.fecha = c.fecha'
+            )).all()
+            total = conn.execute(text('SELECT COUNT(*) FROM cita')).scalar()
+
+        assert duplicadas == 0
+        assert len(citas) == total
+        assert all(hora in generar_horarios(inicio, fin) for hora, inicio, fin in citas)
+
+    def test_login_y_base_no_vacia(self, tmp_path):
+        """Test que la contraseña compartida es válida y que no se sobrescribe una base con datos"""
+        engine, _ = _poblar(tmp_path, 'login.db', citas=100)
+        with engine.connect() as conn:
+            password = conn.execute(text("SELECT password FROM user WHERE correo = 'paciente7@clinica.test'")).scalar()
+
+        assert _check_password(password, synthetic.PASSWORD)
+        with pytest.raises(ValueError, match='ya contiene datos'):
+            synthetic.populate(engine, **TAMANOS)
+
+    def test_capacidad_insuficiente(self, tmp_path):
+        """Test que se rechazan más citas de las que caben en la agenda"""
+        with pytest.raises(ValueError, match='no caben'):
+            _poblar(tmp_path, 'llena.db', citas=10 ** 6)
+
+    def test_indices_recreados(self, tmp_path):
+        """Test que los índices secundarios existen tras la carga"""
+        engine, _ = _poblar(tmp_path, 'indices.db', citas=100)
+        with engine.connect() as conn:
+            indices = {fila[0] for fila in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+
+        assert {'ix_cita_doctor_fecha_hora', 'ix_cita_paciente_fecha_hora',
+                'ix_horario_detail_horario_fecha', 'ix_horario_doctorId'} <= indices
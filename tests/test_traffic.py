@@ -0,0 +1,104 @@
+import pytest
+import gzip
+import gc
+import sys
+import os
+import weakref
+from datetime import date
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+import loadtest
+import synthetic
+import traffic
+from api import app
+
+DESDE = date(2024, 1, 1)
+
+
+@pytest.fixture
+def instancia(app_sintetica):
+    """Instancias sobre una base sintética idéntica en cada llamada"""
+    return lambda **config: app_sintetica({'SECRET_KEY': 'grabacion', **config}, doctores=5, pacientes=20,
+                                          citas=300, desde=DESDE, anios=1)
+
+
+@pytest.fixture
+def grabada(tmp_path, instancia):
+    """Instancia que graba su tráfico en tmp_path/grabacion tras un flujo de reserva"""
+    origen = instancia(RECORD_DIR=str(tmp_path / 'grabacion'))
+    informe = loadtest.run_load(loadtest.TestClientTransport(origen), concurrency=1, flows=3,
+                                pacientes=20, desde=DESDE, anios=1)
+    assert informe['flows']['completed'] == 3
+    origen.test_client().get('/metrics')
+    origen.extensions['traffic_recorder'].close()
+    return tmp_path
+
+
+class TestTraffic:
+    """Pruebas para la grabación y reproducción de tráfico"""
+
+    def test_desactivado_sin_hooks(self):
+        """Test que sin RECORD_DIR no se graba nada"""
+        assert 'traffic_recorder' not in app.extensions
+        assert traffic._record not in app.after_request_funcs.get(None, [])
+
+    def test_grabacion(self, grabada):
+        """Test formato de los registros, sin contraseñas ni tokens"""
+        archivos = os.listdir(grabada / 'grabacion')
+        with gzip.open(grabada / 'grabacion' / archivos[0], 'rt') as f:
+            contenido = f.read()
+        registros = traffic.read_records([str(grabada / 'grabacion')])
+
+        assert len(archivos) == 1 and len(registros) >= 21
+        assert 'clave-sintetica' not in contenido and 'Bearer' not in contenido
+        assert not [r for r in registros if r['path'] == '/metrics']
+        login = registros[0]
+        assert login['method'] == 'POST' and login['rule'] == '/login' and login['status'] == 200
+        assert login['body']['password'] == traffic.REDACTED
+        reserva = next(r for r in registros if r['rule'] == '/register-cita')
+        assert reserva['status'] == 201 and reserva['usuario']['id'] == reserva['body']['pacienteId']
+        assert [r['t'] for r in registros] == sorted(r['t'] for r in registros)
+
+    def test_archivo_sin_cerrar(self, tmp_path):
+        """Test que se leen los registros de un proceso que no cerró su archivo"""
+        recorder = traffic.TrafficRecorder(str(tmp_path), flush_interval=3600)
+        for i in range(3):
+            recorder.write({'t': i, 'path': f'/p{i}'})
+        recorder.flush()
+
+        assert [r['path'] for r in traffic.read_records([recorder.path])] == ['/p0', '/p1', '/p2']
+
+    def test_grabador_liberable(self, instancia, tmp_path):
+        """Test que un grabador descartado no queda retenido por los hooks de fork y de salida"""
+        referencia = weakref.ref(instancia(RECORD_DIR=str(tmp_path / 'descartada')).extensions['traffic_recorder'])
+        gc.collect()
+
+        assert referencia() is None
+
+    def test_reproduccion(self, grabada, instancia):
+        """Test que el tráfico reproducido contra una instancia nueva da los mismos estados"""
+        registros = traffic.read_records([str(grabada / 'grabacion')])
+        destino = instancia(SECRET_KEY='otra-clave')
+
+        informe = traffic.replay(registros, loadtest.TestClientTransport(destino), speed=0, concurrency=1,
+                                 password=synthetic.PASSWORD, token_for=traffic.token_signer('otra-clave'))
+
+        assert informe['requests'] == len(registros)
+        assert informe['status_mismatches'] == 0
+        assert informe['endpoints']['POST /register-cita']['requests'] == 3
+        assert informe['endpoints']['DELETE /citas/<int:citaId>']['replayed_latency']['p50_ms'] > 0
+
+    def test_reproduccion_sin_password(self, grabada, instancia):
+        """Test que sin contraseña los logins fallan y se cuentan como diferencias"""
+        registros = [r for r in traffic.read_records([str(grabada / 'grabacion')]) if r['rule'] == '/login']
+        destino = instancia()
+
+        informe = traffic.replay(registros, loadtest.TestClientTransport(destino), speed=0)
+
+        assert informe['status_mismatches'] == len(registros)
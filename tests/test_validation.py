@@ -0,0 +1,130 @@
+import pytest
+import json
+import sys
+import os
+
+backend_path = os.path.join(os.path.dirname(os.getcwd()), 'backend')
+if not os.path.exists(backend_path):
+    backend_path = os.path.join('.', 'backend')
+
+sys.path.insert(0, backend_path)
+sys.path.insert(0, '.')
+
+from api import app
+from models import Horario
+from query_stats import count_queries
+from validation import compile_schema
+
+
+class TestValidation:
+    """Pruebas para la validación de cuerpos generada desde la especificación"""
+
+    def test_validadores_compilados_al_iniciar(self):
+        """Test que hay un validador por cada endpoint con cuerpo"""
+        validadores = app.extensions['request_validators']
+
+        assert ('/register', 'POST') in validadores
+        assert ('/register-horario', 'POST') in validadores
+        assert ('/get-especialidades', 'GET') not in validadores
+
+    def test_compile_schema(self):
+        """Test tipos, campos requeridos y listas anidadas"""
+        validar = compile_schema({
+            'type': 'object',
+            'properties': {
+                'n': {'type': 'integer'},
+                'items': {'type': 'array', 'items': {'type': 'object', 'required': ['a'],
+                                                     'properties': {'a': {'type': 'string'}}}},
+            },
+        })
+
+        assert validar({'n': 1, 'items': [{'a': 'x'}]}, '') is None
+        assert validar({'n': None}, '') is None
+        assert validar({'n': True}, '') == "'n' debe ser de tipo entero."
+        assert validar({'items': [{'a': 'x'}, {}]}, '') == "El campo 'items[1].a' es requerido."
+        assert validar({'items': [{'a': 3}]}, '') == "'items[0].a' debe ser de tipo texto."
+        assert validar([], '') == "'cuerpo' debe ser de tipo objeto."
+
+    def test_cuerpo_no_json_sin_consultas(self, client):
+        """Test que un cuerpo que no es JSON se rechaza sin tocar la base"""
+        with count_queries() as stats:
+            response = client.post('/register', data='no es json', content_type='text/plain')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == 'Se requiere un cuerpo JSON.'
+        assert stats.count == 0
+
+    def test_tipo_incorrecto(self, client):
+        """Test que un campo con tipo distinto al de la especificación devuelve 400"""
+        data = {'correo': ['juan@test.com'], 'password': 'password123'}
+        response = client.post('/login', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == "'correo' debe ser de tipo texto."
+
+    def test_horario_sin_claves(self, client, sample_especialidad):
+        """Test que un horario sin 'fin' devuelve 400 en lugar de 500"""
+        data = {
+            'especialidad': 'Cardiología',
+            'doctor': 'Dr. Smith',
+            'horario': [{'fecha': '2024-12-15', 'inicio': '09:00'}]
+        }
+        response = client.post('/register-horario', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == "El campo 'horario[0].fin' es requerido."
+
+    def test_null_se_trata_como_ausente(self, client):
+        """Test que un campo null llega a la vista y usa su mensaje de requerido"""
+        data = {'nombre': 'Test', 'correo': 'test@example.com', 'password': None}
+        response = client.post('/register', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == 'Todos los campos son requeridos'
+
+    def test_horario_sin_lista(self, client, sample_especialidad):
+        """Test que /register-horario sin 'horario' devuelve 400 y no deja un horario huérfano"""
+        data = {'especialidad': 'Cardiología', 'doctor': 'Dr. Smith'}
+        response = client.post('/register-horario', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == "El campo 'horario' es requerido."
+        assert Horario.query.count() == 0
+
+    def test_horario_fecha_invalida_sin_huerfano(self, client, sample_especialidad):
+        """Test que un detalle con fecha inválida deshace también el horario padre"""
+        data = {'especialidad': 'Cardiología', 'doctor': 'Dr. Smith',
+                'horario': [{'fecha': '15/12/2024', 'inicio': '09:00', 'fin': '12:00'}]}
+        response = client.post('/register-horario', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert Horario.query.count() == 0
+
+    def test_login_sin_password(self, client, sample_user):
+        """Test que /login sin 'password' devuelve 400 en lugar de 500"""
+        response = client.post('/login', data=json.dumps({'correo': 'juan@test.com'}),
+                               content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == "El campo 'password' es requerido."
+
+    def test_register_sin_rol(self, client):
+        """Test que /register sin 'rol' devuelve 400 en lugar de un IntegrityError"""
+        data = {'nombre': 'Test', 'correo': 'test@example.com', 'password': 'password123'}
+        with count_queries() as stats:
+            response = client.post('/register', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == 'Todos los campos son requeridos'
+        assert stats.count == 0
+
+    @pytest.mark.parametrize('hora', ['9', '9:00', '24:00', '09:60', '09:00 '])
+    def test_horario_hora_sin_formato(self, client, sample_especialidad, hora):
+        """Test que una hora que no es HH:MM se rechaza antes de guardarse"""
+        data = {'especialidad': 'Cardiología', 'doctor': 'Dr. Smith',
+                'horario': [{'fecha': '2024-12-15', 'inicio': hora, 'fin': '12:00'}]}
+        response = client.post('/register-horario', data=json.dumps(data), content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == "'horario[0].inicio' no tiene el formato esperado."
+        assert Horario.query.count() == 0